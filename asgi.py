@@ -0,0 +1,444 @@
+"""비동기 ASGI 진입점 (uvicorn 등 표준 ASGI 서버로 실행)
+
+    pip install uvicorn
+    uvicorn asgi:app --host 0.0.0.0 --port 8000
+
+업로드는 이벤트 루프에서 조각 단위로 받아 바로 파싱하고, CPU를 쓰는 변환(midi_to_mml)은
+고정 크기 프로세스 풀에 넘겨서 변환 중에도 다른 요청의 업로드를 계속 받음.
+변환 중이거나 기다리는 요청이 한도를 넘으면 본문을 읽기 전에 503과 Retry-After로 거절함.
+/api/render는 MML 미리듣기 WAV를 블록 단위로 chunked 스트리밍함 (변환과 같은 동시 요청 제한을 받음).
+/api/convert?debug=timings면 작업자에서 잰 단계별 시간/카운터를 결과와 Server-Timing 헤더로 돌려줌.
+업로드한 파일은 세션에 남겨 두고, 파일 없는 /api/convert?session=토큰 요청(옵션만 바꾼 재변환)은
+세션의 단계별 중간 결과를 재사용해 이 프로세스의 스레드에서 변환함 (업로드 변환은 그대로 작업자에서).
+/api/jobs는 MIDI 또는 zip 파일 하나를 비동기 작업으로 받아 바로 202와 작업 id를 돌려주고,
+/api/jobs/<id>?wait=초로 결과를 조회함 (long-poll은 이벤트 루프에서 짧게 나눠 기다리고, 조회는 스레드에서).
+작업은 요청 변환의 프로세스 풀과 따로, MML_JOB_WORKERS개 작업자의 풀에서 변환하므로 작업이 많아도
+/api/convert의 부하 제한(Admission)이 세는 작업자 자리를 차지하지 않음.
+
+MML_WORKERS: 변환 작업자 프로세스 수 (기본: CPU 수)
+MML_QUEUE: 작업자가 모두 바쁠 때 기다릴 수 있는 요청 수 (기본: 작업자 수의 2배)
+MML_SESSION_SIZE, MML_SESSION_TTL: 세션 수와 보관 시간 (converter/session.py 참고)
+MML_JOB_WORKERS, MML_JOB_QUEUE, MML_JOB_TIMEOUT, MML_JOB_TTL, MML_JOB_PATH: 작업 큐 설정 (converter/jobs.py 참고)
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs
+
+from converter import PartPool, cache_from_env, cache_key, midi_to_mml, options_from_fields
+from converter.engine import timed_midi_to_mml
+from converter.jobs import MAX_WAIT, POLL_INTERVAL, QueueFull, jobs_from_env
+from converter.multipart import MAX_UPLOAD_SIZE, FilePartParser, MultipartError, PayloadTooLarge, boundary_of, is_midi_part
+from converter.render import render_options, render_seconds_from_env, render_wav
+from converter.session import sessions_from_env
+from converter.timings import Timings, hook_from_env, hooks_enabled, notify, requested as timings_requested
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public', 'index.html')
+MAX_JSON_SIZE = 256 * 1024  # /api/render JSON 본문 최대 크기
+RENDER_SECONDS = render_seconds_from_env()  # 미리듣기 최대 재생 길이 (초, MML_RENDER_SECONDS)
+
+# 변환 결과 캐시 (같은 파일 반복 변환 시 재사용)
+result_cache = cache_from_env()
+
+# 옵션만 바꾼 재변환용 세션 (중간 결과는 이벤트 루프 프로세스의 메모리에 보관)
+sessions = sessions_from_env()
+
+# 변환 단계별 시간을 받을 지표 수집 훅 (MML_TIMING_HOOK 설정 시, 이벤트 루프 프로세스에서 호출)
+hook_from_env()
+
+# 파일 단위 변환 프로세스 풀 (요청 하나 = 작업 하나)
+workers = int(os.environ.get('MML_WORKERS') or 0) or os.cpu_count() or 1
+convert_pool = PartPool(max_workers=workers)
+
+# 비동기 변환 작업 큐 (Admission이 세지 않으므로 요청용 풀과 따로, 동시에 실행하는 작업 수만큼의 풀에서 변환)
+jobs = jobs_from_env(cache=result_cache)
+if jobs is not None:
+    jobs.pool = PartPool(max_workers=jobs.workers)
+
+class Admission:
+    """변환 중/대기 중인 요청 수 제한 (이벤트 루프 하나에서만 쓰므로 잠금 없음)"""
+
+    __slots__ = ('workers', 'limit', 'active', 'rejected', 'average')
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.limit = workers + queue_size
+        self.active = 0
+        self.rejected = 0
+        self.average = None  # 최근 변환 시간의 지수 이동 평균 (초)
+
+    def enter(self):
+        """자리가 있으면 차지하고 True, 꽉 찼으면 False"""
+        if self.active >= self.limit:
+            self.rejected += 1
+            return False
+        self.active += 1
+        return True
+
+    def leave(self, seconds=None):
+        self.active -= 1
+        if seconds is not None:
+            self.average = seconds if self.average is None else self.average * 0.8 + seconds * 0.2
+
+    def retry_after(self):
+        """대기 중인 요청이 모두 끝날 때까지 걸릴 시간 추정 (초, 최소 1)"""
+        waves = math.ceil(self.active / self.workers)
+        return max(1, math.ceil((self.average or 1.0) * waves))
+
+    def stats(self):
+        return {
+            'active': self.active,
+            'limit': self.limit,
+            'workers': self.workers,
+            'rejected': self.rejected,
+            'average_seconds': None if self.average is None else round(self.average, 4),
+        }
+
+admission = Admission(workers, int(os.environ.get('MML_QUEUE') or workers * 2))
+
+class ClientDisconnected(Exception):
+    pass
+
+def header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+async def send_response(send, status, body, content_type, headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', content_type),
+            (b'content-length', str(len(body)).encode()),
+            (b'access-control-allow-origin', b'*'),
+            *headers,
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def send_json(send, status, payload, headers=()):
+    await send_response(send, status, json.dumps(payload).encode(), b'application/json', headers)
+
+def is_job_part(part):
+    """작업으로 받을 파일 파트 (MIDI 파일 또는 zip)"""
+    return is_midi_part(part) or (part['filename'] or '').lower().endswith('.zip')
+
+async def read_midi_upload(scope, receive):
+    """본문을 받는 대로 파서에 넘겨 MIDI 파일 파트 -> bytearray 또는 None"""
+    found = await read_file_upload(scope, receive, is_midi_part)
+    return None if found is None else found[1]
+
+async def read_file_upload(scope, receive, accept):
+    """본문을 받는 대로 파서에 넘겨 accept를 만족하는 첫 파일 파트 -> (파트 헤더, bytearray) 또는 None"""
+    parser = FilePartParser(boundary_of(header(scope, b'content-type') or ''), accept)
+    length = header(scope, b'content-length')
+    if length is not None and length.isdigit() and int(length) > MAX_UPLOAD_SIZE:
+        raise PayloadTooLarge(f'파일이 너무 큽니다 (최대 {MAX_UPLOAD_SIZE // (1024 * 1024)}MB)')
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ClientDisconnected()
+        more_body = message.get('more_body', False)
+        if parser.feed(message.get('body', b'')):
+            break
+    return parser.result()
+
+async def run_conversion(midi_data, options, timings=None, session=None):
+    """캐시를 확인하고 없으면 프로세스 풀에서 변환 (timings가 있으면 작업자에서 잰 단계별 시간을 합침)
+
+    session이 있으면 중간 결과가 이 프로세스에 있으므로 풀 대신 스레드에서 세션으로 변환
+    """
+    key = None
+    if timings is not None:
+        timings.start()
+    if result_cache is not None:
+        key = cache_key(midi_data, options)
+        result = result_cache.get(key)
+        if timings is not None:
+            timings.lap('cache')
+            timings.count('cache_hit', int(result is not None))
+        if result is not None:
+            return result
+    if session is not None:
+        result = await asyncio.get_running_loop().run_in_executor(None, session.convert, options, timings)
+        if key is not None:
+            result_cache.put(key, result)
+        return result
+    func = midi_to_mml if timings is None else timed_midi_to_mml
+    try:
+        output = await asyncio.wrap_future(convert_pool.submit(func, midi_data, options))
+    except BrokenProcessPool:
+        # 작업자 프로세스가 죽은 경우 이번 요청은 스레드에서 변환 (풀은 다음 제출 때 새로 띄움)
+        output = await asyncio.get_running_loop().run_in_executor(None, func, midi_data, options)
+    if timings is None:
+        result = output
+    else:
+        result, worker_timings = output
+        timings.merge(worker_timings)
+    if key is not None:
+        result_cache.put(key, result)
+    return result
+
+async def send_busy(send):
+    """동시 요청 한도를 넘은 요청에 503과 Retry-After (본문은 읽지 않음)"""
+    retry_after = str(admission.retry_after()).encode()
+    await send_json(send, 503, {"error": "요청이 많습니다. 잠시 후 다시 시도해 주세요"},
+                    [(b'retry-after', retry_after), (b'connection', b'close')])
+
+async def handle_convert(scope, receive, send):
+    """MIDI 파일 업로드 및 MML 변환 처리 (자리가 없으면 본문을 읽기 전에 503)"""
+    if not admission.enter():
+        await send_busy(send)
+        return
+
+    seconds = None
+    try:
+        fields = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+        try:
+            options = options_from_fields(fields)
+        except ValueError as e:
+            await send_json(send, 400, {"error": str(e)})
+            return
+        multipart = 'multipart/form-data' in (header(scope, b'content-type') or '')
+        session = None
+        if fields.get('session') and not multipart:
+            # 파일 없이 세션으로 다시 변환 (본문은 읽지 않음)
+            session = sessions.get(fields['session']) if sessions is not None else None
+            if session is None:
+                await send_json(send, 404, {"error": "변환 세션이 없거나 만료되었습니다. 파일을 다시 올려 주세요"})
+                return
+            midi_data = session.midi_data
+        elif not multipart:
+            await send_json(send, 415, {"error": "지원되지 않는 Content-Type입니다"})
+            return
+        else:
+            try:
+                midi_data = await read_midi_upload(scope, receive)
+            except PayloadTooLarge as e:
+                await send_json(send, 413, {"error": str(e)}, [(b'connection', b'close')])
+                return
+            except MultipartError as e:
+                await send_json(send, 400, {"error": f"요청 본문을 읽을 수 없습니다: {e}"})
+                return
+            if not midi_data:
+                await send_json(send, 400, {"error": "MIDI 파일을 찾을 수 없습니다"})
+                return
+
+        debug = timings_requested(fields.get('debug'))
+        timings = Timings() if debug or hooks_enabled() else None
+        start = time.perf_counter()
+        try:
+            result = await run_conversion(midi_data, options, timings, session)
+        except Exception as e:
+            await send_json(send, 500, {"error": f"변환 중 오류가 발생했습니다: {str(e)}"})
+            return
+        seconds = time.perf_counter() - start
+        if timings is not None:
+            notify(timings)
+        if sessions is not None:
+            # 업로드 변환은 작업자에서 했으므로 세션에는 파일만 남기고 중간 결과는 다음 요청 때 계산
+            session = session or sessions.open(midi_data)
+            result = dict(result, session=session.token)
+        if not debug:
+            await send_json(send, 200, result)
+            return
+        timings.start()
+        body = json.dumps(dict(result, timings=timings.report())).encode()
+        timings.lap('json')
+        await send_response(send, 200, body, b'application/json', [(b'server-timing', timings.server_timing().encode())])
+    except ClientDisconnected:
+        pass
+    finally:
+        admission.leave(seconds)
+
+async def handle_submit_job(scope, receive, send):
+    """MIDI(convert 작업) 또는 zip(batch 작업) 파일 하나를 받아 작업 큐에 넣고 202 {'id', 'kind', 'status', 'url'}"""
+    if jobs is None:
+        await send_json(send, 501, {"error": "비동기 변환 작업을 사용하지 않는 서버입니다"})
+        return
+    fields = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+    try:
+        options = options_from_fields(fields)
+    except ValueError as e:
+        await send_json(send, 400, {"error": str(e)})
+        return
+    if 'multipart/form-data' not in (header(scope, b'content-type') or ''):
+        await send_json(send, 415, {"error": "지원되지 않는 Content-Type입니다"})
+        return
+    try:
+        found = await read_file_upload(scope, receive, is_job_part)
+    except ClientDisconnected:
+        return
+    except PayloadTooLarge as e:
+        await send_json(send, 413, {"error": str(e)}, [(b'connection', b'close')])
+        return
+    except MultipartError as e:
+        await send_json(send, 400, {"error": f"요청 본문을 읽을 수 없습니다: {e}"})
+        return
+    if found is None or not found[1]:
+        await send_json(send, 400, {"error": "MIDI 또는 zip 파일을 찾을 수 없습니다"})
+        return
+
+    filename = found[0]['filename']
+    kind = 'batch' if filename.lower().endswith('.zip') else 'convert'
+    try:
+        # SQLite에 입력 파일을 쓰는 동안 이벤트 루프를 막지 않도록 스레드에서 제출
+        job_id = await asyncio.get_running_loop().run_in_executor(None, jobs.submit, kind, [(filename, found[1])], options)
+    except QueueFull as e:
+        await send_json(send, 503, {"error": str(e)})
+        return
+    url = f'/api/jobs/{job_id}'
+    await send_json(send, 202, {'id': job_id, 'kind': kind, 'status': 'queued', 'url': url}, [(b'location', url.encode())])
+
+async def handle_job(scope, send, job_id):
+    """작업 상태/결과 조회 (?wait=초면 끝날 때까지 POLL_INTERVAL마다 확인하며 기다림, 없으면 404)"""
+    if jobs is None:
+        await send_json(send, 501, {"error": "비동기 변환 작업을 사용하지 않는 서버입니다"})
+        return
+    fields = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+    try:
+        wait = float(fields.get('wait') or 0)
+    except ValueError:
+        await send_json(send, 400, {"error": "wait 값은 숫자여야 합니다"})
+        return
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (min(wait, MAX_WAIT) if wait > 0 else 0)
+    while True:
+        # SQLite를 쓰면 조회도 디스크를 읽으므로 이벤트 루프 밖에서
+        report = await loop.run_in_executor(None, jobs.get, job_id)
+        if report is None:
+            await send_json(send, 404, {"error": "변환 작업이 없거나 결과 보관 기간이 지났습니다"})
+            return
+        if report['status'] in ('done', 'failed') or loop.time() >= deadline:
+            await send_json(send, 200, report)
+            return
+        await asyncio.sleep(min(POLL_INTERVAL, max(deadline - loop.time(), 0)))
+
+async def read_json(receive):
+    """JSON 본문 -> dict (크기 제한을 넘거나 형식이 틀리면 ValueError)"""
+    body = bytearray()
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ClientDisconnected()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if len(body) > MAX_JSON_SIZE:
+            raise ValueError('요청 본문이 너무 큽니다')
+    try:
+        fields = json.loads(body)
+    except ValueError:
+        raise ValueError('JSON 본문을 읽을 수 없습니다')
+    if not isinstance(fields, dict):
+        raise ValueError('재생할 MML이 없습니다')
+    return fields
+
+async def handle_render(scope, receive, send):
+    """MML 미리듣기: 섞은 WAV를 블록 단위로 스트리밍 (블록 합성은 스레드에서 해서 이벤트 루프를 막지 않음)
+
+    합성도 CPU를 쓰므로 변환과 같은 Admission 자리를 차지함 (자리가 없으면 본문을 읽기 전에 503).
+    렌더링 시간은 변환 시간 평균(Retry-After 추정)에 넣지 않음.
+    """
+    if not admission.enter():
+        await send_busy(send)
+        return
+    try:
+        try:
+            if scope['method'] == 'POST':
+                fields = await read_json(receive)
+            else:
+                fields = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+            _, chunks = render_wav(*render_options(fields), max_seconds=RENDER_SECONDS)
+        except ClientDisconnected:
+            return
+        except ValueError as e:
+            await send_json(send, 400, {"error": str(e)})
+            return
+        except RuntimeError as e:
+            await send_json(send, 501, {"error": str(e)})
+            return
+
+        loop = asyncio.get_running_loop()
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'audio/wav'), (b'access-control-allow-origin', b'*')],
+        })
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        admission.leave()
+
+async def lifespan(receive, send):
+    """시작할 때 작업자 프로세스를 미리 띄우고, 끝날 때 정리"""
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await loop.run_in_executor(None, convert_pool.start)
+            if jobs is not None:
+                await loop.run_in_executor(None, jobs.pool.start)
+                await loop.run_in_executor(None, jobs.start)  # 다시 시작하기 전에 기다리던 작업도 큐에 넣음
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await loop.run_in_executor(None, convert_pool.shutdown)
+            if jobs is not None:
+                await loop.run_in_executor(None, jobs.pool.shutdown)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    method, path = scope['method'], scope['path']
+    if method == 'POST' and path == '/api/convert':
+        await handle_convert(scope, receive, send)
+    elif method == 'POST' and path == '/api/jobs':
+        await handle_submit_job(scope, receive, send)
+    elif method == 'GET' and path.startswith('/api/jobs/'):
+        await handle_job(scope, send, path[len('/api/jobs/'):])
+    elif method in ('GET', 'POST') and path == '/api/render':
+        await handle_render(scope, receive, send)
+    elif method == 'OPTIONS':
+        # CORS preflight 요청 처리
+        await send_response(send, 200, b'', b'text/plain', [
+            (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+            (b'access-control-allow-headers', b'Content-Type'),
+            (b'access-control-max-age', b'86400'),
+        ])
+    elif method == 'GET' and path == '/':
+        with open(INDEX_PATH, 'rb') as f:
+            await send_response(send, 200, f.read(), b'text/html; charset=utf-8')
+    elif method == 'GET' and path == '/api/cache':
+        # 캐시 적중/실패/제거 카운터 조회
+        await send_json(send, 200, {'enabled': False} if result_cache is None else dict(result_cache.stats(), enabled=True))
+    elif method == 'GET' and path == '/api/sessions':
+        # 변환 세션 수와 적중/만료/제거 카운터 조회
+        await send_json(send, 200, {'enabled': False} if sessions is None else dict(sessions.stats(), enabled=True))
+    elif method == 'GET' and path == '/api/jobs':
+        # 작업 큐의 대기/실행/완료 수와 카운터 조회
+        if jobs is None:
+            await send_json(send, 200, {'enabled': False})
+        else:
+            stats = await asyncio.get_running_loop().run_in_executor(None, jobs.stats)
+            await send_json(send, 200, dict(stats, enabled=True, pool=jobs.pool.stats()))
+    elif method == 'GET' and path == '/api/load':
+        # 동시 요청 수/거절 수/작업자 상태 조회
+        await send_json(send, 200, dict(admission.stats(), pool=convert_pool.stats()))
+    else:
+        await send_json(send, 404, {"error": "잘못된 엔드포인트입니다"})
@@ -0,0 +1,65 @@
+"""MML 인코더 벤치마크: 탐욕(greedy) vs 동적 계획법(optimal)
+
+합성 트랙을 두 인코더로 변환해 글자 수 제한 없는 전체 길이, 1200자 안에 담긴 곡의 비율,
+변환 시간을 비교함.
+
+사용법:
+    python benchmarks/bench_encoder.py
+    python benchmarks/bench_encoder.py --sizes 1000 10000 --budget 1200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_note_pairing import make_track  # noqa: E402
+from converter import analyze_track, encode_track, get_quantizer  # noqa: E402
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(analysis, ticks_per_beat, quantizer, is_harmony, encoder, budget, repeat):
+    """(전체 글자 수, 전체 변환 시간, 예산 안 비율, 예산 변환 시간)"""
+    def encode(limit):
+        return lambda: encode_track(analysis, ticks_per_beat, ticks_per_beat, is_harmony,
+                                    quantizer=quantizer, budget=limit, encoder=encoder)
+    full_time, (full_mml, _) = best_of(encode(None), repeat)
+    budget_time, (_, coverage) = best_of(encode(budget), repeat)
+    return len(full_mml), full_time, coverage, budget_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MML 인코더 벤치마크')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--budget', type=int, default=1200, help='파트별 글자 수 예산')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'notes':>7} {'part':>8} {'encoder':>8} {'chars':>8} {'full(s)':>8} {'coverage':>9} {'budget(s)':>10}")
+    for size in args.sizes:
+        track, ticks_per_beat = make_track(size)
+        analysis = analyze_track(track)
+        quantizer = get_quantizer(ticks_per_beat)
+        for part, is_harmony in (('melody', False), ('harmony', True)):
+            sizes = {}
+            for encoder in ('greedy', 'optimal'):
+                chars, full_time, coverage, budget_time = run(
+                    analysis, ticks_per_beat, quantizer, is_harmony, encoder, args.budget, args.repeat)
+                sizes[encoder] = chars
+                print(f'{size:>7} {part:>8} {encoder:>8} {chars:>8} {full_time:8.3f} {coverage:9.3f} {budget_time:10.4f}')
+            saved = 1 - sizes['optimal'] / sizes['greedy'] if sizes['greedy'] else 0.0
+            print(f"{'':>7} {'':>8} {'saved':>8} {saved:8.1%}")
+
+
+if __name__ == '__main__':
+    main()
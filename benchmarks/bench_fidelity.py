@@ -0,0 +1,118 @@
+"""변환 처리량 + 충실도 벤치마크
+
+benchmarks/corpus.py의 합성 MIDI 묶음을 인코더별로 변환해 처리량(파일/초, 음표/초)과
+converter.fidelity의 충실도 지표(담긴 비율, 시작 시간/음높이/길이 오차)를 함께 출력함.
+--baseline으로 이전 결과 JSON을 주면 충실도가 허용치보다 떨어진 항목을 보여주고 1로 종료함
+(빨라졌지만 음악적으로 나빠진 변경을 잡기 위함).
+
+사용법:
+    python benchmarks/bench_fidelity.py
+    python benchmarks/bench_fidelity.py --output before.json
+    python benchmarks/bench_fidelity.py --baseline before.json --tolerance 0.01
+    python benchmarks/bench_fidelity.py --allocation voices --parts 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corpus import KINDS, make_corpus  # noqa: E402
+from converter import midi_to_mml, parse_midi, resolve_options  # noqa: E402
+from converter.fidelity import fidelity_metrics, midi_counts, sum_counts  # noqa: E402
+
+# 값이 클수록 좋은 지표 / 작을수록 좋은 지표 (기준과 비교할 때 사용)
+HIGHER_IS_BETTER = ('coverage', 'onset_recall', 'onset_precision', 'pitch_accuracy')
+LOWER_IS_BETTER = ('onset_error', 'duration_error')
+
+
+def run(corpus, options, repeat):
+    """인코더 하나로 묶음 전체 변환 -> {'throughput': ..., 'fidelity': {종류: 지표, 'overall': 지표}}"""
+    seconds = 0.0
+    source_notes = 0
+    counts_by_kind = {}
+    for kind, midi_data in corpus:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = midi_to_mml(midi_data, options)
+            best = min(best, time.perf_counter() - start)
+        seconds += best
+        source_notes += sum(track.note_count for track in parse_midi(midi_data).tracks)
+        counts_by_kind.setdefault(kind, []).extend(midi_counts(midi_data, result, options).values())
+
+    fidelity = {kind: fidelity_metrics(sum_counts(counts)) for kind, counts in counts_by_kind.items()}
+    fidelity['overall'] = fidelity_metrics(sum_counts(counts for kind_counts in counts_by_kind.values() for counts in kind_counts))
+    return {
+        'throughput': {
+            'files': len(corpus),
+            'seconds': round(seconds, 4),
+            'files_per_second': round(len(corpus) / seconds, 2),
+            'notes_per_second': round(source_notes / seconds),
+        },
+        'fidelity': fidelity,
+    }
+
+
+def regressions(report, baseline, tolerance):
+    """기준보다 tolerance 넘게 나빠진 충실도 지표 -> ['인코더/종류/지표: 기준 -> 현재', ...]"""
+    found = []
+    for encoder, current in report['results'].items():
+        for kind, metrics in current['fidelity'].items():
+            before = baseline.get('results', {}).get(encoder, {}).get('fidelity', {}).get(kind)
+            if before is None:
+                continue
+            for name in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+                if name not in before:
+                    continue
+                change = metrics[name] - before[name]
+                if (change < -tolerance) if name in HIGHER_IS_BETTER else (change > tolerance):
+                    found.append(f'{encoder}/{kind}/{name}: {before[name]} -> {metrics[name]}')
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='변환 처리량 + 충실도 벤치마크')
+    parser.add_argument('--notes', type=int, default=400, help='파일당 대략적인 음표 수')
+    parser.add_argument('--seeds', type=int, default=3, help='종류별로 만들 파일 수')
+    parser.add_argument('--kinds', nargs='+', default=list(KINDS), choices=KINDS)
+    parser.add_argument('--encoders', nargs='+', default=['greedy', 'optimal'], choices=['greedy', 'optimal'])
+    parser.add_argument('--max-length', type=int, default=1200, help='파트당 최대 글자 수')
+    parser.add_argument('--parts', type=int, default=3, help='출력 파트 수')
+    parser.add_argument('--allocation', default='tracks', choices=['tracks', 'voices'])
+    parser.add_argument('--repeat', type=int, default=1, help='파일마다 변환을 반복해 가장 빠른 시간 사용')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON 파일')
+    parser.add_argument('--tolerance', type=float, default=0.01, help='허용하는 충실도 하락폭')
+    args = parser.parse_args()
+
+    corpus = [item for seed in range(args.seeds) for item in make_corpus(args.notes, seed, args.kinds)]
+    report = {
+        'corpus': {'notes': args.notes, 'seeds': args.seeds, 'kinds': args.kinds},
+        'max_length': args.max_length,
+        'parts': args.parts,
+        'allocation': args.allocation,
+        'results': {},
+    }
+    for encoder in args.encoders:
+        options = resolve_options({'max_length': args.max_length, 'encoder': encoder, 'parts': args.parts, 'allocation': args.allocation})
+        report['results'][encoder] = run(corpus, options, args.repeat)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(report, json.load(f), args.tolerance)
+        for line in found:
+            print(f'충실도 하락: {line}', file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""변환 최대 메모리(RSS) 벤치마크
+
+큰 합성 MIDI 파일 묶음을 만들어 별도 프로세스에서 변환하고, 변환 전후 최대 RSS를 비교함.
+--compare로 git 리비전을 주면 그 시점의 코드로도 같은 측정을 해서 나란히 보여줌.
+
+사용법:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --compare HEAD~1 --files 4 --notes 20000
+"""
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+from midiutil import MIDIFile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# 측정 대상 코드에서 실행할 스크립트 (converter 패키지가 없던 리비전은 app.py 사용)
+CHILD_SCRIPT = r'''
+import json, os, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+try:
+    from converter import convert
+except ImportError:
+    from app import midi_to_mml as convert
+
+def peak_kib():
+    # ru_maxrss는 fork 이전 부모의 최대값을 물려받을 수 있어 /proc의 VmHWM을 우선 사용
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+paths = sys.argv[2:]
+before = peak_kib()
+start = time.perf_counter()
+for path in paths:
+    with open(path, 'rb') as f:
+        convert(f.read())
+elapsed = time.perf_counter() - start
+print(json.dumps({'before_kib': before, 'peak_kib': peak_kib(), 'seconds': elapsed}))
+'''
+
+
+def make_midi(seed, track_count, notes_per_track):
+    """화음이 섞인 큰 다중 트랙 MIDI 생성"""
+    rnd = random.Random(seed)
+    midi = MIDIFile(track_count)
+    for track in range(track_count):
+        midi.addTempo(track, 0, 120)
+        time = 0.0
+        for i in range(notes_per_track):
+            duration = rnd.choice([0.25, 0.5, 1, 1.5, 2])
+            for j in range(rnd.choice([1, 1, 2, 3])):
+                midi.addNote(track, track % 16, rnd.randint(40, 88) + j * 4, time, duration, rnd.randint(40, 127))
+            time += rnd.choice([0.25, 0.5, duration])
+    buffer = io.BytesIO()
+    midi.writeFile(buffer)
+    return buffer.getvalue()
+
+
+def export_revision(revision, target):
+    """git 리비전의 코드를 임시 디렉터리에 풀기"""
+    archive = subprocess.run(['git', '-C', ROOT, 'archive', revision], check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+
+def measure(code_root, paths):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT, code_root] + paths,
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='변환 최대 메모리(RSS) 벤치마크')
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--tracks', type=int, default=4)
+    parser.add_argument('--notes', type=int, default=20000, help='트랙당 노트 수')
+    parser.add_argument('--compare', metavar='REV', help='함께 측정할 git 리비전 (예: HEAD~1)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(workdir, f'song{i}.mid')
+            with open(path, 'wb') as f:
+                f.write(make_midi(i, args.tracks, args.notes))
+            paths.append(path)
+        total = sum(os.path.getsize(path) for path in paths)
+        print(f'corpus: {args.files} files, {total / 1024:.0f} KiB')
+
+        targets = [('working tree', ROOT)]
+        if args.compare:
+            revision_root = os.path.join(workdir, 'revision')
+            os.mkdir(revision_root)
+            export_revision(args.compare, revision_root)
+            targets.insert(0, (args.compare, revision_root))
+
+        print(f"{'code':>14} {'peak RSS(MiB)':>14} {'growth(MiB)':>12} {'time(s)':>8}")
+        for name, code_root in targets:
+            result = measure(code_root, paths)
+            growth = result['peak_kib'] - result['before_kib']
+            print(f"{name:>14} {result['peak_kib'] / 1024:14.1f} {growth / 1024:12.1f} {result['seconds']:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""MIDI 파싱 벤치마크: mido.MidiFile vs converter.midiparse.parse_midi
+
+합성 오케스트라 파일(여러 트랙, control change/pitch bend 다수)을 메모리에서 만들어
+파싱 시간과 최대 메모리(tracemalloc)를 비교함.
+
+사용법:
+    python benchmarks/bench_midi_parser.py
+    python benchmarks/bench_midi_parser.py --tracks 16 --notes 20000
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import mido
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from converter.midiparse import parse_midi  # noqa: E402
+
+
+def make_orchestral_midi(track_count, notes_per_track, seed=0):
+    """노트 사이에 control change와 pitch bend가 섞인 다중 트랙 MIDI 생성"""
+    rnd = random.Random(seed)
+    mid = mido.MidiFile(ticks_per_beat=480)
+    for t in range(track_count):
+        track = mido.MidiTrack()
+        mid.tracks.append(track)
+        channel = t % 16
+        track.append(mido.MetaMessage('set_tempo', tempo=500000))
+        track.append(mido.Message('program_change', program=t, channel=channel))
+        for i in range(notes_per_track):
+            note = rnd.randint(36, 96)
+            track.append(mido.Message('note_on', note=note, velocity=rnd.randint(40, 127), channel=channel, time=rnd.choice([0, 60, 120])))
+            for j in range(4):
+                track.append(mido.Message('control_change', control=rnd.choice([1, 7, 11]), value=rnd.randint(0, 127), channel=channel, time=5))
+            track.append(mido.Message('pitchwheel', pitch=rnd.randint(-8192, 8191), channel=channel, time=5))
+            track.append(mido.Message('note_off', note=note, channel=channel, time=rnd.choice([60, 120, 240])))
+    buffer = io.BytesIO()
+    mid.save(file=buffer)
+    return buffer.getvalue()
+
+
+def measure(func, data, repeat):
+    """최소 실행 시간과 최대 메모리 측정"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MIDI 파싱 벤치마크')
+    parser.add_argument('--tracks', type=int, default=16)
+    parser.add_argument('--notes', type=int, default=5000, help='트랙당 노트 수')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_orchestral_midi(args.tracks, args.notes)
+    print(f'file: {len(data) / 1024:.0f} KiB, {args.tracks} tracks x {args.notes} notes')
+
+    mido_time, mido_peak = measure(lambda d: mido.MidiFile(file=io.BytesIO(d)), data, args.repeat)
+    fast_time, fast_peak = measure(parse_midi, data, args.repeat)
+
+    print(f"{'parser':>12} {'time(s)':>9} {'peak(MiB)':>10}")
+    print(f"{'mido':>12} {mido_time:9.3f} {mido_peak / 2 ** 20:10.1f}")
+    print(f"{'parse_midi':>12} {fast_time:9.3f} {fast_peak / 2 ** 20:10.1f}")
+    print(f'speedup {mido_time / fast_time:.1f}x, memory {mido_peak / fast_peak:.1f}x smaller')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""노트 길이 조회 벤치마크: 기존 선형 탐색 vs note_on/note_off 짝짓기 테이블
+
+사용법:
+    python benchmarks/bench_note_pairing.py
+    python benchmarks/bench_note_pairing.py --sizes 1000 10000 100000 --legacy-max 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from converter import build_note_table, note_duration_of, process_track  # noqa: E402
+from converter.midiparse import NOTE_OFF, NOTE_ON, ParsedTrack  # noqa: E402
+
+
+def make_track(note_count, ticks_per_beat=480, seed=0):
+    """합성 피아노 트랙 생성 (겹치는 노트와 화음 포함)"""
+    rnd = random.Random(seed)
+    pending = []  # (time, kind, note, velocity)
+    time = 0
+    for i in range(note_count):
+        note = rnd.randint(36, 96)
+        length = rnd.choice([120, 240, 360, 480, 960])
+        pending.append((time, NOTE_ON, note, rnd.randint(40, 127)))
+        pending.append((time + length, NOTE_OFF, note, 0))
+        time += rnd.choice([0, 0, 60, 120, 240])
+    pending.sort()
+
+    track = ParsedTrack(0)
+    for event_time, kind, note, velocity in pending:
+        track.times.append(event_time)
+        track.kinds.append(kind)
+        track.notes.append(note)
+        track.velocities.append(velocity)
+        track.channels.append(0)
+        if kind == NOTE_ON:
+            track.note_count += 1
+    return track, ticks_per_beat
+
+
+def collect_events(track):
+    """process_track과 같은 방식으로 이벤트 목록 생성"""
+    events = []
+    for current_time, kind, note, velocity in zip(track.times, track.kinds, track.notes, track.velocities):
+        if kind == NOTE_ON:
+            events.append({'type': 'note_on', 'time': current_time, 'note': note, 'velocity': velocity})
+        else:
+            events.append({'type': 'note_off', 'time': current_time, 'note': note})
+    return events
+
+
+def legacy_durations(events):
+    """기존 방식: note_on마다 전체 이벤트 목록을 처음부터 탐색"""
+    durations = []
+    for event in events:
+        if event['type'] != 'note_on':
+            continue
+        note_duration = 0
+        for future_event in events:
+            if future_event['time'] > event['time'] and future_event['type'] == 'note_off' and future_event['note'] == event['note']:
+                note_duration = future_event['time'] - event['time']
+                break
+        durations.append(note_duration)
+    return durations
+
+
+def paired_durations(events):
+    """새 방식: 한 번의 짝짓기 후 인덱스로 조회"""
+    note_table = build_note_table(events)
+    return [note_duration_of(note_table, event['index']) for event in events if event['type'] == 'note_on']
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='노트 길이 조회 벤치마크')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='기존 선형 탐색을 실행할 최대 노트 수 (그 이상은 너무 느려 생략)')
+    args = parser.parse_args()
+
+    print(f"{'notes':>8} {'legacy(s)':>10} {'paired(s)':>10} {'speedup':>9} {'process_track(s)':>17}")
+    for size in args.sizes:
+        track, ticks_per_beat = make_track(size)
+        events = collect_events(track)
+        events.sort(key=lambda x: x['time'])
+
+        paired_time, _ = timed(paired_durations, [dict(e) for e in events])
+        if size <= args.legacy_max:
+            legacy_time, _ = timed(legacy_durations, events)
+            legacy_col = f'{legacy_time:10.3f}'
+            speedup_col = f'{legacy_time / paired_time:8.1f}x'
+        else:
+            legacy_col = f"{'skipped':>10}"
+            speedup_col = f"{'-':>9}"
+
+        track_time, _ = timed(process_track, track, ticks_per_beat, ticks_per_beat)
+        print(f'{size:>8} {legacy_col} {paired_time:10.4f} {speedup_col} {track_time:17.3f}')
+
+
+if __name__ == '__main__':
+    main()
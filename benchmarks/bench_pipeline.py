@@ -0,0 +1,156 @@
+"""변환 단계별 시간/최대 메모리 벤치마크 (커밋 간 비교용)
+
+benchmarks/corpus.py의 합성 MIDI 묶음(드문 선율, 빽빽한 화음, 많은 트랙, 잦은 템포 변경, 비정상 파일)을
+engine.midi_to_mml로 변환하며 converter.timings.Timings가 잰 단계별 시간을 모음 (변환 경로를 따로 복사하지 않음).
+
+    parse: midiparse.parse_midi
+    analysis: 템포 맵, 파트 선택, 파트 트랙 분석(노트 짝짓기)
+    prepare: 노트 길이/볼륨/화음 그룹 미리 계산 (engine='numpy'면 벡터화)
+    tokenize: 이벤트 순회와 토큰 생성 (track.encode_track에서 analysis/prepare/emit을 뺀 시간)
+    emit: 토큰 -> MML 문자열 압축 (emitter.encode, 예전의 정규식 정리 단계)
+    json: 결과 JSON 직렬화
+
+최대 메모리는 파일마다 midi_to_mml 전체를 tracemalloc으로 따로 재서 시간 측정에 영향을 주지 않음.
+--output으로 결과를 저장하고 --baseline으로 이전 결과와 비교하면, 단계 시간이나 최대 메모리가
+--threshold 비율보다 늘어난 항목을 보여주고 1로 종료함.
+
+사용법:
+    python benchmarks/bench_pipeline.py --output before.json
+    python benchmarks/bench_pipeline.py --baseline before.json --threshold 0.2
+    python benchmarks/bench_pipeline.py --engines python numpy --notes 5000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corpus import KINDS, make_corpus  # noqa: E402
+from converter import midi_to_mml, resolve_options  # noqa: E402
+from converter.timings import Timings  # noqa: E402
+
+STAGES = ('parse', 'analysis', 'prepare', 'tokenize', 'emit', 'json')
+MIN_SECONDS = 0.002  # 이보다 작은 시간 차이는 잡음으로 보고 비교하지 않음
+
+
+def convert_staged(midi_data, options):
+    """midi_to_mml을 Timings와 함께 실행 -> (결과 JSON, {단계: 초}) (json은 결과 직렬화 시간)"""
+    timings = Timings()
+    result = midi_to_mml(midi_data, options, timings=timings)
+    totals = {stage: timings.stages.get(stage, 0.0) for stage in STAGES}
+    start = time.perf_counter()
+    body = json.dumps(result)
+    totals['json'] = time.perf_counter() - start
+    return body, totals
+
+
+def peak_kib(midi_data, options):
+    """midi_to_mml 한 번의 최대 할당 메모리 (KiB, 입력 바이트 제외)"""
+    tracemalloc.start()
+    try:
+        midi_to_mml(midi_data, options)
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def run(corpus, options, repeat):
+    """엔진 하나로 묶음 전체 측정 -> {'stages': {...}, 'total': 초, 'peak_kib': ..., 'kinds': {종류: {...}}}"""
+    kinds = {}
+    midi_to_mml(corpus[0][1], options)  # NumPy 지연 import 등 처음 한 번만 드는 비용은 빼고 잼
+    for kind, midi_data in corpus:
+        # 단계마다 반복 중 가장 빠른 시간 사용
+        best = None
+        for _ in range(repeat):
+            _, totals = convert_staged(midi_data, options)
+            best = totals if best is None else {stage: min(best[stage], totals[stage]) for stage in STAGES}
+        entry = kinds.setdefault(kind, {'files': 0, 'stages': dict.fromkeys(STAGES, 0.0), 'peak_kib': 0.0})
+        entry['files'] += 1
+        for stage in STAGES:
+            entry['stages'][stage] += best[stage]
+        entry['peak_kib'] = max(entry['peak_kib'], peak_kib(midi_data, options))
+
+    stages = {stage: round(sum(entry['stages'][stage] for entry in kinds.values()), 5) for stage in STAGES}
+    total = sum(stages.values())
+    for entry in kinds.values():
+        entry['stages'] = {stage: round(seconds, 5) for stage, seconds in entry['stages'].items()}
+        entry['total'] = round(sum(entry['stages'].values()), 5)
+    return {
+        'stages': stages,
+        'total': round(total, 5),
+        'files_per_second': round(len(corpus) / total, 2) if total else None,
+        'peak_kib': max(entry['peak_kib'] for entry in kinds.values()),
+        'kinds': kinds,
+    }
+
+
+def regressions(report, baseline, threshold):
+    """기준보다 threshold 비율 넘게 늘어난 시간/메모리 -> ['엔진/항목: 기준 -> 현재', ...]"""
+    found = []
+
+    def check(label, before, after, floor):
+        if before is None or after is None:
+            return
+        if after > before * (1 + threshold) and after - before > floor:
+            change = f'+{(after / before - 1) * 100:.0f}%' if before else '새 항목'
+            found.append(f'{label}: {before} -> {after} ({change})')
+
+    for engine, current in report['results'].items():
+        before = baseline.get('results', {}).get(engine)
+        if before is None:
+            continue
+        check(f'{engine}/total', before.get('total'), current['total'], MIN_SECONDS)
+        for stage in STAGES:
+            check(f'{engine}/{stage}', before.get('stages', {}).get(stage), current['stages'][stage], MIN_SECONDS)
+        check(f'{engine}/peak_kib', before.get('peak_kib'), current['peak_kib'], 0)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='변환 단계별 시간/최대 메모리 벤치마크')
+    parser.add_argument('--notes', type=int, default=2000, help='파일당 대략적인 음표 수')
+    parser.add_argument('--seeds', type=int, default=2, help='종류별로 만들 파일 수')
+    parser.add_argument('--kinds', nargs='+', default=list(KINDS), choices=KINDS)
+    parser.add_argument('--engines', nargs='+', default=['python', 'numpy'], choices=['python', 'numpy'])
+    parser.add_argument('--encoder', default='greedy', choices=['greedy', 'optimal'])
+    parser.add_argument('--max-length', type=int, default=1200, help='파트당 최대 글자 수')
+    parser.add_argument('--parts', type=int, default=3, help='출력 파트 수')
+    parser.add_argument('--allocation', default='tracks', choices=['tracks', 'voices'])
+    parser.add_argument('--repeat', type=int, default=3, help='파일마다 반복해 단계별 가장 빠른 시간 사용')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON 파일')
+    parser.add_argument('--threshold', type=float, default=0.2, help='허용하는 증가 비율 (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    corpus = [item for seed in range(args.seeds) for item in make_corpus(args.notes, seed, args.kinds)]
+    report = {
+        'corpus': {'notes': args.notes, 'seeds': args.seeds, 'kinds': args.kinds},
+        'options': {'encoder': args.encoder, 'max_length': args.max_length, 'parts': args.parts,
+                    'allocation': args.allocation, 'repeat': args.repeat},
+        'python': sys.version.split()[0],
+        'results': {},
+    }
+    for engine in args.engines:
+        options = resolve_options({'engine': engine, 'encoder': args.encoder, 'max_length': args.max_length,
+                                   'parts': args.parts, 'allocation': args.allocation})
+        report['results'][engine] = run(corpus, options, args.repeat)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(report, json.load(f), args.threshold)
+        for line in found:
+            print(f'성능 저하: {line}', file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""트랙 준비 단계 벤치마크: 순수 파이썬 vs NumPy 벡터화
+
+노트 길이/양자화/볼륨/다음 note_on 시간/화음 그룹 계산 시간만 비교함.
+
+사용법:
+    python benchmarks/bench_vectorized.py --sizes 10000 100000 300000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_note_pairing import make_track  # noqa: E402
+from converter import HAS_NUMPY, analyze_track, get_quantizer  # noqa: E402
+from converter.prepare import prepare_track  # noqa: E402
+from converter.vectorized import prepare_track_numpy  # noqa: E402
+
+
+def best_of(func, args, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='트랙 준비 단계 벤치마크')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 300000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print('NumPy가 설치되어 있지 않습니다 (pip install numpy)')
+        return
+
+    print(f"{'notes':>8} {'python(s)':>10} {'numpy(s)':>10} {'speedup':>9}")
+    for size in args.sizes:
+        track, ticks_per_beat = make_track(size)
+        analysis = analyze_track(track)
+        quantizer = get_quantizer(ticks_per_beat)
+        python_time = best_of(prepare_track, (analysis, ticks_per_beat, quantizer), args.repeat)
+        numpy_time = best_of(prepare_track_numpy, (analysis, ticks_per_beat, quantizer), args.repeat)
+        print(f'{size:>8} {python_time:10.4f} {numpy_time:10.4f} {python_time / numpy_time:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
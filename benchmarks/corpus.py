@@ -0,0 +1,101 @@
+"""벤치마크용 합성 MIDI 묶음 (midiutil로 메모리에서 생성, 같은 시드면 같은 바이트)
+
+종류:
+    sparse_melody: 쉼표가 많은 단선율 한 트랙
+    dense_chords: 3~6음 화음이 이어지는 트랙 두 개
+    many_tracks: 짧은 선율 트랙 16개 (트랙 순위 계산 부담)
+    tempo_changes: 마디마다 템포가 바뀌는 곡
+    pathological: 아주 짧은 음, 같은 음 겹침, 극단적인 음높이, 어긋난 박자
+"""
+import io
+import random
+
+from midiutil import MIDIFile
+
+KINDS = ('sparse_melody', 'dense_chords', 'many_tracks', 'tempo_changes', 'pathological')
+
+
+def write(midi):
+    buffer = io.BytesIO()
+    midi.writeFile(buffer)
+    return buffer.getvalue()
+
+
+def sparse_melody(rnd, notes):
+    midi = MIDIFile(1)
+    midi.addTempo(0, 0, rnd.randint(80, 140))
+    time = 0.0
+    for _ in range(notes):
+        duration = rnd.choice([0.25, 0.5, 1, 1.5, 2])
+        midi.addNote(0, 0, rnd.randint(55, 84), time, duration, rnd.randint(50, 110))
+        time += duration + rnd.choice([0, 0, 0.5, 1, 2])
+    return write(midi)
+
+
+def dense_chords(rnd, notes):
+    midi = MIDIFile(2)
+    midi.addTempo(0, 0, rnd.randint(90, 130))
+    for track in range(2):
+        time = 0.0
+        for _ in range(notes // 4):
+            duration = rnd.choice([0.5, 1, 2])
+            root = rnd.randint(48, 72) - track * 12
+            for interval in sorted(rnd.sample([0, 3, 4, 7, 10, 12, 14, 16], rnd.randint(3, 6))):
+                midi.addNote(track, track, root + interval, time, duration, rnd.randint(60, 100))
+            time += duration
+    return write(midi)
+
+
+def many_tracks(rnd, notes, track_count=16):
+    midi = MIDIFile(track_count)
+    midi.addTempo(0, 0, 120)
+    for track in range(track_count):
+        time = rnd.choice([0, 1, 2, 4])
+        for _ in range(max(1, notes // track_count)):
+            duration = rnd.choice([0.25, 0.5, 1])
+            midi.addNote(track, track % 16, rnd.randint(40, 90), time, duration, rnd.randint(30, 127))
+            time += rnd.choice([duration, duration * 2])
+    return write(midi)
+
+
+def tempo_changes(rnd, notes):
+    midi = MIDIFile(2)
+    time = 0.0
+    for track in range(2):
+        time = 0.0
+        for _ in range(notes // 2):
+            duration = rnd.choice([0.25, 0.5, 0.75, 1])
+            midi.addNote(track, track, rnd.randint(50, 80), time, duration, 90)
+            time += duration
+    for bar in range(int(time // 4) + 1):
+        midi.addTempo(0, bar * 4, rnd.randint(60, 200))
+    return write(midi)
+
+
+def pathological(rnd, notes):
+    # 겹친 같은 음의 note_on/note_off를 midiutil이 정리하지 않고 그대로 씀
+    midi = MIDIFile(3, deinterleave=False)
+    midi.addTempo(0, 0, 240)
+    time = 0.0
+    for _ in range(notes):
+        track = rnd.randrange(3)
+        pitch = rnd.choice([0, 1, 127, 126, rnd.randint(0, 127)])
+        duration = rnd.choice([1 / 960, 0.01, 0.1, 0.33, 7.5, 31])
+        midi.addNote(track, track, pitch, time, duration, rnd.randint(1, 127))
+        if rnd.random() < 0.2:
+            # 끝나기 전에 같은 음을 다시 누름
+            midi.addNote(track, track, pitch, time + duration / 2, duration, 64)
+        time += rnd.choice([0, 1 / 960, 0.07, 0.3, 1.01, 5])
+    return write(midi)
+
+
+def make_corpus(notes=400, seed=0, kinds=KINDS):
+    """[(이름, MIDI 바이트), ...] (종류마다 하나, notes는 파일당 대략적인 음표 수)"""
+    makers = {
+        'sparse_melody': sparse_melody,
+        'dense_chords': dense_chords,
+        'many_tracks': many_tracks,
+        'tempo_changes': tempo_changes,
+        'pathological': pathological,
+    }
+    return [(kind, makers[kind](random.Random(f'{seed}:{kind}'), notes)) for kind in kinds]
@@ -0,0 +1,131 @@
+"""로컬 변환 서버 부하 테스트: 처리량, 지연 시간 분포(p50/p90/p99), 503 거절 수
+
+같은 MIDI 파일을 동시에 여러 개 업로드하고 응답 상태별 개수와 성공 요청의 지연 시간을 출력함.
+캐시가 켜져 있으면 같은 파일은 캐시에서 바로 나오므로, 기본으로 요청마다 다른 파일을 만들어 보냄.
+
+사용법:
+    uvicorn asgi:app --port 8000 &
+    python benchmarks/load_test.py --url http://127.0.0.1:8000/api/convert --requests 200 --concurrency 16
+    python benchmarks/load_test.py --file song.mid --same-file
+"""
+import argparse
+import http.client
+import io
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from midiutil import MIDIFile
+
+
+def make_midi(seed, track_count=4, notes_per_track=400):
+    """화음이 섞인 다중 트랙 MIDI 생성"""
+    rnd = random.Random(seed)
+    midi = MIDIFile(track_count)
+    for track in range(track_count):
+        midi.addTempo(track, 0, 120)
+        time = 0.0
+        for i in range(notes_per_track):
+            duration = rnd.choice([0.25, 0.5, 1, 1.5, 2])
+            for j in range(rnd.choice([1, 1, 2, 3])):
+                midi.addNote(track, track % 16, rnd.randint(40, 88) + j * 4, time, duration, rnd.randint(40, 127))
+            time += rnd.choice([0.25, 0.5, duration])
+    buffer = io.BytesIO()
+    midi.writeFile(buffer)
+    return buffer.getvalue()
+
+
+def multipart_body(data, filename='song.mid'):
+    """파일 하나짜리 multipart/form-data 본문 -> (Content-Type, 본문)"""
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            'Content-Type: audio/midi\r\n\r\n').encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return f'multipart/form-data; boundary={boundary}', body
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 변환 서버 부하 테스트')
+    parser.add_argument('--url', default='http://127.0.0.1:8000/api/convert')
+    parser.add_argument('--requests', type=int, default=200, help='보낼 요청 수')
+    parser.add_argument('--concurrency', type=int, default=16, help='동시에 보내는 요청 수')
+    parser.add_argument('--file', help='업로드할 MIDI 파일 (없으면 합성 파일)')
+    parser.add_argument('--notes', type=int, default=400, help='합성 파일의 트랙별 음표 수')
+    parser.add_argument('--same-file', action='store_true', help='모든 요청에 같은 파일 사용 (캐시 적중 측정)')
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    if args.file:
+        with open(args.file, 'rb') as f:
+            files = [f.read()]
+    else:
+        files = [make_midi(seed, notes_per_track=args.notes) for seed in range(1 if args.same_file else args.requests)]
+    bodies = [multipart_body(data) for data in files]
+
+    local = threading.local()
+    statuses = {}
+    latencies = []
+    lock = threading.Lock()
+
+    def send(index):
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=args.timeout)
+        content_type, body = bodies[index % len(bodies)]
+        start = time.perf_counter()
+        try:
+            connection.request('POST', url.path or '/', body, {'Content-Type': content_type})
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+                local.connection = None
+        except OSError as e:
+            connection.close()
+            local.connection = None
+            status = type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 1)
+
+    print(json.dumps({
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'latency_ms': {
+            'p50': ms(percentile(latencies, 0.50)),
+            'p90': ms(percentile(latencies, 0.90)),
+            'p99': ms(percentile(latencies, 0.99)),
+            'max': ms(max(latencies) if latencies else None),
+        },
+    }, indent=2))
+    return 0 if statuses.get(200) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
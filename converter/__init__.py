@@ -0,0 +1,69 @@
+"""MIDI → 마비노기 MML 변환 엔진
+
+Flask 앱(app.py)과 Vercel 핸들러(api/index.py)가 함께 사용하는 변환 로직.
+"""
+from .analysis import TrackAnalysis, analyze_track, rank_tracks, tempo_map
+from .cache import ResultCache, cache_from_env, cache_key
+from .chords import ChordIndex, build_chord_index
+from .engine import DEFAULT_OPTIONS, convert, convert_part, midi_to_mml, options_from_fields, resolve_options
+from .fidelity import midi_fidelity
+from .jobs import JobQueue, jobs_from_env
+from .midiparse import MidiParseError, parse_midi
+from .mml import MmlNote, MmlPart, parse_mml
+from .notes import NoteTable, build_note_table, note_duration_of
+from .parallel import PartPool, batch_pool_from_env, pool_from_env
+from .quantize import Quantizer, get_note_length, get_quantizer
+from .render import render_wav
+from .session import ConversionSession, SessionStore, sessions_from_env
+from .spelling import Speller
+from .tempo import TempoMap, build_tempo_map
+from .track import encode_track, process_track
+from .voices import VoiceAllocation, allocate_voices
+from .vectorized import HAS_NUMPY
+
+__all__ = [
+    'ChordIndex',
+    'ConversionSession',
+    'DEFAULT_OPTIONS',
+    'HAS_NUMPY',
+    'JobQueue',
+    'MidiParseError',
+    'MmlNote',
+    'MmlPart',
+    'NoteTable',
+    'PartPool',
+    'Quantizer',
+    'ResultCache',
+    'SessionStore',
+    'Speller',
+    'TempoMap',
+    'TrackAnalysis',
+    'VoiceAllocation',
+    'allocate_voices',
+    'analyze_track',
+    'batch_pool_from_env',
+    'build_chord_index',
+    'build_note_table',
+    'build_tempo_map',
+    'cache_from_env',
+    'cache_key',
+    'convert',
+    'convert_part',
+    'encode_track',
+    'get_note_length',
+    'get_quantizer',
+    'jobs_from_env',
+    'midi_fidelity',
+    'midi_to_mml',
+    'note_duration_of',
+    'options_from_fields',
+    'parse_midi',
+    'parse_mml',
+    'pool_from_env',
+    'process_track',
+    'rank_tracks',
+    'render_wav',
+    'resolve_options',
+    'sessions_from_env',
+    'tempo_map',
+]
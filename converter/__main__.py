@@ -0,0 +1,85 @@
+"""디렉터리 안의 MIDI 파일 일괄 변환 명령줄 도구
+
+파일이 끝나는 대로 한 줄에 하나씩 JSON(NDJSON)으로 표준 출력에 보고하고, --output을 주면
+파일별 변환 결과를 같은 상대 경로의 .json으로, --report를 주면 파일별 시간/오류와 요약을 저장함.
+
+사용법:
+    python -m converter songs/ --output mml/ --report report.json
+    python -m converter songs/ --workers 8 --encoder optimal > results.ndjson
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from .batch import convert_many, iter_directory, summarize
+from .cache import cache_from_env
+from .emitter import ENCODERS
+from .engine import ALLOCATIONS, DEFAULT_OPTIONS, ENGINES, MAX_PARTS
+from .parallel import PartPool
+
+def write_result(output_dir, report):
+    """변환 결과를 output_dir/<상대 경로>.json으로 저장"""
+    path = os.path.join(output_dir, os.path.splitext(report['name'])[0] + '.json')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report['result'], f, ensure_ascii=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m converter', description='MIDI 파일 일괄 MML 변환')
+    parser.add_argument('directory', help='MIDI 파일이 있는 디렉터리 (하위 디렉터리 포함)')
+    parser.add_argument('--output', metavar='DIR', help='파일별 변환 결과(.json)를 저장할 디렉터리')
+    parser.add_argument('--report', metavar='PATH', help='파일별 시간/오류 보고서(JSON) 경로')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='작업자 프로세스 수 (1이면 현재 프로세스에서 차례로 변환)')
+    parser.add_argument('--quiet', action='store_true', help='표준 출력에 변환 결과는 빼고 시간/오류만 출력')
+    parser.add_argument('--max-length', type=int, default=DEFAULT_OPTIONS['max_length'])
+    parser.add_argument('--encoder', choices=ENCODERS, default=DEFAULT_OPTIONS['encoder'])
+    parser.add_argument('--engine', choices=ENGINES, default=DEFAULT_OPTIONS['engine'])
+    parser.add_argument('--allow-64th', action='store_true')
+    parser.add_argument('--allow-triplets', action='store_true')
+    parser.add_argument('--parts', type=int, choices=range(1, MAX_PARTS + 1), default=DEFAULT_OPTIONS['parts'],
+                        metavar=f'1-{MAX_PARTS}', help='출력 파트 수')
+    parser.add_argument('--allocation', choices=ALLOCATIONS, default=DEFAULT_OPTIONS['allocation'],
+                        help='tracks: 노트 수 순위대로 트랙 하나가 파트 하나, voices: 모든 트랙의 노트를 성부로 나눔')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f'디렉터리가 아닙니다: {args.directory}')
+
+    options = {
+        'max_length': args.max_length,
+        'encoder': args.encoder,
+        'engine': args.engine,
+        'allow_64th': args.allow_64th,
+        'allow_triplets': args.allow_triplets,
+        'parts': args.parts,
+        'allocation': args.allocation,
+    }
+    pool = PartPool(args.workers).start() if args.workers > 1 else None
+    cache = cache_from_env() if os.environ.get('MML_CACHE_PATH') else None  # 디스크 캐시가 있을 때만 재사용
+
+    reports = []
+    start = time.perf_counter()
+    try:
+        for report in convert_many(iter_directory(args.directory), options, pool=pool, cache=cache):
+            if args.output and report['ok']:
+                write_result(args.output, report)
+            line = {key: value for key, value in report.items() if not (args.quiet and key == 'result')}
+            sys.stdout.write(json.dumps(line, ensure_ascii=False) + '\n')
+            sys.stdout.flush()
+            reports.append({key: value for key, value in report.items() if key != 'result'})
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    summary = summarize(reports, time.perf_counter() - start)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'summary': summary, 'options': options, 'files': reports}, f, ensure_ascii=False, indent=2)
+    print(json.dumps({'summary': summary}, ensure_ascii=False), file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
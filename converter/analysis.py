@@ -0,0 +1,79 @@
+"""파싱된 MIDI를 한 번 훑어 트랙별 통계와 변환용 이벤트를 미리 계산
+
+멜로디/화음 트랙 선택과 process_track은 모두 이 결과를 읽기만 하고
+트랙 이벤트를 다시 순회하지 않음.
+"""
+from array import array
+
+from .midiparse import NOTE_ON
+from .notes import NoteTable
+from .tempo import build_tempo_map
+
+class TrackAnalysis:
+    """트랙 하나의 통계와 변환용 이벤트"""
+
+    __slots__ = (
+        'index', 'note_count', 'pitch_min', 'pitch_max', 'max_polyphony', 'channels',
+        'event_times', 'event_kinds', 'event_notes', 'event_note_index', 'note_table'
+    )
+
+    def __init__(self, index):
+        self.index = index
+        self.note_count = 0
+        self.pitch_min = None
+        self.pitch_max = None
+        self.max_polyphony = 0
+        self.channels = []  # 사용된 MIDI 채널 (오름차순)
+        # 시간순 note_on/note_off 이벤트 (이벤트마다 객체를 만들지 않고 열 단위 배열로 보관)
+        self.event_times = array('q')  # 절대 틱 (ParsedTrack 배열 공유)
+        self.event_kinds = array('B')  # NOTE_ON/NOTE_OFF (ParsedTrack 배열 공유)
+        self.event_notes = array('B')  # 음높이 (ParsedTrack 배열 공유)
+        self.event_note_index = array('q')  # 노트 테이블 인덱스 (note_off는 -1)
+        self.note_table = NoteTable()
+
+def rank_tracks(tracks):
+    """노트가 있는 트랙을 노트 수 내림차순으로 (ParsedTrack, TrackAnalysis 모두 가능)"""
+    ranked = [track for track in tracks if track.note_count > 0]
+    ranked.sort(key=lambda x: x.note_count, reverse=True)
+    return ranked
+
+def tempo_map(parsed):
+    """ParsedMidi의 템포 변경 -> (템포 이벤트 [{'time', 'value'}, ...], 시작 템포) (tempo.TempoMap의 두 값)
+
+    0틱의 템포는 시작 템포, 이후 변경은 트랙 안에 T 명령어로 삽입
+    """
+    tempo = build_tempo_map(parsed)
+    return tempo.events, tempo.initial_tempo
+
+def analyze_track(track):
+    """ParsedTrack 하나를 한 번 순회하며 통계, 이벤트, 노트 짝짓기를 모두 계산"""
+    analysis = TrackAnalysis(track.index)
+    analysis.event_times = track.times
+    analysis.event_kinds = track.kinds
+    analysis.event_notes = track.notes
+    event_note_index = analysis.event_note_index
+    note_table = analysis.note_table
+    channel_mask = 0
+    pitch_min = 127
+    pitch_max = 0
+
+    for current_time, kind, note, velocity, channel in zip(
+            track.times, track.kinds, track.notes, track.velocities, track.channels):
+        channel_mask |= 1 << channel
+        if kind == NOTE_ON:
+            event_note_index.append(note_table.add_note_on(current_time, note, velocity))
+            if note < pitch_min:
+                pitch_min = note
+            if note > pitch_max:
+                pitch_max = note
+        else:
+            event_note_index.append(-1)
+            note_table.add_note_off(current_time, note)
+
+    analysis.note_count = len(note_table)
+    if analysis.note_count:
+        analysis.pitch_min = pitch_min
+        analysis.pitch_max = pitch_max
+    analysis.max_polyphony = note_table.max_polyphony
+    analysis.channels = [channel for channel in range(16) if channel_mask & (1 << channel)]
+    return analysis
@@ -0,0 +1,138 @@
+"""여러 MIDI 파일 일괄 변환 (배치 API와 명령줄 도구 공용)
+
+파일을 (이름, 바이트) 순서로 받아 변환하고, 끝나는 대로 파일별 보고 항목을 내보냄.
+프로세스 풀이 있으면 파일 단위로 작업자에 나눠 동시에 변환하되, 대기 중인 작업 수를
+제한해서 파일이 수천 개여도 한꺼번에 메모리에 올리지 않음.
+"""
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from .cache import cache_key
+from .engine import midi_to_mml, resolve_options
+from .multipart import MAX_UPLOAD_SIZE
+
+MIDI_EXTENSIONS = ('.mid', '.midi')
+MAX_MEMBER_SIZE = MAX_UPLOAD_SIZE  # zip 안의 파일 하나의 최대 크기 (업로드 제한과 같음)
+
+def is_midi_name(name):
+    return name.lower().endswith(MIDI_EXTENSIONS)
+
+def iter_zip(data, max_member_size=MAX_MEMBER_SIZE):
+    """zip 바이트 안의 MIDI 파일 -> (이름, 바이트 또는 예외)
+
+    너무 큰 파일은 압축을 풀지 않고 ValueError를 대신 넘겨 보고서에 오류로 남김.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or not is_midi_name(name) or name.startswith('__MACOSX/'):
+                continue
+            if info.file_size > max_member_size:
+                yield name, ValueError(f'파일이 너무 큽니다 ({info.file_size} bytes)')
+                continue
+            yield name, archive.read(info)
+
+def iter_directory(root):
+    """디렉터리 아래 MIDI 파일 -> (상대 경로, 바이트), 이름순"""
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            if not is_midi_name(filename):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError as e:
+                data = e
+            yield os.path.relpath(path, root), data
+
+def iter_uploads(uploads):
+    """업로드 [(파일 이름, 바이트), ...] -> (이름, 바이트 또는 예외) (zip은 변환하면서 한 파일씩 풂)"""
+    for filename, data in uploads:
+        if filename.lower().endswith('.zip'):
+            try:
+                yield from iter_zip(data)
+            except zipfile.BadZipFile:
+                yield filename, ValueError('zip 파일을 읽을 수 없습니다')
+        elif is_midi_name(filename):
+            yield filename, data
+        else:
+            yield filename, ValueError('MIDI 또는 zip 파일만 업로드 가능합니다')
+
+def convert_file(name, data, options):
+    """파일 하나 변환 -> 보고 항목 {'name', 'ok', 'seconds', 'result' 또는 'error'} (작업 단위)"""
+    start = time.perf_counter()
+    try:
+        result = midi_to_mml(data, options)
+    except Exception as e:
+        return {'name': name, 'ok': False, 'seconds': round(time.perf_counter() - start, 4), 'error': str(e)}
+    return {'name': name, 'ok': True, 'seconds': round(time.perf_counter() - start, 4), 'result': result}
+
+def convert_many(files, options=None, pool=None, cache=None, max_pending=None):
+    """(이름, 바이트) 목록을 변환하며 끝나는 순서대로 보고 항목을 yield
+
+    pool(PartPool): 있으면 파일 단위로 작업자에서 동시에 변환 (없으면 현재 프로세스에서 차례로)
+    cache(ResultCache): 있으면 캐시에 있는 파일은 바로 보고하고, 새 결과는 캐시에 저장
+    max_pending: 동시에 제출해 둘 최대 파일 수 (기본은 작업자 수의 2배)
+    """
+    options = resolve_options(options)
+    if max_pending is None:
+        max_pending = pool.max_workers * 2 if pool is not None else 1
+    pending = {}  # Future -> (이름, 바이트, 캐시 키)
+
+    def collect(future):
+        name, data, key = pending.pop(future)
+        try:
+            report = future.result()
+        except Exception:
+            # 작업자 프로세스가 죽은 경우 등은 현재 프로세스에서 다시 변환
+            report = convert_file(name, data, options)
+        return finished(report, key)
+
+    def finished(report, key):
+        if cache is not None and key is not None and report['ok']:
+            cache.put(key, report['result'])
+        return report
+
+    for name, data in files:
+        if isinstance(data, Exception):
+            yield {'name': name, 'ok': False, 'seconds': 0.0, 'error': str(data)}
+            continue
+
+        key = None
+        if cache is not None:
+            key = cache_key(data, options)
+            cached = cache.get(key)
+            if cached is not None:
+                yield {'name': name, 'ok': True, 'seconds': 0.0, 'cached': True, 'result': cached}
+                continue
+
+        if pool is None:
+            yield finished(convert_file(name, data, options), key)
+            continue
+
+        pending[pool.submit(convert_file, name, data, options)] = (name, data, key)
+        while len(pending) >= max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield collect(future)
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield collect(future)
+
+def summarize(reports, seconds):
+    """보고 항목 목록 -> 요약 {'files', 'ok', 'failed', 'cached', 'seconds', 'convert_seconds'}"""
+    return {
+        'files': len(reports),
+        'ok': sum(1 for report in reports if report['ok']),
+        'failed': sum(1 for report in reports if not report['ok']),
+        'cached': sum(1 for report in reports if report.get('cached')),
+        'seconds': round(seconds, 3),
+        'convert_seconds': round(sum(report['seconds'] for report in reports), 3),
+    }
@@ -0,0 +1,137 @@
+"""변환 결과 캐시 (MIDI 바이트 + 변환 옵션 해시 기준)
+
+메모리 LRU 캐시를 기본으로 사용하고, 경로를 지정하면 SQLite 디스크 캐시를 2차로 사용함.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 변환 결과 형식이 바뀌면 올려서 기존 디스크 캐시를 무효화
+CACHE_VERSION = 7
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_DISK_MAX_ENTRIES = 10000
+
+def cache_key(midi_bytes, options):
+    """MIDI 바이트와 (기본값이 채워진) 변환 옵션으로 캐시 키 생성"""
+    digest = hashlib.sha256()
+    digest.update(f'v{CACHE_VERSION}:'.encode())
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    digest.update(b'\0')
+    digest.update(midi_bytes)
+    return digest.hexdigest()
+
+class ResultCache:
+    """LRU 메모리 캐시 + 선택적 SQLite 디스크 캐시
+
+    stats()로 hits/misses/evictions 등의 카운터를 확인할 수 있음.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, disk_path=None, disk_max_entries=DEFAULT_DISK_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'disk_evictions': 0,
+        }
+        self._db = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._db.commit()
+
+    def get(self, key):
+        """캐시된 결과 반환 (없으면 None)"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._counters['hits'] += 1
+                return dict(result)
+
+            if self._db is not None:
+                row = self._db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    self._db.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+                    self._db.commit()
+                    result = json.loads(row[0])
+                    self._store(key, result)
+                    self._counters['disk_hits'] += 1
+                    return dict(result)
+
+            self._counters['misses'] += 1
+            return None
+
+    def put(self, key, result):
+        """변환 결과 저장"""
+        result = dict(result)
+        with self._lock:
+            self._store(key, result)
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO results (key, value, accessed) VALUES (?, ?, ?)',
+                    (key, json.dumps(result, ensure_ascii=False), time.time())
+                )
+                count = self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+                overflow = count - self.disk_max_entries
+                if overflow > 0:
+                    self._db.execute(
+                        'DELETE FROM results WHERE key IN '
+                        '(SELECT key FROM results ORDER BY accessed LIMIT ?)',
+                        (overflow,)
+                    )
+                    self._counters['disk_evictions'] += overflow
+                self._db.commit()
+
+    def _store(self, key, result):
+        """메모리 캐시에 저장하고 초과분은 가장 오래 쓰지 않은 항목부터 제거 (잠금 안에서 호출)"""
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def clear(self):
+        """메모리/디스크 캐시 비우기 (카운터는 유지)"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM results')
+                self._db.commit()
+
+    def stats(self):
+        """캐시 크기 조정을 위한 카운터 반환"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+            if self._db is not None:
+                stats['disk_entries'] = self._db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+            stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+            return stats
+
+def cache_from_env():
+    """환경 변수로 캐시 생성
+
+    MML_CACHE_SIZE: 메모리 캐시 항목 수 (0이면 캐시 사용 안 함, 기본 256)
+    MML_CACHE_PATH: SQLite 디스크 캐시 파일 경로 (선택, 예: /tmp/mml-cache.sqlite3)
+    """
+    max_entries = int(os.environ.get('MML_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+    if max_entries <= 0:
+        return None
+    disk_path = os.environ.get('MML_CACHE_PATH') or None
+    return ResultCache(max_entries=max_entries, disk_path=disk_path)
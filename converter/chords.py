@@ -0,0 +1,44 @@
+"""시작 시간 기준 화음 그룹 인덱스
+
+노트 테이블 인덱스는 시작 시간순이므로, 이웃한 시작 시간 차이가 창(window) 이상인 곳에서
+그룹을 나누면 화음 그룹이 됨. 노트별 그룹 번호 배열로 자신이 속한 화음을 O(1)에 찾음.
+"""
+from array import array
+
+CHORD_WINDOW_BEATS = 0.05  # 이 간격(박자) 안에 시작하는 노트는 같은 화음
+
+class ChordIndex:
+    """화음 그룹 [[노트 인덱스, ...], ...]과 노트 인덱스 -> 그룹 번호"""
+
+    __slots__ = ('groups', 'group_of')
+
+    def __init__(self, groups, group_of):
+        self.groups = groups
+        self.group_of = group_of
+
+    def __len__(self):
+        return len(self.groups)
+
+    def group(self, note_index):
+        """노트가 속한 화음 그룹 (노트 인덱스 목록)"""
+        return self.groups[self.group_of[note_index]]
+
+def build_chord_index(onsets, window):
+    """시작 시간 목록(오름차순)에서 화음 인덱스 생성
+
+    이전 노트와 시작 시간 차이가 window(틱) 미만이면 같은 그룹.
+    """
+    groups = []
+    group_of = array('q', bytes(8 * len(onsets)))
+    current = []
+    last_onset = None
+    for index, onset in enumerate(onsets):
+        if last_onset is not None and onset - last_onset >= window:
+            groups.append(current)
+            current = []
+        current.append(index)
+        group_of[index] = len(groups)
+        last_onset = onset
+    if current:
+        groups.append(current)
+    return ChordIndex(groups, group_of)
@@ -0,0 +1,277 @@
+"""MML 토큰 스트림과 글자 수 예산 안에서의 압축 인코딩
+
+process_track은 문자열 조각 대신 (종류, 값) 토큰을 쌓고, encode가 토큰을 음표/쉼표 단위
+항목으로 정리한 뒤 한 번 훑으며 문자열로 만듦.
+
+- L/V/옥타브/템포 변경은 값이 실제로 바뀐 경우에만 씀 (연속된 L은 마지막 것만, >< 왕복은 생략)
+- 같은 길이가 짧게 이어지면 L 변경 대신 음표 뒤에 길이를 붙임 (C16 vs L16C)
+- 옥타브를 3단계 이상 옮길 때는 >>> 대신 O 명령어 사용
+- 같은 음·같은 길이의 타이(C&C)는 두 배 길이 음표 하나로 합침 (L4 C&C -> C2)
+- 첫 L(기본 길이)은 전체 글자 수가 가장 적은 값으로 고름 (한 번 훑어 정확히 계산)
+- encoder='optimal'이면 L 변경/직접 표기를 동적 계획법으로 정해 글자 수를 최소화
+- budget을 넘는 항목부터는 쓰지 않음 (토큰 중간에서 자르지 않음)
+"""
+NOTE = 0  # 값: 음이름 ('C', 'D-', ...)
+REST = 1  # 값: None
+LENGTH = 2  # 값: 길이 문자열 ('8', '4.', ...)
+OCTAVE = 3  # 값: 상대 이동 (+1 -> '>', -2 -> '<<')
+VOLUME = 4  # 값: 1-15
+TEMPO = 5  # 값: BPM
+TIE = 6  # 값: None (앞뒤 음표를 &로 연결)
+
+ENCODERS = ('greedy', 'optimal')
+
+START_OCTAVE = 4  # 마비노기 기본 옥타브 (O4)
+MIN_OCTAVE = 1  # O 명령어로 쓸 수 있는 옥타브 범위
+MAX_OCTAVE = 8
+
+# 항목 필드 인덱스
+KIND, NAME, ITEM_LENGTH, ITEM_OCTAVE, ITEM_VOLUME, ITEM_TEMPO, TIED, TOKEN_END = range(8)
+
+def double_length(length):
+    """두 배 길이 표기 ('8' -> '4', '4.' -> '2.'), 표기할 수 없으면 None"""
+    dotted = length.endswith('.')
+    value = int(length[:-1] if dotted else length)
+    if value % 2:
+        return None
+    return f"{value // 2}{'.' if dotted else ''}"
+
+def build_items(tokens):
+    """토큰을 음표/쉼표 항목 목록으로 정리
+
+    항목: [종류, 음이름, 길이, 절대 옥타브, 볼륨, 템포, 앞 음표와 타이 여부, 토큰 끝 위치]
+    """
+    items = []
+    length = None
+    volume = None
+    tempo = None
+    octave = START_OCTAVE
+    tie = False
+    for index, (kind, value) in enumerate(tokens):
+        if kind == NOTE or kind == REST:
+            if tie:
+                # 같은 음·같은 길이 타이는 두 배 길이 음표 하나로
+                previous = items[-1]
+                if previous[NAME] == value and previous[ITEM_LENGTH] == length and not previous[TIED]:
+                    doubled = double_length(length)
+                    if doubled is not None:
+                        previous[ITEM_LENGTH] = doubled
+                        previous[TOKEN_END] = index + 1
+                        tie = False
+                        continue
+            items.append([kind, value, length, octave, volume, tempo, tie, index + 1])
+            tie = False
+        elif kind == TIE:
+            tie = True
+        elif kind == LENGTH:
+            length = value
+        elif kind == OCTAVE:
+            octave += value
+        elif kind == VOLUME:
+            volume = value
+        elif kind == TEMPO:
+            tempo = value
+    return items
+
+def length_runs(items):
+    """항목별로 그 위치부터 같은 길이가 몇 개 이어지는지"""
+    runs = [1] * len(items)
+    for i in range(len(items) - 2, -1, -1):
+        if items[i][ITEM_LENGTH] == items[i + 1][ITEM_LENGTH]:
+            runs[i] = runs[i + 1] + 1
+    return runs
+
+def prefers_length_change(item, run):
+    """길이가 현재 L과 다를 때 L 변경이 음표마다 길이를 붙이는 것보다 짧은지"""
+    return not item[TIED] and 1 + len(item[ITEM_LENGTH]) < run * len(item[ITEM_LENGTH])
+
+def best_default_length(items, runs):
+    """전체 글자 수가 가장 적은 기본 길이
+
+    L 변경을 처음 쓰는 항목 이후에는 어떤 기본 길이로 시작했든 상태가 같아지므로,
+    그 앞 구간에서 붙여야 하는 길이 글자 수와 첫 L 변경 비용만 비교하면 됨.
+    """
+    inline_saving = {}  # 기본 길이 -> 그 길이로 시작하면 붙이지 않아도 되는 글자 수
+    first_change = None
+    for index, item in enumerate(items):
+        if prefers_length_change(item, runs[index]):
+            first_change = item[ITEM_LENGTH]
+            break
+        inline_saving[item[ITEM_LENGTH]] = inline_saving.get(item[ITEM_LENGTH], 0) + len(item[ITEM_LENGTH])
+
+    best = None
+    for candidate in list(inline_saving) + ([first_change] if first_change is not None else []):
+        cost = 1 + len(candidate) - inline_saving.get(candidate, 0)
+        if first_change is not None and candidate != first_change:
+            cost += 1 + len(first_change)
+        if best is None or cost < best[0]:
+            best = (cost, candidate)
+    return best[1]
+
+def item_heads(items):
+    """항목별로 길이와 상관없는 앞부분 (&, T/옥타브/V 변경)과 음이름
+
+    옥타브는 항목마다 목표가 정해져 있으므로 >/< 이동과 O 명령어 중 짧은 쪽을 바로 고름.
+    """
+    heads = []
+    octave = START_OCTAVE
+    volume = None
+    tempo = None
+    for item in items:
+        pieces = ['&'] if item[TIED] else []
+        if item[ITEM_TEMPO] is not None and item[ITEM_TEMPO] != tempo:
+            pieces.append(f'T{item[ITEM_TEMPO]}')
+            tempo = item[ITEM_TEMPO]
+        if item[KIND] == NOTE:
+            target = item[ITEM_OCTAVE]
+            if target != octave:
+                shift = target - octave
+                command = f'O{target}'
+                if MIN_OCTAVE <= target <= MAX_OCTAVE and len(command) < abs(shift):
+                    pieces.append(command)
+                else:
+                    pieces.append('>' * shift if shift > 0 else '<' * -shift)
+                octave = target
+            if item[ITEM_VOLUME] is not None and item[ITEM_VOLUME] != volume:
+                pieces.append(f'V{item[ITEM_VOLUME]}')
+                volume = item[ITEM_VOLUME]
+            heads.append((''.join(pieces), item[NAME]))
+        else:
+            heads.append((''.join(pieces), 'R'))
+    return heads
+
+# 항목별 길이 표기 방법
+KEEP = 0  # 현재 L과 같아서 길이를 쓰지 않음
+INLINE = 1  # 음표 뒤에 길이를 붙임 (C16)
+CHANGE = 2  # 음표 앞에 L 변경 (L16C)
+
+def greedy_plan(items, runs):
+    """남은 연속 구간 길이로 L 변경/직접 표기를 정하는 계획 -> (기본 길이, 항목별 표기 방법)"""
+    default_length = best_default_length(items, runs)
+    length = default_length
+    actions = []
+    for index, item in enumerate(items):
+        item_length = item[ITEM_LENGTH]
+        if item_length == length:
+            actions.append(KEEP)
+        elif prefers_length_change(item, runs[index]):
+            actions.append(CHANGE)
+            length = item_length
+        else:
+            actions.append(INLINE)
+    return default_length, actions
+
+def optimal_plan(items, heads, budget=None):
+    """동적 계획법으로 길이 표기 글자 수를 최소화하는 계획 -> (기본 길이, 항목별 표기 방법)
+
+    상태는 현재 L 값. 항목마다 같은 L이면 0자, 다르면 직접 표기(상태 유지)나 L 변경(상태 이동).
+    길이가 다른 상태는 직접 표기만 하면 되므로, 되짚기 정보는 L 변경으로 들어온 경우의
+    이전 상태 하나만 저장함 (항목 수 x 길이 종류 수, 선형 시간).
+    budget을 주면 예산 안에 들어가는 가장 긴 앞부분의 최소 비용 계획을 고름.
+    """
+    lengths = list(dict.fromkeys(item[ITEM_LENGTH] for item in items))
+    state_of = {length: state for state, length in enumerate(lengths)}
+    widths = [len(length) for length in lengths]
+    costs = [1 + width for width in widths]  # 기본 길이 L 명령어
+    changed_from = []  # 항목별로 L 변경으로 들어온 이전 상태 (없으면 -1)
+    base = 0  # 길이와 상관없는 글자 수 합계
+    fitted = 0  # 예산 안에 들어가는 항목 수
+    fitted_costs = costs
+
+    for index, item in enumerate(items):
+        state = state_of[item[ITEM_LENGTH]]
+        width = widths[state]
+        stay = costs[state]
+        source = -1
+        if not item[TIED]:
+            for other, cost in enumerate(costs):
+                if other != state and cost + 1 + width < stay:
+                    stay = cost + 1 + width
+                    source = other
+        costs = [cost + width for cost in costs]
+        costs[state] = stay
+        changed_from.append(source)
+
+        head, name = heads[index]
+        base += len(head) + len(name)
+        if budget is not None and base + min(costs) > budget:
+            break
+        fitted = index + 1
+        fitted_costs = costs
+
+    # 가장 싼 마지막 상태에서 거꾸로 되짚어 항목별 표기 방법 결정
+    state = min(range(len(lengths)), key=fitted_costs.__getitem__)
+    actions = [KEEP] * fitted
+    for index in range(fitted - 1, -1, -1):
+        item_state = state_of[items[index][ITEM_LENGTH]]
+        if state != item_state:
+            actions[index] = INLINE
+        elif changed_from[index] >= 0:
+            actions[index] = CHANGE
+            state = changed_from[index]
+    return lengths[state], actions
+
+def write_items(items, heads, default_length, actions, budget=None):
+    """계획대로 항목을 MML로 -> (문자열, 쓴 항목 수)"""
+    out = [f'L{default_length}']
+    size = len(out[0])
+    for index, action in enumerate(actions):
+        head, name = heads[index]
+        item_length = items[index][ITEM_LENGTH]
+        if action == KEEP:
+            text = f'{head}{name}'
+        elif action == INLINE:
+            text = f'{head}{name}{item_length}'
+        else:
+            text = f'{head}L{item_length}{name}'
+        if budget is not None and size + len(text) > budget:
+            return ''.join(out), index
+        out.append(text)
+        size += len(text)
+    return ''.join(out), len(actions)
+
+def greedy_horizon(items, runs, written):
+    """greedy_plan으로 예산에서 자른 결과(앞 written개 항목과 넘친 항목)를 정할 때 들여다보는 항목 수
+
+    항목별 결정은 같은 길이 구간이 끝나는 항목까지, 기본 길이는 첫 L 변경 항목의 구간 끝까지 봄.
+    """
+    horizon = written + runs[written] + 1
+    for index, item in enumerate(items):
+        if prefers_length_change(item, runs[index]):
+            return max(horizon, index + runs[index] + 1)
+    return len(items) + 1  # 첫 L 변경이 아직 안 나옴
+
+def encode(tokens, budget=None, encoder='greedy', complete=True):
+    """토큰을 짧은 MML로 -> (문자열, 문자열에 담긴 토큰 수)
+
+    budget(글자 수)을 주면 그 안에 들어가는 항목까지만 씀.
+    encoder: 'greedy' (남은 연속 구간 길이로 L 변경 결정) 또는 'optimal' (동적 계획법으로 최소 글자 수)
+    complete=False면 tokens는 뒤에 토큰이 더 붙을 앞부분. 마지막 항목(뒤 타이로 합쳐질 수 있음)이나
+    그 항목까지 이어진 길이 구간에 따라 예산에서 자른 결과가 달라질 수 있으면, 다 담긴 것처럼
+    len(tokens)를 돌려줘 토큰을 더 모아 다시 확인하게 함 (greedy 결과가 전체 인코딩의 앞부분이 되도록).
+    """
+    items = build_items(tokens)
+    if not items:
+        return '', len(tokens)
+    heads = item_heads(items)
+    runs = None
+    if encoder == 'optimal':
+        default_length, actions = optimal_plan(items, heads, budget)
+    else:
+        runs = length_runs(items)
+        default_length, actions = greedy_plan(items, runs)
+    text, written = write_items(items, heads, default_length, actions, budget)
+    if not complete and written < len(items):
+        settled = written < len(items) - 1
+        if settled and runs is not None:
+            settled = greedy_horizon(items, runs, written) < len(items)
+        if not settled:
+            return text, len(tokens)
+    if written == 0:
+        return '', 0
+    consumed = len(tokens) if written == len(items) else items[written - 1][TOKEN_END]
+    return text, consumed
+
+def to_mml(tokens):
+    """토큰 목록 [(종류, 값), ...]을 MML 문자열로 변환"""
+    return encode(tokens)[0]
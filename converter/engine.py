@@ -0,0 +1,198 @@
+"""MIDI 데이터를 멜로디/화음 MML 파트로 변환하는 엔진 (Flask 앱과 Vercel 핸들러 공용)"""
+from .analysis import rank_tracks, tempo_map
+from .cache import cache_key
+from .emitter import ENCODERS
+from .midiparse import parse_midi
+from .quantize import get_quantizer
+from .timings import Timings, hooks_enabled, notify
+from .track import encode_track
+from .voices import allocate_voices
+
+# 변환 옵션 기본값
+DEFAULT_OPTIONS = {
+    'max_length': 1200,  # 파트별 최대 글자 수 (마비노기 제한)
+    'allow_64th': False,  # 64분음표 길이 사용
+    'allow_triplets': False,  # 셋잇단 길이(L3, L6, L12, L24) 사용
+    'engine': 'python',  # 'numpy'면 노트 배열 계산을 NumPy로 벡터화 (NumPy가 없으면 python과 동일)
+    'encoder': 'greedy',  # 'optimal'이면 L 변경/직접 표기를 동적 계획법으로 골라 글자 수 최소화
+    'parts': 3,  # 출력 파트 수 (1-8, 결과에는 항상 melody/harmony1/harmony2가 있음)
+    'allocation': 'tracks',  # 'voices'면 모든 트랙의 노트를 모아 단선율 성부로 나눔 (voices.allocate_voices)
+}
+
+ENGINES = ('python', 'numpy')
+ALLOCATIONS = ('tracks', 'voices')  # tracks: 노트 수 순위대로 트랙 하나가 파트 하나
+MAX_PARTS = 8
+
+PARTS = ('melody', 'harmony1', 'harmony2')  # 기본 파트 (노트 수 순위대로)
+LEAD_IN = 'R.'  # 파트마다 템포 뒤에 붙이는 시작 쉼표 (샘플처럼 T125R.)
+
+def resolve_options(options=None):
+    """기본값과 합친 변환 옵션 반환 (알 수 없는 옵션은 ValueError)"""
+    resolved = dict(DEFAULT_OPTIONS)
+    if options:
+        unknown = set(options) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"알 수 없는 변환 옵션입니다: {', '.join(sorted(unknown))}")
+        resolved.update(options)
+    if resolved['engine'] not in ENGINES:
+        raise ValueError(f"지원하지 않는 변환 엔진입니다: {resolved['engine']}")
+    if resolved['encoder'] not in ENCODERS:
+        raise ValueError(f"지원하지 않는 MML 인코더입니다: {resolved['encoder']}")
+    if resolved['allocation'] not in ALLOCATIONS:
+        raise ValueError(f"지원하지 않는 파트 나누기 방식입니다: {resolved['allocation']}")
+    if type(resolved['parts']) is not int or not 1 <= resolved['parts'] <= MAX_PARTS:
+        raise ValueError(f"파트 수는 1-{MAX_PARTS} 사이의 정수여야 합니다")
+    if type(resolved['max_length']) is not int or resolved['max_length'] <= 0:
+        raise ValueError("max_length는 양의 정수여야 합니다")
+    return resolved
+
+def options_from_fields(fields):
+    """요청 필드(쿼리 문자열/폼, 값은 문자열)에서 변환 옵션만 골라 resolve_options 결과로 (잘못된 값은 ValueError)"""
+    options = {}
+    for name, default in DEFAULT_OPTIONS.items():
+        value = fields.get(name)
+        if value is None or value == '':
+            continue
+        if isinstance(default, bool):
+            options[name] = value.lower() in ('1', 'true', 'yes', 'on')
+        elif isinstance(default, int):
+            try:
+                options[name] = int(value)
+            except ValueError:
+                raise ValueError(f"{name} 값은 정수여야 합니다: {value!r}")
+        else:
+            options[name] = value
+    return resolve_options(options)
+
+def part_names(count):
+    """파트 수 -> 결과 키 ('melody', 'harmony1', ...) (3개보다 적어도 기본 세 파트는 빈 문자열로 채움)"""
+    return ('melody',) + tuple(f'harmony{index}' for index in range(1, max(count, len(PARTS))))
+
+def select_parts(parsed, options, budget=None):
+    """옵션에 맞는 파트별 원본 트랙 -> (트랙 목록(첫 번째가 멜로디), 파트에 못 들어간 트랙 수, 빠진 노트 수)
+
+    tracks: 노트 수 순위대로 앞의 parts개 트랙 (나머지 트랙의 노트는 모두 빠짐)
+    voices: 모든 트랙의 노트를 parts개 단선율 성부로 나눈 트랙 (빈 성부가 없던 노트만 빠짐,
+    budget(파트별 글자 수)을 주면 예산을 다 쓴 성부의 노트는 다른 빈 성부로 넘김)
+    """
+    count = options['parts']
+    if options['allocation'] == 'voices':
+        allocation = allocate_voices(parsed.tracks, count, budget, parsed.ticks_per_beat)
+        return allocation.tracks, 0, allocation.dropped
+    ranked_tracks = rank_tracks(parsed.tracks)
+    unused = ranked_tracks[count:]
+    return ranked_tracks[:count], len(unused), sum(track.note_count for track in unused)
+
+def convert_part(track, ticks_per_beat, is_harmony, tempo_events, key_signatures, options, budget, timed=False):
+    """파트 하나를 MML로 변환 -> (MML, 담긴 비율, 단계별 시간/카운터 dict 또는 None)
+
+    프로세스 풀의 작업 단위이므로 인자는 모두 피클 가능한 값 (track은 midiparse.ParsedTrack)
+    timed: True면 encode_track의 stats를 채워서 반환
+    """
+    # 파일별 길이 양자화 테이블 (경계값을 한 번만 계산, 프로세스마다 캐시)
+    quantizer = get_quantizer(ticks_per_beat, options['allow_64th'], options['allow_triplets'])
+    stats = {} if timed else None
+    mml, coverage = encode_track(track, ticks_per_beat, ticks_per_beat, is_harmony=is_harmony, tempo_events=tempo_events, quantizer=quantizer, engine=options['engine'], key_signatures=key_signatures, budget=budget, encoder=options['encoder'], stats=stats)
+    return mml, coverage, stats
+
+def midi_to_mml(midi_data, options=None, pool=None, timings=None):
+    """MIDI 데이터를 멜로디/화음1/화음2로 나누어 MML로 변환
+
+    pool(parallel.PartPool)을 넘기면 파트들을 작업자 프로세스에서 동시에 변환
+    timings(timings.Timings)를 넘기면 단계별 시간과 트랙/노트/글자 수 카운터를 채움
+    """
+    options = resolve_options(options)
+    max_length = options['max_length']
+    timed = timings is not None
+    if timed:
+        timings.start()
+
+    # 필요한 이벤트만 한 번에 파싱
+    parsed = parse_midi(midi_data)
+    if timed:
+        timings.lap('parse')
+    ticks_per_beat = parsed.ticks_per_beat
+    tempo_events, tempo = tempo_map(parsed)
+
+    # 파트마다 앞에 붙는 템포 머리말을 뺀 글자 수 (샘플처럼 템포 후 쉼표 추가, T125R.)
+    prefix = f"T{tempo}{LEAD_IN}"
+    budget = max(max_length - len(prefix), 0)
+
+    # 파트별 원본 트랙 선택 (기본: 노트 수 순위, 가장 많은 노트가 있는 트랙이 멜로디일 가능성 높음)
+    # 트랙 분석(노트 짝짓기 등)은 선택된 파트만 각 작업에서 수행
+    part_tracks, unused_tracks, unused_notes = select_parts(parsed, options, budget)
+    if timed:
+        timings.lap('analysis')
+        timings.count('tracks', len(parsed.tracks))
+        timings.count('events', sum(len(track.times) for track in parsed.tracks))
+        timings.count('notes', sum(track.note_count for track in parsed.tracks))
+        timings.count('tracks_unused', unused_tracks)
+        timings.count('notes_dropped', unused_notes)
+
+    # 트랙 처리 (머리말을 뺀 글자 수 안에서 인코딩, 넘치면 그 자리에서 멈춤)
+    # 멜로디 트랙 (첫 번째 트랙)과 화음 트랙들 (나머지, 성부로 나눈 경우는 모두 단선율)
+    harmony = options['allocation'] == 'tracks'
+    jobs = [
+        (part_track, ticks_per_beat, harmony and part_index > 0, tempo_events, parsed.key_signatures, options, budget, timed)
+        for part_index, part_track in enumerate(part_tracks)
+    ]
+    if pool is not None and len(jobs) > 1:
+        parts = pool.map(convert_part, jobs)
+    else:
+        parts = [convert_part(*job) for job in jobs]
+    names = part_names(options['parts'])
+    if timed:
+        for name, (_, part_coverage, stats) in zip(names, parts):
+            timings.add_part(name, stats, part_coverage)
+
+    # 원본 트랙이 없는 파트는 빈 MML (머리말만 남음)
+    parts += [("", 1.0, None)] * (len(names) - len(parts))
+
+    # 각 트랙에 템포 정보 추가 (max_length가 머리말보다 짧은 경우만 잘림)
+    # coverage: 파트별로 곡의 어디까지 담겼는지 (1.0이면 끝까지)
+    result = {name: f"{prefix}{part_mml}"[:max_length] for name, (part_mml, _, _) in zip(names, parts)}
+    result["coverage"] = {name: round(part_coverage, 3) for name, (_, part_coverage, _) in zip(names, parts)}
+    if timed:
+        timings.count('chars', sum(len(result[name]) for name in names))
+        timings.start()  # 파트 작업 시간은 add_part에서 더했으므로 다음 단계는 여기부터
+
+    return result
+
+def timed_midi_to_mml(midi_data, options=None):
+    """midi_to_mml + 단계별 시간 -> (결과, Timings) (훅/디버그용 측정을 작업자 프로세스에서 할 때)"""
+    timings = Timings()
+    return midi_to_mml(midi_data, options, timings=timings), timings
+
+def convert(midi_bytes, options=None, cache=None, pool=None, timings=None, session=None):
+    """변환 엔진의 공개 API: MIDI 바이트와 옵션을 받아 {'melody', 'harmony1', 'harmony2', 'coverage'} 반환
+
+    cache(ResultCache)를 넘기면 같은 파일/옵션의 반복 변환은 캐시에서 바로 반환
+    pool(PartPool)을 넘기면 파트들을 작업자 프로세스에서 동시에 변환 (결과는 같음)
+    timings(Timings)를 넘기거나 timings 훅이 등록되어 있으면 단계별 시간을 재고, 끝나면 훅에 전달
+    session(session.ConversionSession)을 넘기면 pool 대신 세션의 단계별 중간 결과를 재사용해 변환
+    (midi_bytes는 session.midi_data와 같아야 함, 업로드 변환을 풀에서 하려면 session 없이 호출)
+    """
+    options = resolve_options(options)
+    if timings is None and hooks_enabled():
+        timings = Timings()
+    if cache is None:
+        result = _convert_uncached(midi_bytes, options, pool, timings, session)
+    else:
+        if timings is not None:
+            timings.start()
+        key = cache_key(midi_bytes, options)
+        result = cache.get(key)
+        if timings is not None:
+            timings.lap('cache')
+            timings.count('cache_hit', int(result is not None))
+        if result is None:
+            result = _convert_uncached(midi_bytes, options, pool, timings, session)
+            cache.put(key, result)
+    if timings is not None:
+        notify(timings)
+    return result
+
+def _convert_uncached(midi_bytes, options, pool, timings, session):
+    if session is not None:
+        return session.convert(options, timings)
+    return midi_to_mml(midi_bytes, options, pool, timings)
@@ -0,0 +1,132 @@
+"""변환 충실도: 생성한 MML을 다시 음표 타임라인으로 해석해 원본 MIDI 트랙과 비교
+
+파트마다 engine과 같은 방식(engine.select_parts)으로 고른 원본 트랙 음표를 시작 시간별로 묶고, MML 음표를 허용 오차 안의
+가장 가까운 묶음에 짝지어 계산함. 시간은 박자 단위로 비교하므로 리듬 정확도는 템포 반올림과
+상관없고, 템포 때문에 밀린 정도는 drift_ms(초 단위)로 따로 봄.
+
+- coverage: 원본 트랙 길이 대비 MML 재생 구간의 길이 (글자 수 제한으로 잘린 정도)
+- onset_recall: 그 구간 안의 원본 시작 시간 중 MML 음표가 있는 비율 (빠진 음표, 밀린 박자)
+- onset_precision: MML 음표 중 원본 시작 시간과 짝지어진 비율 (엉뚱한 음표)
+- pitch_accuracy: 짝지어진 음표 중 음높이가 그 시간의 원본 음 중 하나와 같은 비율
+- onset_error: 짝지어진 음표의 평균 시작 시간 오차 (박자)
+- duration_error: 음높이까지 맞은 음표의 평균 길이 오차 (원본 길이 대비)
+- drift_ms: 마지막으로 짝지어진 음표의 재생 시각 차이 (밀리초)
+"""
+from bisect import bisect_left
+
+from .analysis import analyze_track
+from .engine import LEAD_IN, part_names, resolve_options, select_parts
+from .midiparse import parse_midi
+from .mml import parse_mml
+from .tempo import build_tempo_map
+
+ONSET_TOLERANCE = 0.125  # 짝지을 수 있는 최대 시작 시간 차이 (박자, 32분음표)
+
+# 파트별 누적 값 (여러 파트/파일을 합칠 때는 더한 뒤 fidelity_metrics로 비율 계산)
+COUNT_KEYS = ('notes', 'onsets', 'matched', 'pitch_matched', 'onset_error_sum', 'duration_error_sum',
+              'duration_count', 'covered_beats', 'source_beats')
+
+def source_onsets(track, ticks_per_beat):
+    """원본 트랙 -> (시작 박자 순 [(박자, {음높이: 길이(박자)}), ...], 트랙 끝 박자)"""
+    table = analyze_track(track).note_table
+    groups = {}
+    end = 0
+    for start, stop, pitch in zip(table.start, table.end, table.pitch):
+        stop = max(stop, start)  # 끝나지 않은 노트
+        pitches = groups.setdefault(start, {})
+        pitches[pitch] = max(pitches.get(pitch, 0), (stop - start) / ticks_per_beat)
+        end = max(end, stop)
+    return [(tick / ticks_per_beat, groups[tick]) for tick in sorted(groups)], end / ticks_per_beat
+
+def compare_part(mml, onsets, source_beats, clock, lead_in):
+    """MML 파트 하나와 원본 음표 묶음 비교 -> 누적 값 dict (COUNT_KEYS + drift_ms)
+
+    clock: 원본의 박자 -> 재생 시각(초) 함수 (tempo.TempoMap.seconds_at_beat)
+    lead_in: 파트 앞 머리말(T…R.)의 MmlPart (그 길이만큼 MML 시간을 당겨서 비교)
+    """
+    part = parse_mml(mml)
+    counts = dict.fromkeys(COUNT_KEYS, 0)
+    counts['notes'] = len(part.notes)
+    counts['source_beats'] = source_beats
+    covered = max(part.beats - lead_in.beats, 0.0)
+    counts['covered_beats'] = min(covered, source_beats)
+
+    times = [beat for beat, _ in onsets]
+    counts['onsets'] = bisect_left(times, covered)
+    matched = bytearray(len(onsets))
+    drift = None
+    for note in part.notes:
+        beat = note.beat - lead_in.beats
+        # 허용 오차 안에서 아직 짝이 없는 가장 가까운 원본 시작 시간
+        best = None
+        index = bisect_left(times, beat - ONSET_TOLERANCE)
+        while index < len(times) and times[index] <= beat + ONSET_TOLERANCE:
+            if not matched[index] and (best is None or abs(times[index] - beat) < abs(times[best] - beat)):
+                best = index
+            index += 1
+        if best is None:
+            continue
+        matched[best] = 1
+        counts['matched'] += 1
+        counts['onset_error_sum'] += abs(times[best] - beat)
+        pitches = onsets[best][1]
+        if note.pitch in pitches:
+            counts['pitch_matched'] += 1
+            if pitches[note.pitch] > 0:
+                counts['duration_error_sum'] += abs(note.beats - pitches[note.pitch]) / pitches[note.pitch]
+                counts['duration_count'] += 1
+        drift = (note.start - lead_in.seconds - clock(times[best])) * 1000
+    counts['drift_ms'] = 0.0 if drift is None else drift
+    return counts
+
+def fidelity_metrics(counts):
+    """누적 값 -> 비율 지표 dict (값이 없으면 1.0 또는 0.0)"""
+    def ratio(numerator, denominator, empty):
+        return round(numerator / denominator, 4) if denominator else empty
+    metrics = {
+        'coverage': ratio(counts['covered_beats'], counts['source_beats'], 1.0),
+        'onset_recall': ratio(counts['matched'], counts['onsets'], 1.0),
+        'onset_precision': ratio(counts['matched'], counts['notes'], 1.0),
+        'pitch_accuracy': ratio(counts['pitch_matched'], counts['matched'], 1.0),
+        'onset_error': ratio(counts['onset_error_sum'], counts['matched'], 0.0),
+        'duration_error': ratio(counts['duration_error_sum'], counts['duration_count'], 0.0),
+    }
+    if 'drift_ms' in counts:
+        metrics['drift_ms'] = round(counts['drift_ms'], 1)
+    return metrics
+
+def sum_counts(count_list):
+    """여러 파트/파일의 누적 값 합계 (drift_ms는 절댓값이 가장 큰 값)"""
+    total = dict.fromkeys(COUNT_KEYS, 0)
+    drift = 0.0
+    for counts in count_list:
+        for key in COUNT_KEYS:
+            total[key] += counts[key]
+        if abs(counts.get('drift_ms', 0.0)) > abs(drift):
+            drift = counts['drift_ms']
+    total['drift_ms'] = drift
+    return total
+
+def midi_counts(midi_data, result, options=None):
+    """원본 MIDI와 변환 결과 -> 파트별 누적 값 {'melody': {...}, ...} (원본 트랙이 없는 파트는 빠짐)
+
+    options: 변환할 때 쓴 옵션 (parts/allocation에 따라 파트별 원본 트랙이 달라짐)
+    """
+    options = resolve_options(options)
+    parsed = parse_midi(midi_data)
+    ticks_per_beat = parsed.ticks_per_beat
+    tempo = build_tempo_map(parsed)
+    lead_in = parse_mml(f'T{tempo.initial_tempo}{LEAD_IN}')
+    counts = {}
+    part_tracks, _, _ = select_parts(parsed, options)
+    for part, track in zip(part_names(options['parts']), part_tracks):
+        onsets, source_beats = source_onsets(track, ticks_per_beat)
+        counts[part] = compare_part(result[part], onsets, source_beats, tempo.seconds_at_beat, lead_in)
+    return counts
+
+def midi_fidelity(midi_data, result, options=None):
+    """원본 MIDI와 변환 결과 -> {'melody': 지표, 'harmony1': ..., 'harmony2': ..., 'overall': 합친 지표}"""
+    counts = midi_counts(midi_data, result, options)
+    report = {part: fidelity_metrics(part_counts) for part, part_counts in counts.items()}
+    report['overall'] = fidelity_metrics(sum_counts(counts.values()))
+    return report
@@ -0,0 +1,351 @@
+"""비동기 변환 작업 큐 (큰 파일/여러 파일 변환을 요청 시간 제한과 상관없이)
+
+변환을 제출하면 작업 id를 바로 돌려주고, 변환은 이 프로세스의 작업자 스레드가 차례로 실행함.
+클라이언트는 id로 상태를 조회하고(poll), wait초를 주면 작업이 끝날 때까지 그 시간만큼 기다렸다가
+응답을 받음(long-poll).
+
+    queued -> running -> done (result) 또는 failed (error)
+
+작업 종류:
+    convert: MIDI 파일 하나 (결과는 engine.convert와 같음)
+    batch: 여러 파일 또는 zip (결과는 {'files': 파일별 보고 항목, 'summary': 요약}, batch.convert_many와 같은 항목)
+
+동시에 실행하는 작업 수는 workers개로 고정되고, 기다리는 작업이 max_pending개면 제출을 거절함(QueueFull).
+실행을 시작하고 timeout초가 지난 작업은 failed(시간 초과)로 보고함. 스레드/작업자 프로세스는 중간에
+멈출 수 없으므로 시간이 지난 변환은 결과만 버리고, 끝날 때까지 작업자 자리를 차지함.
+끝난 작업은 ttl초 동안 보관하고 그 뒤에는 버림 (조회하면 None). 조회는 저장소에 쓰지 않고, 지난 작업을 지우는 일은
+제출할 때와 작업이 끝날 때 EXPIRE_INTERVAL초에 한 번만 함.
+
+path를 주면 작업과 입력 파일을 SQLite에 함께 저장함. 같은 파일을 쓰는 다른 프로세스에서도 상태와 결과를
+조회할 수 있고, 다시 시작하기 전에 기다리던 작업은 start()에서 다시 큐에 넣음.
+실행은 조건부 UPDATE로 차지하므로 여러 프로세스가 같은 작업을 두 번 실행하지 않음.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from .batch import convert_many, iter_uploads, summarize
+from .engine import convert, resolve_options
+
+JOB_KINDS = ('convert', 'batch')
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 300  # 초
+DEFAULT_TTL = 3600  # 초
+DEFAULT_MAX_PENDING = 64
+MAX_WAIT = 30  # long-poll 최대 대기 시간 (초)
+EXPIRE_INTERVAL = 60  # 끝난 작업을 지우는 최소 간격 (초, ttl이 더 짧으면 ttl)
+POLL_INTERVAL = 0.2  # 시작 전 작업이나 다른 프로세스의 작업을 기다릴 때 다시 확인하는 간격 (초)
+
+class QueueFull(Exception):
+    """기다리는 작업이 한도만큼 있어 제출을 받을 수 없음"""
+
+class Job:
+    """작업 하나의 상태 (시각은 여러 프로세스가 비교할 수 있도록 time.time())"""
+
+    __slots__ = ('id', 'kind', 'options', 'uploads', 'status', 'created', 'started', 'finished', 'result', 'error', 'done')
+
+    def __init__(self, job_id, kind, options, uploads, created, status='queued'):
+        self.id = job_id
+        self.kind = kind
+        self.options = options
+        self.uploads = uploads  # [(파일 이름, 바이트), ...] (끝나면 None)
+        self.status = status
+        self.created = created
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+    def report(self):
+        """조회 응답 {'id', 'kind', 'status', 'created', 'started', 'finished', 'result' 또는 'error'}"""
+        report = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'created': round(self.created, 3),
+            'started': None if self.started is None else round(self.started, 3),
+            'finished': None if self.finished is None else round(self.finished, 3),
+        }
+        if self.status == 'done':
+            report['result'] = self.result
+        elif self.status == 'failed':
+            report['error'] = self.error
+        return report
+
+class JobQueue:
+    """작업자 스레드 workers개가 실행하는 변환 작업 큐 + 선택적 SQLite 저장소
+
+    pool(PartPool), cache(ResultCache)는 변환에 그대로 넘김.
+    stats()로 submitted/rejected/completed/failed/timeouts/expired/recovered 카운터를 확인할 수 있음.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_TTL, max_pending=DEFAULT_MAX_PENDING,
+                 path=None, pool=None, cache=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.path = path
+        self.pool = pool
+        self.cache = cache
+        self._jobs = {}  # id -> Job (이 프로세스에서 제출했거나 다시 큐에 넣은 작업)
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._next_expire = 0.0  # 다음에 끝난 작업을 지울 시각 (time.time())
+        self._counters = {
+            'submitted': 0,
+            'rejected': 0,
+            'completed': 0,
+            'failed': 0,
+            'timeouts': 0,
+            'expired': 0,
+            'recovered': 0,
+        }
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, kind TEXT NOT NULL, options TEXT NOT NULL, status TEXT NOT NULL, '
+                'created REAL NOT NULL, started REAL, finished REAL, result TEXT, error TEXT)'
+            )
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS job_files ('
+                'job TEXT NOT NULL, position INTEGER NOT NULL, name TEXT NOT NULL, data BLOB NOT NULL, '
+                'PRIMARY KEY (job, position))'
+            )
+            self._db.commit()
+
+    def start(self):
+        """작업자 스레드를 띄우고 SQLite에 남아 있던 대기 작업을 큐에 넣음 (이미 시작했으면 그대로)"""
+        with self._lock:
+            if self._threads:
+                return self
+            if self._db is not None:
+                for job in self._recover():
+                    self._jobs[job.id] = job
+                    self._queue.put(job)
+                    self._counters['recovered'] += 1
+            for _ in range(self.workers):
+                thread = threading.Thread(target=self._work, name='mml-job', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def submit(self, kind, uploads, options=None):
+        """작업 제출 -> 작업 id (잘못된 옵션은 ValueError, 기다리는 작업이 max_pending개면 QueueFull)
+
+        uploads: [(파일 이름, 바이트), ...] (convert는 MIDI 파일 하나, batch는 MIDI/zip 파일 여러 개)
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"지원하지 않는 작업 종류입니다: {kind}")
+        if not uploads or (kind == 'convert' and len(uploads) != 1):
+            raise ValueError("변환할 파일이 없습니다" if not uploads else "convert 작업은 파일 하나만 받습니다")
+        job = Job(uuid.uuid4().hex, kind, resolve_options(options), [(name, bytes(data)) for name, data in uploads], time.time())
+        self.start()
+        with self._lock:
+            self._expire()
+            if self._queue.qsize() >= self.max_pending:
+                self._counters['rejected'] += 1
+                raise QueueFull('기다리는 변환 작업이 많습니다. 잠시 후 다시 시도해 주세요')
+            if self._db is not None:
+                self._insert(job)
+            self._jobs[job.id] = job
+            self._counters['submitted'] += 1
+        self._queue.put(job)
+        return job.id
+
+    def get(self, job_id, wait=0):
+        """작업 상태 조회 -> Job.report() (없거나 만료되었으면 None)
+
+        wait: 작업이 끝나지 않았으면 끝날 때까지 최대 이 시간(초, MAX_WAIT까지)만큼 기다린 뒤 응답
+        """
+        deadline = time.monotonic() + (min(wait, MAX_WAIT) if wait > 0 else 0)  # 음수/NaN이면 기다리지 않음
+        while True:
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None and self._db is not None:
+                    job = self._load(job_id)
+                if job is None or self._is_expired(job):
+                    return None
+                self._check_timeout(job)
+                if job.status in ('done', 'failed'):
+                    return job.report()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job.report()
+            # 시간 초과를 그 시각에 보고할 수 있도록 실행 제한 시각까지만 기다림 (시작 전이면 짧게 나눠서)
+            if job.started is None:
+                remaining = min(remaining, POLL_INTERVAL)
+            else:
+                remaining = min(remaining, max(job.started + self.timeout - time.time(), 0) + 0.01)
+            if job_id in self._jobs:
+                job.done.wait(remaining)
+            else:
+                time.sleep(min(remaining, POLL_INTERVAL))  # 다른 프로세스에서 실행 중인 작업
+
+    def _work(self):
+        """작업자 스레드: 큐에서 작업을 꺼내 실행 (다른 프로세스가 먼저 차지한 작업은 건너뜀)"""
+        while True:
+            job = self._queue.get()
+            if not self._claim(job):
+                continue
+            try:
+                result, error = self._execute(job), None
+            except Exception as e:
+                result, error = None, f'변환 중 오류가 발생했습니다: {str(e)}'
+            with self._lock:
+                # 제한 시간이 지나 이미 실패로 보고한 작업은 결과를 버림
+                if job.status == 'running' and not self._check_timeout(job):
+                    self._finish(job, result, error)
+                self._expire()
+
+    def _execute(self, job):
+        """작업 하나 변환 -> 결과 dict"""
+        if job.kind == 'convert':
+            return convert(job.uploads[0][1], job.options, cache=self.cache, pool=self.pool)
+        start = time.perf_counter()
+        reports = list(convert_many(iter_uploads(job.uploads), job.options, pool=self.pool, cache=self.cache))
+        return {'files': reports, 'summary': summarize(reports, time.perf_counter() - start)}
+
+    def _claim(self, job):
+        """기다리던 작업을 실행 중으로 바꾸고 True (이미 다른 곳에서 차지했거나 만료되었으면 False)"""
+        with self._lock:
+            if job.status != 'queued' or self._jobs.get(job.id) is not job:
+                return False
+            job.started = time.time()
+            if self._db is not None:
+                cursor = self._db.execute(
+                    "UPDATE jobs SET status = 'running', started = ? WHERE id = ? AND status = 'queued'",
+                    (job.started, job.id)
+                )
+                self._db.commit()
+                if cursor.rowcount != 1:
+                    # 다른 프로세스가 실행하므로 이 프로세스에는 남기지 않음 (조회는 SQLite에서)
+                    del self._jobs[job.id]
+                    return False
+            job.status = 'running'
+            return True
+
+    def _check_timeout(self, job):
+        """실행 제한 시간이 지난 작업을 실패로 끝내고 True (잠금 안에서 호출)"""
+        if job.status != 'running' or time.time() - job.started <= self.timeout:
+            return False
+        self._finish(job, None, f'변환 시간이 초과되었습니다 ({self.timeout:g}초)')
+        self._counters['timeouts'] += 1
+        return True
+
+    def _finish(self, job, result, error):
+        """실행 중인 작업을 결과 또는 오류로 끝냄 (잠금 안에서 호출)"""
+        job.status = 'failed' if error is not None else 'done'
+        job.finished = time.time()
+        job.result = result
+        job.error = error
+        job.uploads = None
+        self._counters['failed' if error is not None else 'completed'] += 1
+        if self._db is not None:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, finished = ?, result = ?, error = ? WHERE id = ? AND status = 'running'",
+                (job.status, job.finished, None if result is None else json.dumps(result, ensure_ascii=False), error, job.id)
+            )
+            self._db.execute('DELETE FROM job_files WHERE job = ?', (job.id,))
+            self._db.commit()
+        job.done.set()
+
+    def _is_expired(self, job):
+        """끝난 지 ttl초가 지난 작업인지 (아직 지우지 않았어도 조회에서는 없는 것으로)"""
+        return job.finished is not None and job.finished <= time.time() - self.ttl
+
+    def _expire(self):
+        """끝난 지 ttl초가 지난 작업 제거 (잠금 안에서 호출, 지난번부터 EXPIRE_INTERVAL초가 지났을 때만)"""
+        now = time.time()
+        if now < self._next_expire:
+            return
+        self._next_expire = now + min(EXPIRE_INTERVAL, self.ttl)
+        deadline = now - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished is not None and job.finished <= deadline]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self._counters['expired'] += len(expired)
+        if self._db is not None:
+            self._db.execute('DELETE FROM jobs WHERE finished IS NOT NULL AND finished <= ?', (deadline,))
+            self._db.commit()
+
+    def _insert(self, job):
+        """SQLite에 작업과 입력 파일 저장 (잠금 안에서 호출)"""
+        self._db.execute(
+            'INSERT INTO jobs (id, kind, options, status, created) VALUES (?, ?, ?, ?, ?)',
+            (job.id, job.kind, json.dumps(job.options), job.status, job.created)
+        )
+        self._db.executemany(
+            'INSERT INTO job_files (job, position, name, data) VALUES (?, ?, ?, ?)',
+            [(job.id, position, name, data) for position, (name, data) in enumerate(job.uploads)]
+        )
+        self._db.commit()
+
+    def _load(self, job_id):
+        """SQLite의 작업 -> Job (입력 파일 없이, 다른 프로세스의 작업 조회용, 잠금 안에서 호출)"""
+        row = self._db.execute(
+            'SELECT kind, options, status, created, started, finished, result, error FROM jobs '
+            'WHERE id = ? AND (finished IS NULL OR finished > ?)', (job_id, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        kind, options, status, created, started, finished, result, error = row
+        job = Job(job_id, kind, json.loads(options), None, created, status)
+        job.started = started
+        job.finished = finished
+        job.result = None if result is None else json.loads(result)
+        job.error = error
+        return job
+
+    def _recover(self):
+        """SQLite에서 기다리던 작업을 입력 파일과 함께 읽음 (잠금 안에서 호출)"""
+        jobs = []
+        for job_id, kind, options, created in self._db.execute(
+                "SELECT id, kind, options, created FROM jobs WHERE status = 'queued' ORDER BY created").fetchall():
+            uploads = self._db.execute('SELECT name, data FROM job_files WHERE job = ? ORDER BY position', (job_id,)).fetchall()
+            jobs.append(Job(job_id, kind, json.loads(options), [(name, bytes(data)) for name, data in uploads], created))
+        return jobs
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            statuses = [job.status for job in self._jobs.values() if not self._is_expired(job)]
+            for status in ('queued', 'running', 'done', 'failed'):
+                stats[status] = statuses.count(status)
+            stats['workers'] = self.workers
+            stats['max_pending'] = self.max_pending
+            stats['timeout'] = self.timeout
+            stats['ttl'] = self.ttl
+            if self._db is not None:
+                stats['disk_entries'] = self._db.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+            return stats
+
+def jobs_from_env(pool=None, cache=None):
+    """환경 변수로 작업 큐 생성 (작업자 스레드는 start() 또는 첫 제출 때 띄움)
+
+    MML_JOB_WORKERS: 동시에 실행할 작업 수 (0이면 작업 큐 사용 안 함, 기본 2)
+    MML_JOB_QUEUE: 기다릴 수 있는 작업 수 (기본 64)
+    MML_JOB_TIMEOUT: 작업 하나의 실행 제한 시간 (초, 기본 300)
+    MML_JOB_TTL: 끝난 작업의 결과를 보관할 시간 (초, 기본 3600)
+    MML_JOB_PATH: 작업을 저장할 SQLite 파일 경로 (선택, 예: /tmp/mml-jobs.sqlite3)
+    """
+    workers = int(os.environ.get('MML_JOB_WORKERS', DEFAULT_WORKERS))
+    if workers <= 0:
+        return None
+    return JobQueue(
+        workers=workers,
+        timeout=float(os.environ.get('MML_JOB_TIMEOUT', DEFAULT_TIMEOUT)),
+        ttl=float(os.environ.get('MML_JOB_TTL', DEFAULT_TTL)),
+        max_pending=int(os.environ.get('MML_JOB_QUEUE', DEFAULT_MAX_PENDING)),
+        path=os.environ.get('MML_JOB_PATH') or None,
+        pool=pool,
+        cache=cache,
+    )
@@ -0,0 +1,171 @@
+"""변환에 필요한 이벤트만 읽는 경량 MIDI 파서
+
+mido.MidiFile처럼 모든 이벤트를 Message 객체로 만들지 않고, 업로드된 바이트의
+memoryview 위에서 MThd/MTrk 청크를 한 번만 훑으며 note_on/note_off/set_tempo/
+time_signature/key_signature만 기록함. 나머지 이벤트(sysex, control change, pitch bend 등)는
+길이만 읽고 건너뜀.
+"""
+from array import array
+
+# 채널 메시지 상태 바이트(상위 4비트)별 데이터 바이트 수
+CHANNEL_DATA_LENGTHS = {
+    0x80: 2,  # note_off
+    0x90: 2,  # note_on
+    0xA0: 2,  # polytouch
+    0xB0: 2,  # control_change
+    0xC0: 1,  # program_change
+    0xD0: 1,  # aftertouch
+    0xE0: 2,  # pitchwheel
+}
+
+NOTE_OFF = 0
+NOTE_ON = 1
+
+class MidiParseError(ValueError):
+    """MIDI 파일 구조가 잘못된 경우"""
+
+class ParsedTrack:
+    """트랙 하나의 노트 이벤트 (절대 틱 시간순, 열 단위 배열)"""
+
+    __slots__ = ('index', 'times', 'kinds', 'notes', 'velocities', 'channels', 'note_count')
+
+    def __init__(self, index):
+        self.index = index
+        self.times = array('q')  # 절대 틱
+        self.kinds = array('B')  # NOTE_ON / NOTE_OFF
+        self.notes = array('B')
+        self.velocities = array('B')
+        self.channels = array('B')
+        self.note_count = 0  # velocity > 0인 note_on 수
+
+    def __len__(self):
+        return len(self.times)
+
+class ParsedMidi:
+    """파싱된 MIDI 파일"""
+
+    __slots__ = ('format', 'ticks_per_beat', 'tracks', 'tempos', 'time_signatures', 'key_signatures')
+
+    def __init__(self, midi_format, ticks_per_beat):
+        self.format = midi_format
+        self.ticks_per_beat = ticks_per_beat
+        self.tracks = []
+        self.tempos = []  # [(틱, 마이크로초/박), ...] 시간순
+        self.time_signatures = []  # [(틱, 분자, 분모), ...] 시간순
+        self.key_signatures = []  # [(틱, 조표(-7~7, 음수는 플랫), 단조 여부), ...] 시간순
+
+def _read_varlen(data, pos, end):
+    """가변 길이 수 읽기 -> (값, 다음 위치)"""
+    value = 0
+    while True:
+        if pos >= end:
+            raise MidiParseError('가변 길이 값이 트랙 끝을 넘어갑니다')
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, pos
+
+def _parse_track(data, pos, end, track, tempos, time_signatures, key_signatures):
+    """MTrk 청크 하나를 읽어 track/tempos/time_signatures/key_signatures에 기록"""
+    times = track.times
+    kinds = track.kinds
+    notes = track.notes
+    velocities = track.velocities
+    channels = track.channels
+    note_count = 0
+    tick = 0
+    status = None
+
+    while pos < end:
+        delta, pos = _read_varlen(data, pos, end)
+        tick += delta
+        if pos >= end:
+            raise MidiParseError('이벤트가 트랙 끝에서 잘렸습니다')
+
+        byte = data[pos]
+        if byte >= 0x80:
+            pos += 1
+            if byte < 0xF0:
+                status = byte  # 채널 메시지만 running status로 기억
+            elif byte == 0xFF:
+                if pos >= end:
+                    raise MidiParseError('메타 이벤트가 트랙 끝에서 잘렸습니다')
+                meta_type = data[pos]
+                length, pos = _read_varlen(data, pos + 1, end)
+                if pos + length > end:
+                    raise MidiParseError('메타 이벤트가 트랙 끝을 넘어갑니다')
+                if meta_type == 0x51 and length == 3:  # set_tempo
+                    tempos.append((tick, (data[pos] << 16) | (data[pos + 1] << 8) | data[pos + 2]))
+                elif meta_type == 0x58 and length >= 2:  # time_signature
+                    time_signatures.append((tick, data[pos], 2 ** data[pos + 1]))
+                elif meta_type == 0x59 and length == 2:  # key_signature
+                    sharps = data[pos]
+                    key_signatures.append((tick, sharps - 256 if sharps > 127 else sharps, data[pos + 1] == 1))
+                elif meta_type == 0x2F:  # end_of_track
+                    break
+                pos += length
+                continue
+            elif byte == 0xF0 or byte == 0xF7:
+                length, pos = _read_varlen(data, pos, end)
+                pos += length
+                continue
+            else:
+                raise MidiParseError(f'지원하지 않는 상태 바이트입니다: 0x{byte:02X}')
+        elif status is None:
+            raise MidiParseError('running status 이전에 상태 바이트가 없습니다')
+
+        kind = status & 0xF0
+        size = CHANNEL_DATA_LENGTHS[kind]
+        if pos + size > end:
+            raise MidiParseError('채널 메시지가 트랙 끝에서 잘렸습니다')
+
+        if kind == 0x90 or kind == 0x80:
+            note = data[pos]
+            velocity = data[pos + 1]
+            times.append(tick)
+            notes.append(note)
+            velocities.append(velocity)
+            channels.append(status & 0x0F)
+            if kind == 0x90 and velocity > 0:
+                kinds.append(NOTE_ON)
+                note_count += 1
+            else:
+                kinds.append(NOTE_OFF)
+        pos += size
+
+    track.note_count = note_count
+
+def parse_midi(midi_data):
+    """MIDI 바이트를 한 번 훑어 ParsedMidi 반환"""
+    data = memoryview(midi_data)
+    size = len(data)
+
+    if size < 14 or data[0:4] != b'MThd':
+        raise MidiParseError('MIDI 파일이 아닙니다 (MThd 헤더 없음)')
+    header_length = int.from_bytes(data[4:8], 'big')
+    if header_length < 6 or 8 + header_length > size:
+        raise MidiParseError('MThd 헤더 길이가 잘못되었습니다')
+    midi_format = int.from_bytes(data[8:10], 'big')
+    division = int.from_bytes(data[12:14], 'big')
+    if division & 0x8000:
+        raise MidiParseError('SMPTE 시간 단위 MIDI 파일은 지원하지 않습니다')
+
+    parsed = ParsedMidi(midi_format, division)
+    pos = 8 + header_length
+    while pos + 8 <= size:
+        chunk_type = data[pos:pos + 4]
+        length = int.from_bytes(data[pos + 4:pos + 8], 'big')
+        start = pos + 8
+        end = min(start + length, size)
+        if chunk_type == b'MTrk':
+            track = ParsedTrack(len(parsed.tracks))
+            _parse_track(data, start, end, track, parsed.tempos, parsed.time_signatures, parsed.key_signatures)
+            parsed.tracks.append(track)
+        # 알 수 없는 청크는 건너뜀
+        pos = start + length
+
+    parsed.tempos.sort(key=lambda x: x[0])
+    parsed.time_signatures.sort(key=lambda x: x[0])
+    parsed.key_signatures.sort(key=lambda x: x[0])
+    return parsed
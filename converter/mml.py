@@ -0,0 +1,121 @@
+"""MML 해석기: 마비노기 MML 문자열 -> 음표 목록 (서버 측 미리듣기/결과 확인용)
+
+지원 명령어: 음표 A-G(+/#/-, 길이, 점), 쉼표 R, L(기본 길이), O(옥타브), > <, V(볼륨 0-15),
+T(템포), &(타이). 대소문자와 공백은 구분하지 않음.
+같은 음끼리의 타이는 한 음표로 합치고, 템포가 바뀌면 그 뒤 길이부터 새 템포로 계산함.
+"""
+import re
+
+DEFAULT_TEMPO = 120  # 마비노기 기본값 (T120, L4, O4, V8)
+DEFAULT_LENGTH = 4
+DEFAULT_OCTAVE = 4
+DEFAULT_VOLUME = 8
+MAX_LENGTH_VALUE = 64
+
+NOTE_OFFSETS = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+_TOKEN = re.compile(
+    r'\s*(?:'
+    r'([A-G])([+#-]?)(\d*)(\.?)'  # 음표
+    r'|(R)(\d*)(\.?)'  # 쉼표
+    r'|([LOVT])(\d+)(\.?)'  # 값을 받는 명령어
+    r'|([<>&])'
+    r')\s*',
+    re.IGNORECASE,
+)
+
+class MmlNote:
+    """해석한 음표 하나 (시간은 초, 박자는 4분음표 단위)"""
+
+    __slots__ = ('start', 'duration', 'beat', 'beats', 'pitch', 'volume')
+
+    def __init__(self, start, duration, beat, beats, pitch, volume):
+        self.start = start
+        self.duration = duration
+        self.beat = beat
+        self.beats = beats
+        self.pitch = pitch  # MIDI 음 번호 (O4C = 60)
+        self.volume = volume
+
+    def __repr__(self):
+        return f'MmlNote(start={self.start:.3f}, duration={self.duration:.3f}, pitch={self.pitch}, volume={self.volume})'
+
+class MmlPart:
+    """MML 파트 하나의 음표 목록과 전체 길이 (마지막 쉼표 포함)"""
+
+    __slots__ = ('notes', 'seconds', 'beats')
+
+    def __init__(self, notes, seconds, beats):
+        self.notes = notes
+        self.seconds = seconds
+        self.beats = beats
+
+def length_beats(value, dotted):
+    """길이 값(4, 8, ...)과 점 -> 4분음표 기준 박자 수"""
+    if not 1 <= value <= MAX_LENGTH_VALUE:
+        raise ValueError(f'지원하지 않는 음표 길이입니다: {value}')
+    beats = 4 / value
+    return beats * 1.5 if dotted else beats
+
+def parse_mml(text):
+    """MML 문자열 -> MmlPart (잘못된 명령어가 있으면 위치와 함께 ValueError)"""
+    notes = []
+    seconds = 0.0
+    beat = 0.0
+    tempo = DEFAULT_TEMPO
+    default_beats = length_beats(DEFAULT_LENGTH, False)
+    octave = DEFAULT_OCTAVE
+    volume = DEFAULT_VOLUME
+    tie = False
+    position = 0
+    size = len(text)
+    while position < size:
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f'MML을 해석할 수 없습니다 ({position + 1}번째 글자: {text[position:position + 10]!r})')
+        position = match.end()
+        name, accidental, value, dot, rest, rest_value, rest_dot, command, argument, command_dot, symbol = match.groups()
+
+        if name or rest:
+            if rest:
+                value, dot = rest_value, rest_dot
+            if value:
+                beats = length_beats(int(value), dot)
+            else:
+                beats = default_beats * 1.5 if dot else default_beats
+            duration = beats * 60 / tempo
+            if name:
+                pitch = (octave + 1) * 12 + NOTE_OFFSETS[name.upper()]
+                if accidental in ('+', '#'):
+                    pitch += 1
+                elif accidental == '-':
+                    pitch -= 1
+                previous = notes[-1] if notes else None
+                if tie and previous is not None and previous.pitch == pitch and previous.beat + previous.beats == beat:
+                    previous.duration += duration
+                    previous.beats += beats
+                else:
+                    notes.append(MmlNote(seconds, duration, beat, beats, pitch, volume))
+            seconds += duration
+            beat += beats
+            tie = False
+        elif command:
+            command = command.upper()
+            number = int(argument)
+            if command == 'L':
+                default_beats = length_beats(number, command_dot)
+            elif command == 'O':
+                octave = number
+            elif command == 'V':
+                volume = min(number, 15)
+            else:
+                if number <= 0:
+                    raise ValueError('템포는 0보다 커야 합니다')
+                tempo = number
+        elif symbol == '>':
+            octave += 1
+        elif symbol == '<':
+            octave -= 1
+        else:
+            tie = True
+    return MmlPart(notes, seconds, beat)
@@ -0,0 +1,181 @@
+"""조각 단위로 읽는 multipart/form-data 파서 (서버리스 핸들러와 ASGI 앱 공용)
+
+본문 전체를 한 번에 읽어 경계로 split하면 파트마다 복사본이 생기므로, 소켓에서 조각씩 읽으며
+경계를 찾고 MIDI 파일 파트의 내용만 bytearray 하나에 이어 붙임 (다른 파트는 버림).
+경계가 두 조각에 걸쳐 있을 수 있으므로 조각 끝의 (경계 길이 - 1) 바이트는 다음 조각과 합쳐 다시 찾음.
+크기 제한은 Content-Length와 실제로 읽은 바이트 수 양쪽에서 확인함.
+"""
+import re
+
+MAX_UPLOAD_SIZE = 16 * 1024 * 1024  # 업로드 최대 크기 (Flask MAX_CONTENT_LENGTH와 같음)
+CHUNK_SIZE = 64 * 1024
+MAX_HEADER_SIZE = 16 * 1024  # 파트 헤더 최대 크기
+
+MIDI_CONTENT_TYPES = ('audio/midi', 'audio/mid', 'audio/x-midi', 'application/x-midi')
+MIDI_EXTENSIONS = ('.mid', '.midi')
+
+_PARAM = re.compile(r';\s*([\w*-]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+
+class MultipartError(ValueError):
+    """잘못된 멀티파트 본문"""
+
+class PayloadTooLarge(MultipartError):
+    """본문이 크기 제한을 넘음"""
+
+def header_params(value):
+    """'form-data; name="file"; filename="a.mid"' -> ('form-data', {'name': 'file', 'filename': 'a.mid'})"""
+    main, _, _ = value.partition(';')
+    params = {}
+    for key, raw in _PARAM.findall(value):
+        raw = raw.strip()
+        if raw.startswith('"'):
+            raw = re.sub(r'\\(.)', r'\1', raw[1:-1])
+        params[key.lower()] = raw
+    return main.strip().lower(), params
+
+def boundary_of(content_type):
+    """Content-Type 헤더의 경계 문자열 -> bytes (없거나 잘못되면 MultipartError)"""
+    kind, params = header_params(content_type)
+    boundary = params.get('boundary', '')
+    if kind != 'multipart/form-data' or not 1 <= len(boundary) <= 70:
+        raise MultipartError('multipart/form-data 경계가 없습니다')
+    return boundary.encode('latin-1')
+
+def parse_part_headers(raw):
+    """파트 헤더 바이트 -> {'name', 'filename', 'content_type'}"""
+    fields = {}
+    for line in bytes(raw).decode('utf-8', 'replace').split('\r\n'):
+        key, colon, value = line.partition(':')
+        if colon:
+            fields[key.strip().lower()] = value.strip()
+    _, disposition = header_params(fields.get('content-disposition', ''))
+    content_type, _ = header_params(fields.get('content-type', ''))
+    return {
+        'name': disposition.get('name'),
+        'filename': disposition.get('filename'),
+        'content_type': content_type,
+    }
+
+def is_midi_part(part):
+    """파일 파트이면서 MIDI 형식(Content-Type 또는 확장자)인지"""
+    filename = part['filename']
+    if not filename:
+        return False
+    return part['content_type'] in MIDI_CONTENT_TYPES or filename.lower().endswith(MIDI_EXTENSIONS)
+
+# 파서 상태
+_DATA = 0  # 경계를 찾는 중 (preamble 또는 파트 내용)
+_DELIMITER = 1  # 경계 바로 뒤 ('--'이면 본문 끝)
+_HEADERS = 2  # 파트 헤더를 읽는 중
+
+class FilePartParser:
+    """조각을 받을 때마다(feed) 경계를 찾아 accept를 만족하는 첫 파일 파트를 모으는 파서
+
+    소켓에서 직접 읽는 핸들러(read_file_part)와 ASGI처럼 조각을 넘겨받는 서버가 함께 씀.
+    받은 바이트 수가 max_size를 넘으면 PayloadTooLarge.
+    """
+
+    __slots__ = ('delimiter', 'accept', 'max_size', 'received', 'buffer', 'state', 'part', 'content', 'done')
+
+    def __init__(self, boundary, accept=is_midi_part, max_size=MAX_UPLOAD_SIZE):
+        self.delimiter = b'\r\n--' + boundary
+        self.accept = accept
+        self.max_size = max_size
+        self.received = 0
+        self.buffer = bytearray(b'\r\n')  # 첫 경계 앞에는 CRLF가 없으므로 붙여서 같은 방식으로 찾음
+        self.state = _DATA
+        self.part = None  # 현재 파트 정보 (None이면 preamble)
+        self.content = None  # accept된 파트의 내용
+        self.done = False
+
+    def feed(self, chunk):
+        """조각 하나 처리 -> 끝났는지 (원하는 파일 파트를 다 읽었거나 본문이 끝남)"""
+        if self.done:
+            return True
+        self.received += len(chunk)
+        if self.received > self.max_size:
+            raise PayloadTooLarge(f'파일이 너무 큽니다 (최대 {self.max_size // (1024 * 1024)}MB)')
+        self.buffer += chunk
+        while not self.done and self._step():
+            pass
+        return self.done
+
+    def result(self):
+        """(파트 정보, 내용 bytearray) 또는 None (본문이 끝나기 전이면 MultipartError)"""
+        if not self.done:
+            raise MultipartError('멀티파트 본문이 끝나지 않았습니다')
+        return None if self.content is None else (self.part, self.content)
+
+    def _step(self):
+        """버퍼에서 처리할 수 있는 만큼 한 단계 진행 -> 더 진행할 수 있는지"""
+        buffer = self.buffer
+        if self.state == _DATA:
+            # 경계를 못 찾으면 경계가 걸쳐 있을 수 있는 끝부분만 남기고 앞부분을 내보냄
+            index = buffer.find(self.delimiter)
+            if index < 0:
+                cut = len(buffer) - len(self.delimiter) + 1
+                if cut > 0:
+                    self._take(cut)
+                    del buffer[:cut]
+                return False
+            if self.content is not None:
+                self._take(index)
+                self.done = True
+                return False
+            del buffer[:index + len(self.delimiter)]
+            self.state = _DELIMITER
+            return True
+
+        if self.state == _DELIMITER:
+            if len(buffer) < 2:
+                return False
+            if buffer[:2] == b'--':
+                self.done = True
+                return False
+            self.state = _HEADERS
+            return True
+
+        end = buffer.find(b'\r\n\r\n')
+        if end < 0:
+            if len(buffer) > MAX_HEADER_SIZE:
+                raise MultipartError('파트 헤더가 너무 깁니다')
+            return False
+        self.part = parse_part_headers(buffer[:end])
+        del buffer[:end + 4]
+        if self.accept(self.part):
+            self.content = bytearray()
+        self.state = _DATA
+        return True
+
+    def _take(self, size):
+        if self.content is not None:
+            with memoryview(self.buffer) as view:
+                self.content += view[:size]
+
+def read_file_part(stream, content_type, content_length, accept=is_midi_part,
+                   max_size=MAX_UPLOAD_SIZE, chunk_size=CHUNK_SIZE):
+    """본문을 stream에서 조각 단위로 읽어 accept를 만족하는 첫 파일 파트 -> (파트 정보, 내용 bytearray) 또는 None
+
+    내용은 조각에서 bytearray로 바로 이어 붙이므로 parse_midi에 그대로 넘길 수 있음.
+    Content-Length가 없으면 MultipartError, max_size를 넘으면 읽기 전에 PayloadTooLarge.
+    """
+    if content_length is None:
+        raise MultipartError('Content-Length가 필요합니다')
+    if content_length > max_size:
+        raise PayloadTooLarge(f'파일이 너무 큽니다 (최대 {max_size // (1024 * 1024)}MB)')
+    parser = FilePartParser(boundary_of(content_type), accept, max_size)
+    remaining = content_length
+    while remaining > 0:
+        chunk = stream.read(min(chunk_size, remaining))
+        if not chunk:
+            raise MultipartError('본문이 Content-Length보다 일찍 끝났습니다')
+        remaining -= len(chunk)
+        if parser.feed(chunk):
+            break
+    # 남은 본문은 읽어 버림 (읽지 않은 데이터가 남은 채로 소켓을 닫으면 응답이 끊길 수 있음)
+    while remaining > 0:
+        chunk = stream.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+    return parser.result()
@@ -0,0 +1,87 @@
+"""note_on/note_off 짝짓기와 노트 길이 조회"""
+from array import array
+from collections import deque
+
+class NoteTable:
+    """note_on/note_off를 시간순으로 받아 짝지은 노트 테이블
+
+    음높이별 큐로 열린 노트를 추적하므로 각 노트의 길이를 O(1)로 구할 수 있음.
+    같은 음을 끝나기 전에 다시 치면 note_off는 먼저 시작한 노트부터 끝냄 (선입선출).
+    """
+
+    __slots__ = ('start', 'end', 'pitch', 'velocity', 'open_notes', 'open_count', 'max_polyphony')
+
+    def __init__(self):
+        self.start = array('q')
+        self.end = array('q')
+        self.pitch = array('B')
+        self.velocity = array('B')
+        self.open_notes = {}  # 음높이별로 아직 끝나지 않은 노트 (시작순) {pitch: deque([index, ...])}
+        self.open_count = 0  # 현재 울리고 있는 노트 수
+        self.max_polyphony = 0  # 동시에 울린 최대 노트 수
+
+    def __len__(self):
+        return len(self.start)
+
+    def add_note_on(self, time, note, velocity):
+        """노트 시작 추가 -> 테이블 인덱스"""
+        index = len(self.start)
+        self.start.append(time)
+        self.end.append(-1)
+        self.pitch.append(note)
+        self.velocity.append(velocity)
+        open_notes = self.open_notes.get(note)
+        if open_notes is None:
+            open_notes = self.open_notes[note] = deque()
+        open_notes.append(index)
+        self.open_count += 1
+        if self.open_count > self.max_polyphony:
+            self.max_polyphony = self.open_count
+        return index
+
+    def add_note_off(self, time, note):
+        """노트 종료 추가 (같은 음높이에서 가장 먼저 시작해 아직 끝나지 않은 노트와 짝지음)"""
+        open_notes = self.open_notes.get(note)
+        if open_notes:
+            self.end[open_notes.popleft()] = time
+            self.open_count -= 1
+
+    def durations(self):
+        """모든 노트의 길이(틱) 목록, 끝나지 않은 노트는 0"""
+        return [end - start if end > start else 0 for start, end in zip(self.start, self.end)]
+
+class LastNote:
+    """마지막으로 출력한 음표 정보 (타이 노트 처리용, 음표마다 새로 만들지 않고 갱신)"""
+
+    __slots__ = ('notes', 'time', 'length', 'name')
+
+    def __init__(self):
+        self.notes = ()  # 단일 음은 (note,), 화음은 (low, high)
+        self.time = 0
+        self.length = 0
+        self.name = ''
+
+    def update(self, notes, time, length, name):
+        self.notes = notes
+        self.time = time
+        self.length = length
+        self.name = name
+
+def build_note_table(events):
+    """note_on/note_off 이벤트를 한 번에 짝지어 노트 테이블 생성
+
+    note_on 이벤트에는 테이블 인덱스('index')를 기록함.
+    """
+    note_table = NoteTable()
+    for event in events:
+        if event['type'] == 'note_on':
+            event['index'] = note_table.add_note_on(event['time'], event['note'], event['velocity'])
+        else:
+            note_table.add_note_off(event['time'], event['note'])
+    return note_table
+
+def note_duration_of(note_table, index):
+    """노트 테이블에서 노트 길이(틱) 조회, 끝나지 않은 노트는 0"""
+    end = note_table.end[index]
+    start = note_table.start[index]
+    return end - start if end > start else 0
@@ -0,0 +1,103 @@
+"""파트/파일 단위 병렬 변환용 프로세스 풀
+
+멜로디/화음 파트(배치 변환에서는 파일 전체)를 별도 프로세스에서 동시에 변환함.
+작업자 수는 고정(bounded)이고, start()에서 작업자를 모두 띄워 converter 모듈을 미리
+import해 두므로 첫 요청부터 프로세스 생성/모듈 로드 비용이 없음.
+서버리스 핸들러처럼 풀을 쓰지 않으면 engine이 같은 작업을 현재 프로세스에서 실행함.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+def _warm_up():
+    """작업자 초기화: 변환 모듈과 기본 길이 테이블을 미리 로드"""
+    from . import engine
+    from .quantize import get_quantizer
+    get_quantizer(480)
+    return engine.__name__
+
+def _ping():
+    return os.getpid()
+
+class PartPool:
+    """미리 띄워 두는 고정 크기 변환 프로세스 풀"""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+        self._counters = {'tasks': 0, 'fallbacks': 0, 'restarts': 0}
+
+    def start(self):
+        """작업자를 모두 띄우고 초기화가 끝날 때까지 대기 (이미 시작했으면 그대로)"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_up)
+                for future in [self._executor.submit(_ping) for _ in range(self.max_workers)]:
+                    future.result()
+        return self
+
+    def submit(self, func, *args):
+        """작업 하나 제출 -> Future (풀이 깨져 있으면 새로 띄운 뒤 제출)"""
+        with self._lock:
+            self._counters['tasks'] += 1
+        try:
+            return self.start()._executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._reset()
+            return self.start()._executor.submit(func, *args)
+
+    def map(self, func, jobs):
+        """jobs([(인자, ...), ...])를 병렬로 실행해 순서대로 결과 목록 반환
+
+        작업자 프로세스가 죽어 풀이 깨지면 풀을 새로 만들고, 이번 작업은 현재 프로세스에서 실행함.
+        """
+        try:
+            futures = [self.submit(func, *args) for args in jobs]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            self._reset()
+            with self._lock:
+                self._counters['fallbacks'] += 1
+            return [func(*args) for args in jobs]
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._counters['restarts'] += 1
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, workers=self.max_workers, running=self._executor is not None)
+
+def pool_from_env():
+    """환경 변수로 변환 프로세스 풀 생성 (작업자는 start() 또는 첫 작업 때 띄움)
+
+    MML_WORKERS: 작업자 프로세스 수 (0 또는 미설정이면 풀 없이 현재 프로세스에서 변환)
+    """
+    workers = int(os.environ.get('MML_WORKERS', 0))
+    if workers <= 0:
+        return None
+    return PartPool(max_workers=workers)
+
+def batch_pool_from_env(pool=None):
+    """일괄 변환용 프로세스 풀 (pool이 있으면 그대로 쓰고, 없으면 일괄 변환 전용 풀을 새로 만듦)
+
+    MML_BATCH_WORKERS: 전용 풀의 작업자 프로세스 수 (기본 CPU 수, 1 이하면 풀 없이 현재 프로세스에서 차례로)
+    전용 풀의 작업자는 첫 일괄 변환 때 띄우므로 일괄 변환을 쓰지 않으면 프로세스를 만들지 않음.
+    """
+    if pool is not None:
+        return pool
+    workers = int(os.environ.get('MML_BATCH_WORKERS') or os.cpu_count() or 1)
+    if workers <= 1:
+        return None
+    return PartPool(max_workers=workers)
@@ -0,0 +1,45 @@
+"""emit 루프 전에 트랙별 노트 값을 한 번에 계산 (순수 파이썬 구현)"""
+import math
+
+from .chords import CHORD_WINDOW_BEATS, build_chord_index
+from .midiparse import NOTE_ON
+
+class PreparedTrack:
+    """emit 루프 전에 한 번에 계산해 두는 트랙별 값 (노트 테이블 인덱스/이벤트 인덱스 순 리스트)"""
+
+    __slots__ = ('note_durations', 'note_lengths', 'volumes', 'next_on_times', 'chord_index')
+
+    def __init__(self, note_durations, note_lengths, volumes, next_on_times, chord_index):
+        self.note_durations = note_durations  # 노트 길이(틱)
+        self.note_lengths = note_lengths  # 양자화된 MML 길이 토큰
+        self.volumes = volumes  # MML 볼륨 (1-15)
+        self.next_on_times = next_on_times  # 각 이벤트 이후 처음 나오는 note_on 시간 (없으면 None)
+        self.chord_index = chord_index  # 화음 그룹 인덱스 (chords.ChordIndex)
+
+def velocity_to_volume(velocity):
+    """MIDI 벨로시티를 MML 볼륨(1-15)으로 변환"""
+    return max(1, min(15, math.ceil(velocity / 8)))
+
+def prepare_track(track, ticks_per_beat, quantizer):
+    """TrackAnalysis에서 PreparedTrack 계산 (순수 파이썬)"""
+    event_times = track.event_times
+    event_kinds = track.event_kinds
+    note_table = track.note_table
+    
+    # 모든 노트 길이를 한 번에 양자화 (노트 테이블 인덱스 순)
+    note_durations = note_table.durations()
+    note_lengths = quantizer.quantize_many(note_durations)
+    volumes = [velocity_to_volume(velocity) for velocity in note_table.velocity]
+    
+    # 각 이벤트 이후 처음 나오는 note_on 시간 (역방향 한 번 순회)
+    next_on_times = [None] * len(event_times)
+    next_on_time = None
+    for idx in range(len(event_times) - 1, -1, -1):
+        next_on_times[idx] = next_on_time
+        if event_kinds[idx] == NOTE_ON:
+            next_on_time = event_times[idx]
+    
+    # 화음 추출 - 정해진 시간 간격(0.05박) 내에 시작하는 노트를 화음으로 그룹화
+    chord_index = build_chord_index(note_table.start, CHORD_WINDOW_BEATS * ticks_per_beat)
+    
+    return PreparedTrack(note_durations, note_lengths, volumes, next_on_times, chord_index)
@@ -0,0 +1,88 @@
+"""MIDI 틱 길이를 MML 음표 길이로 양자화
+
+파일(ticks_per_beat)마다 한 번 경계값을 계산해 두고, 각 길이는 이진 탐색으로 찾음.
+"""
+import math
+from bisect import bisect_right
+from functools import lru_cache
+
+# 마비노기 MML 기본 음표 길이 (4분음표 대비 길이, 우선순위 순)
+# 거리가 같으면 앞에 있는 길이를 고름
+STANDARD_LENGTHS = (
+    ('1', 4.0),     # 온음표(1분음표)는 4분음표의 4배
+    ('2', 2.0),     # 2분음표는 4분음표의 2배
+    ('4', 1.0),     # 4분음표
+    ('8', 0.5),     # 8분음표는 4분음표의 1/2
+    ('16', 0.25),   # 16분음표는 4분음표의 1/4
+    ('32', 0.125),  # 32분음표는 4분음표의 1/8
+    ('2.', 3.0),    # 점2분음표 (2분음표 + 4분음표)
+    ('4.', 1.5),    # 점4분음표 (4분음표 + 8분음표)
+    ('8.', 0.75),   # 점8분음표 (8분음표 + 16분음표)
+    ('16.', 0.375)  # 점16분음표 (16분음표 + 32분음표)
+)
+
+# 선택적으로 추가할 수 있는 길이
+SIXTY_FOURTH_LENGTHS = (
+    ('64', 0.0625),  # 64분음표
+)
+TRIPLET_LENGTHS = (
+    ('3', 4.0 / 3),   # 2분음표 셋잇단
+    ('6', 2.0 / 3),   # 4분음표 셋잇단
+    ('12', 1.0 / 3),  # 8분음표 셋잇단
+    ('24', 1.0 / 6),  # 16분음표 셋잇단
+)
+
+def length_set(allow_64th=False, allow_triplets=False):
+    """옵션에 맞는 음표 길이 목록 반환"""
+    lengths = STANDARD_LENGTHS
+    if allow_64th:
+        lengths += SIXTY_FOURTH_LENGTHS
+    if allow_triplets:
+        lengths += TRIPLET_LENGTHS
+    return lengths
+
+class Quantizer:
+    """틱 길이 -> MML 길이 토큰 변환기 (ticks_per_beat별로 한 번 생성)"""
+
+    __slots__ = ('ticks_per_beat', 'lengths', 'tokens', 'thresholds')
+
+    def __init__(self, ticks_per_beat, lengths=STANDARD_LENGTHS):
+        self.ticks_per_beat = ticks_per_beat
+        self.lengths = tuple(lengths)
+
+        # 길이 순으로 정렬한 토큰과, 이웃한 두 길이 사이의 경계 틱
+        # (경계 이상이면 더 긴 쪽 토큰) - 경계는 정수 틱 기준으로 closest()와 정확히 일치
+        by_value = sorted(self.lengths, key=lambda x: x[1])
+        values = dict(self.lengths)
+        self.tokens = [token for token, _ in by_value]
+        self.thresholds = []
+        for (_, low), (_, high) in zip(by_value, by_value[1:]):
+            tick = math.floor((low + high) / 2 * ticks_per_beat) - 1
+            upper = math.ceil(high * ticks_per_beat)
+            while tick < upper and values[self.closest(tick)] < high:
+                tick += 1
+            self.thresholds.append(tick)
+
+    def closest(self, ticks):
+        """기준 구현: 모든 길이와 거리를 비교해 가장 가까운 토큰 (경계 계산용)"""
+        relative_length = ticks / self.ticks_per_beat
+        return min(self.lengths, key=lambda x: abs(x[1] - relative_length))[0]
+
+    def quantize(self, ticks):
+        """틱 길이 하나를 MML 길이 토큰으로 변환"""
+        return self.tokens[bisect_right(self.thresholds, ticks)]
+
+    def quantize_many(self, durations):
+        """틱 길이 목록을 한 번에 변환"""
+        tokens = self.tokens
+        thresholds = self.thresholds
+        return [tokens[bisect_right(thresholds, ticks)] for ticks in durations]
+
+@lru_cache(maxsize=64)
+def get_quantizer(ticks_per_beat, allow_64th=False, allow_triplets=False):
+    """ticks_per_beat와 길이 옵션별로 공유하는 Quantizer"""
+    return Quantizer(ticks_per_beat, length_set(allow_64th, allow_triplets))
+
+def get_note_length(ticks, ticks_per_beat):
+    """MIDI 틱을 MML 음표 길이로 변환 (기본 길이 목록 사용)"""
+    return get_quantizer(ticks_per_beat).quantize(ticks)
@@ -0,0 +1,149 @@
+"""MML 미리듣기 렌더러: 파트별 MML을 섞어 16비트 모노 WAV로 (NumPy 필요)
+
+음표마다 배음을 더한 발진기와 ADSR 엔벨로프를 배열 연산으로 합성함.
+블록(기본 0.5초) 단위로 그 구간에 울리는 음표만 합성해 바로 내보내므로, 곡이 길어도
+메모리는 블록 하나 크기만큼만 쓰고 첫 블록부터 바로 재생할 수 있음.
+WAV 헤더의 길이는 해석 단계에서 미리 알 수 있으므로 스트리밍 중에도 정확한 값을 씀.
+최대 재생 길이는 배포마다 MML_RENDER_SECONDS로 정하고, 응답을 통째로 담아 보내는 서버리스 핸들러는
+max_bytes로 WAV 크기도 제한함.
+"""
+import importlib.util
+import math
+import os
+import struct
+
+from .engine import MAX_PARTS, PARTS, part_names
+from .mml import parse_mml
+
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+RENDER_PARTS = part_names(MAX_PARTS)  # melody, harmony1 ... harmony7 (요청에 있는 파트만 섞음)
+SAMPLE_RATES = (8000, 11025, 16000, 22050, 44100)
+DEFAULT_SAMPLE_RATE = 22050
+BLOCK_SECONDS = 0.5
+MAX_MML_LENGTH = 20000  # 파트 하나의 최대 글자 수
+MAX_RENDER_SECONDS = 10 * 60  # 기본 최대 재생 길이 (초, MML_RENDER_SECONDS로 조정)
+
+ATTACK = 0.005  # 엔벨로프 (초)
+DECAY = 0.08
+SUSTAIN = 0.6  # 최대 음량 대비 지속 음량
+RELEASE = 0.05
+HARMONICS = ((1, 1.0), (2, 0.35), (3, 0.15), (4, 0.05))  # (배음 차수, 세기)
+VOICE_GAIN = 0.3  # V15 음표 하나의 최대 진폭 (파트 3개가 겹쳐도 넘치지 않도록)
+MIX_PARTS = len(PARTS)  # VOICE_GAIN을 맞춘 파트 수 (더 많으면 그 비율만큼 전체 음량을 줄임)
+
+np = None
+
+def _load_numpy():
+    global np
+    if np is None:
+        if not HAS_NUMPY:
+            raise RuntimeError('미리듣기 렌더링에는 NumPy가 필요합니다')
+        import numpy
+        np = numpy
+
+def render_options(fields):
+    """요청 필드(melody/harmony1.../sample_rate) -> (MML 문자열 목록, 샘플레이트), 잘못되면 ValueError"""
+    parts = [fields.get(name) or '' for name in RENDER_PARTS]
+    if not any(parts):
+        raise ValueError('재생할 MML이 없습니다')
+    if any(not isinstance(part, str) or len(part) > MAX_MML_LENGTH for part in parts):
+        raise ValueError(f'MML은 파트마다 {MAX_MML_LENGTH}자까지 재생할 수 있습니다')
+    try:
+        sample_rate = int(fields.get('sample_rate') or DEFAULT_SAMPLE_RATE)
+    except (TypeError, ValueError):
+        sample_rate = None
+    if sample_rate not in SAMPLE_RATES:
+        raise ValueError(f"sample_rate는 {', '.join(map(str, SAMPLE_RATES))} 중 하나여야 합니다")
+    return parts, sample_rate
+
+def wav_header(sample_count, sample_rate):
+    """16비트 모노 PCM WAV 헤더 (44바이트)"""
+    data_size = sample_count * 2
+    return struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, 1,
+                       sample_rate, sample_rate * 2, 2, 16, b'data', data_size)
+
+def _synthesize(note, first, last, sample_rate):
+    """음표 시작 기준 [first, last) 샘플 구간의 파형"""
+    t = np.arange(first, last) / sample_rate
+    duration = note.duration
+    # ADSR: 음표가 짧으면 감쇠 도중에 release로 넘어감
+    times = [0.0, ATTACK, ATTACK + DECAY]
+    levels = [0.0, 1.0, SUSTAIN]
+    held = float(np.interp(duration, times, levels))
+    points = [(time, level) for time, level in zip(times, levels) if time < duration]
+    points += [(duration, held), (duration + RELEASE, 0.0)]
+    envelope = np.interp(t, [time for time, _ in points], [level for _, level in points])
+
+    phase = t * (2 * math.pi * 440.0 * 2 ** ((note.pitch - 69) / 12))
+    wave = np.zeros(len(t))
+    for order, strength in HARMONICS:
+        wave += strength * np.sin(order * phase)
+    gain = VOICE_GAIN * note.volume / 15 / sum(strength for _, strength in HARMONICS)
+    return wave * envelope * gain
+
+def render_blocks(parts, sample_rate=DEFAULT_SAMPLE_RATE, block_seconds=BLOCK_SECONDS):
+    """MmlPart 목록 -> 16비트 PCM 블록(bytes)을 차례로 yield (전체 샘플 수는 total_samples)"""
+    _load_numpy()
+    notes = sorted((note for part in parts for note in part.notes), key=lambda note: note.start)
+    total = total_samples(parts, sample_rate)
+    scale = min(1.0, MIX_PARTS / max(1, sum(1 for part in parts if part.notes)))
+    block_size = max(1, int(sample_rate * block_seconds))
+    active = []
+    next_note = 0
+    for block_start in range(0, total, block_size):
+        block_end = min(block_start + block_size, total)
+        # 이번 블록 안에서 시작하는 음표를 울리는 음표 목록에 추가
+        while next_note < len(notes) and round(notes[next_note].start * sample_rate) < block_end:
+            active.append(notes[next_note])
+            next_note += 1
+
+        mix = np.zeros(block_end - block_start)
+        ringing = []
+        for note in active:
+            first = round(note.start * sample_rate)
+            last = first + math.ceil((note.duration + RELEASE) * sample_rate)
+            low = max(first, block_start)
+            high = min(last, block_end)
+            if low < high:
+                mix[low - block_start:high - block_start] += _synthesize(note, low - first, high - first, sample_rate)
+            if last > block_end:
+                ringing.append(note)
+        active = ringing
+        if scale < 1.0:
+            mix *= scale
+        yield (np.clip(mix, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+def total_samples(parts, sample_rate):
+    """가장 긴 파트가 끝나고 마지막 음의 release까지 담는 샘플 수"""
+    return math.ceil((max(part.seconds for part in parts) + RELEASE) * sample_rate)
+
+def render_seconds_from_env(default=MAX_RENDER_SECONDS):
+    """MML_RENDER_SECONDS: 미리듣기 최대 재생 길이 (초, 없으면 default)"""
+    return float(os.environ.get('MML_RENDER_SECONDS') or default)
+
+def render_wav(mml_parts, sample_rate=DEFAULT_SAMPLE_RATE, max_seconds=MAX_RENDER_SECONDS, max_bytes=None):
+    """MML 문자열 목록 -> (WAV 전체 바이트 수, 헤더부터 바이트 조각을 내는 generator)
+
+    MML 해석과 길이 확인은 바로 하므로 잘못된 입력은 응답을 시작하기 전에 ValueError로 알 수 있음.
+    재생 길이가 max_seconds를 넘으면 ValueError. max_bytes가 있으면 그 크기에 들어가는 가장 높은 샘플레이트
+    (sample_rate 이하)로 낮추고, 가장 낮은 샘플레이트로도 넘으면 ValueError (헤더에는 실제 샘플레이트를 씀).
+    """
+    _load_numpy()
+    parts = [parse_mml(text) for text in mml_parts]
+    seconds = max(part.seconds for part in parts)
+    if seconds > max_seconds:
+        raise ValueError(f'재생 길이가 너무 깁니다 (최대 {max_seconds:g}초)')
+    sample_count = total_samples(parts, sample_rate)
+    if max_bytes is not None and 44 + sample_count * 2 > max_bytes:
+        fitting = [rate for rate in SAMPLE_RATES if rate < sample_rate and 44 + total_samples(parts, rate) * 2 <= max_bytes]
+        if not fitting:
+            raise ValueError(f'미리듣기 WAV가 너무 큽니다 (최대 {max_bytes // (1024 * 1024)}MB)')
+        sample_rate = fitting[-1]
+        sample_count = total_samples(parts, sample_rate)
+
+    def generate():
+        yield wav_header(sample_count, sample_rate)
+        yield from render_blocks(parts, sample_rate)
+
+    return 44 + sample_count * 2, generate()
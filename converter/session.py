@@ -0,0 +1,250 @@
+"""옵션만 바꾼 재변환 (업로드 한 번, 단계별 중간 결과 재사용)
+
+ConversionSession은 MIDI 파일 하나의 중간 결과를 단계별로 보관하고, 처음 필요할 때 계산함.
+옵션이 바뀌면 그 옵션이 영향을 주는 단계부터만 다시 계산하고 결과는 midi_to_mml과 같음.
+
+    parse: MIDI 파싱, 템포 맵 (옵션과 상관없음)
+    analysis: 파트별 원본 트랙 선택과 트랙 분석 (allocation, parts, voices 방식은 max_length도)
+    timeline: 길이 양자화와 토큰 생성 (allow_64th, allow_triplets)
+    emit: 글자 수 예산 안에서 MML 문자열로 (max_length, encoder)
+
+예를 들어 tracks 방식에서 max_length나 encoder만 바꾸면 저장된 토큰을 다시 인코딩만 하고, tracks 방식에서 parts를
+늘리면 이미 분석한 트랙은 그대로 쓰고 새로 들어온 트랙만 분석함.
+engine은 계산 방법만 다르고 결과가 같으므로 단계 키에 넣지 않음.
+
+SessionStore는 세션을 토큰(MIDI 바이트 해시)으로 찾는 LRU 저장소이며, 마지막 사용 후 ttl초가 지나면 버림.
+클라이언트는 첫 업로드 응답의 session 토큰으로 파일 없이 다른 옵션의 변환을 요청할 수 있음.
+세션은 이 프로세스의 메모리에만 있으므로 없거나 만료되었으면(다른 서버 인스턴스 등) 파일을 다시 올려야 함.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .analysis import analyze_track, tempo_map
+from .emitter import encode
+from .engine import LEAD_IN, part_names, resolve_options, select_parts
+from .midiparse import parse_midi
+from .quantize import get_quantizer
+from .track import fit_timeline, prepare, timeline_coverage, tokenize_track
+
+DEFAULT_MAX_SESSIONS = 16
+DEFAULT_TTL = 1800  # 초
+
+def session_token(midi_data):
+    """MIDI 바이트 -> 세션 토큰 (같은 파일이면 같은 토큰)"""
+    return hashlib.sha256(midi_data).hexdigest()[:32]
+
+class ConversionSession:
+    """MIDI 파일 하나의 단계별 중간 결과 (여러 요청이 함께 쓰므로 변환은 잠금 안에서)"""
+
+    __slots__ = ('token', 'midi_data', 'used', '_lock', '_parsed', '_selections', '_analyses', '_timelines')
+
+    def __init__(self, midi_data, token=None):
+        self.token = token or session_token(midi_data)
+        self.midi_data = bytes(midi_data)
+        self.used = time.monotonic()  # 마지막으로 저장소에서 꺼낸 시각 (만료 확인용)
+        self._lock = threading.Lock()
+        self._parsed = None  # (ParsedMidi, 템포 변경 목록, 시작 템포)
+        self._selections = {}  # (allocation, parts) -> (파트별 트랙 키, 못 들어간 트랙 수, 빠진 노트 수)
+        self._analyses = {}  # 트랙 키 -> TrackAnalysis
+        self._timelines = {}  # (트랙 키, 화음 여부, allow_64th, allow_triplets) -> track.TrackTimeline
+
+    def convert(self, options=None, timings=None):
+        """midi_to_mml과 같은 결과 (파트 병렬 변환 없이 이 프로세스에서, 저장된 단계는 다시 계산하지 않음)
+
+        timings(timings.Timings)를 넘기면 단계별 시간과 카운터를 채움 (session_reused: 다시 쓴 단계 결과 수)
+        """
+        options = resolve_options(options)
+        with self._lock:
+            return self._convert(options, timings)
+
+    def _convert(self, options, timings):
+        timed = timings is not None
+        reused = 0
+        if timed:
+            timings.start()
+
+        if self._parsed is None:
+            parsed = parse_midi(self.midi_data)
+            self._parsed = (parsed,) + tempo_map(parsed)
+        else:
+            reused += 1
+        parsed, tempo_events, tempo = self._parsed
+        if timed:
+            timings.lap('parse')
+
+        prefix = f"T{tempo}{LEAD_IN}"
+        max_length = options['max_length']
+        budget = max(max_length - len(prefix), 0)
+
+        keys, unused_tracks, unused_notes, selection_reused = self._select(parsed, options, budget)
+        reused += selection_reused
+        if timed:
+            timings.lap('analysis')
+            timings.count('tracks', len(parsed.tracks))
+            timings.count('events', sum(len(track.times) for track in parsed.tracks))
+            timings.count('notes', sum(track.note_count for track in parsed.tracks))
+            timings.count('tracks_unused', unused_tracks)
+            timings.count('notes_dropped', unused_notes)
+
+        quantizer = get_quantizer(parsed.ticks_per_beat, options['allow_64th'], options['allow_triplets'])
+        harmony = options['allocation'] == 'tracks'
+        parts = []
+        for part_index, key in enumerate(keys):
+            mml, coverage, timeline_reused = self._encode(parsed, tempo_events, key, harmony and part_index > 0, quantizer, options, budget, timings)
+            parts.append((mml, coverage))
+            reused += timeline_reused
+
+        names = part_names(options['parts'])
+        parts += [("", 1.0)] * (len(names) - len(parts))
+        result = {name: f"{prefix}{part_mml}"[:max_length] for name, (part_mml, _) in zip(names, parts)}
+        result["coverage"] = {name: round(part_coverage, 3) for name, (_, part_coverage) in zip(names, parts)}
+        if timed:
+            timings.count('chars', sum(len(result[name]) for name in names))
+            timings.count('session_reused', reused)
+            timings.start()
+        return result
+
+    def _select(self, parsed, options, budget):
+        """파트별 트랙 키 선택과 트랙 분석 -> (트랙 키 목록, 못 들어간 트랙 수, 빠진 노트 수, 다시 쓴 결과 수)"""
+        allocation = options['allocation']
+        # 성부 나누기는 글자 수 예산에 따라 달라지므로 예산도 키에 넣음
+        selection_key = (allocation, options['parts'], budget) if allocation == 'voices' else (allocation, options['parts'])
+        selection = self._selections.get(selection_key)
+        if selection is not None:
+            return selection + (1,)
+
+        tracks, unused_tracks, unused_notes = select_parts(parsed, options, budget)
+        reused = 0
+        keys = []
+        for track in tracks:
+            # 성부로 나눈 트랙은 성부 수와 예산마다 다르고, 원본 트랙은 트랙 번호로 구분됨
+            key = selection_key + (track.index,) if allocation == 'voices' else (allocation, track.index)
+            if key in self._analyses:
+                reused += 1
+            else:
+                self._analyses[key] = analyze_track(track)
+            keys.append(key)
+        selection = (tuple(keys), unused_tracks, unused_notes)
+        self._selections[selection_key] = selection
+        return selection + (reused,)
+
+    def _encode(self, parsed, tempo_events, key, is_harmony, quantizer, options, budget, timings):
+        """파트 하나를 예산 안에서 MML로 -> (MML, 담긴 비율, 다시 쓴 결과 수)
+
+        토큰은 처음 만들 때 예산에서 멈출 수 있으므로, 저장된 토큰으로 모자란 더 큰 예산이 오면 끝까지 다시 만듦.
+        """
+        analysis = self._analyses[key]
+        if not analysis.event_times:
+            return "", 1.0, 0
+        encoder = options['encoder']
+        timeline_key = (key, is_harmony, options['allow_64th'], options['allow_triplets'])
+        timeline = self._timelines.get(timeline_key)
+        fitted = None if timeline is None else fit_timeline(timeline, budget, encoder)
+        if fitted is not None:
+            if timings is not None:
+                timings.lap('emit')
+            return fitted[0], timeline_coverage(timeline, fitted[1]), 1
+
+        ticks_per_beat = parsed.ticks_per_beat
+        prepared = prepare(analysis, ticks_per_beat, quantizer, options['engine'])
+        if timings is not None:
+            timings.lap('prepare')
+        tokenize_budget = budget if timeline is None else None
+        new_timeline, encoded = tokenize_track(analysis, ticks_per_beat, prepared, quantizer, is_harmony, tempo_events, parsed.key_signatures, tokenize_budget, encoder)
+        if timings is not None:
+            timings.lap('tokenize')
+        if timeline is None:
+            fitted = encoded or encode(new_timeline.tokens, budget, encoder)
+        else:
+            fitted = fit_timeline(new_timeline, budget, encoder)
+        self._timelines[timeline_key] = new_timeline
+        if timings is not None:
+            timings.lap('emit')
+        return fitted[0], timeline_coverage(new_timeline, fitted[1]), 0
+
+class SessionStore:
+    """토큰으로 찾는 변환 세션 저장소 (LRU, 마지막 사용 후 ttl초가 지나면 만료)
+
+    stats()로 opened/reopened/hits/misses/expired/evictions 카운터를 확인할 수 있음.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_SESSIONS, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # 토큰 -> 세션 (오래 쓰지 않은 것부터)
+        self._lock = threading.Lock()
+        self._counters = {
+            'opened': 0,
+            'reopened': 0,
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+        }
+
+    def open(self, midi_data):
+        """업로드한 MIDI 바이트의 세션 (같은 파일의 세션이 남아 있으면 그 세션)"""
+        token = session_token(midi_data)
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(token)
+            if session is None:
+                session = ConversionSession(midi_data, token)
+                self._sessions[token] = session
+                self._counters['opened'] += 1
+                while len(self._sessions) > self.max_entries:
+                    self._sessions.popitem(last=False)
+                    self._counters['evictions'] += 1
+            else:
+                self._counters['reopened'] += 1
+            self._touch(session)
+            return session
+
+    def get(self, token):
+        """토큰의 세션 반환 (없거나 만료되었으면 None)"""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(token)
+            if session is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+            self._touch(session)
+            return session
+
+    def _touch(self, session):
+        """사용 시각 갱신 (잠금 안에서 호출)"""
+        session.used = time.monotonic()
+        self._sessions.move_to_end(session.token)
+
+    def _expire(self):
+        """ttl이 지난 세션 제거 (잠금 안에서 호출, 사용 순서로 정렬되어 있으므로 앞에서부터)"""
+        deadline = time.monotonic() - self.ttl
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.used > deadline:
+                break
+            self._sessions.popitem(last=False)
+            self._counters['expired'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._sessions)
+            stats['max_entries'] = self.max_entries
+            stats['ttl'] = self.ttl
+            return stats
+
+def sessions_from_env():
+    """환경 변수로 세션 저장소 생성
+
+    MML_SESSION_SIZE: 보관할 세션 수 (0이면 세션 사용 안 함, 기본 16)
+    MML_SESSION_TTL: 마지막 사용 후 세션을 보관할 시간 (초, 기본 1800)
+    """
+    max_entries = int(os.environ.get('MML_SESSION_SIZE', DEFAULT_MAX_SESSIONS))
+    if max_entries <= 0:
+        return None
+    return SessionStore(max_entries=max_entries, ttl=float(os.environ.get('MML_SESSION_TTL', DEFAULT_TTL)))
@@ -0,0 +1,37 @@
+"""조표를 따르는 음이름 표기 (C+ / D- 등)
+
+검은 건반 음은 플랫 조(조표가 음수)에서는 D- E- G- A- B-로, 그 밖에는 C+ D+ F+ G+ A+로
+표기함. 곡 중간의 조 변경은 이벤트 순회와 함께 시간순으로 반영하므로, 이전에 만든 MML
+토큰을 다시 읽지 않고 상태 하나로 표기를 정함.
+"""
+
+SHARP_NAMES = ('C', 'C+', 'D', 'D+', 'E', 'F', 'F+', 'G', 'G+', 'A', 'A+', 'B')
+FLAT_NAMES = ('C', 'D-', 'D', 'E-', 'E', 'F', 'G-', 'G', 'A-', 'A', 'B-', 'B')
+
+def names_for_key(sharps):
+    """조표(-7~7)에 맞는 음이름 표 (인덱스: 음높이 % 12)"""
+    return FLAT_NAMES if sharps < 0 else SHARP_NAMES
+
+class Speller:
+    """시간순으로 진행하며 현재 조표의 음이름 표를 유지"""
+
+    __slots__ = ('changes', 'position', 'names')
+
+    def __init__(self, key_signatures=None):
+        # key_signatures: [(틱, 조표, 단조 여부), ...] 시간순 (없으면 항상 샤프 표기)
+        self.changes = key_signatures or []
+        self.position = 0
+        self.names = SHARP_NAMES
+
+    def advance(self, tick):
+        """tick까지의 조 변경 반영"""
+        changes = self.changes
+        position = self.position
+        while position < len(changes) and changes[position][0] <= tick:
+            self.names = names_for_key(changes[position][1])
+            position += 1
+        self.position = position
+
+    def name(self, note):
+        """MIDI 노트 번호의 음이름 (옥타브 제외)"""
+        return self.names[note % 12]
@@ -0,0 +1,60 @@
+"""파일 하나의 템포 맵 (틱 -> 초 변환, T 명령어로 넣을 템포 변경)
+
+템포 변경마다 그 구간이 시작하는 시각(초)을 누적해 두고, 틱이 속한 구간을 이분 탐색으로 찾으므로
+변환 한 번이 O(log 템포 변경 수). 파일마다 한 번 만들어 파트 변환과 충실도 측정이 함께 씀.
+
+변환기의 시간 기준값(화음 창, 최소 쉼표 길이 등)은 모두 박자 단위이고 ticks_per_beat를 곱해 틱으로 씀.
+템포와 상관없이 악보상 같은 길이를 같게 다루기 위함 (초 단위 값은 재생 시각을 비교할 때만 사용).
+"""
+from array import array
+from bisect import bisect_right
+
+DEFAULT_TEMPO = 120  # 기본 템포 (BPM)
+DEFAULT_TEMPO_VALUE = 500000  # 기본 템포 (마이크로초/박)
+
+def tempo_to_bpm(tempo_value):
+    """마이크로초/박을 BPM으로 변환"""
+    return round(60000000 / tempo_value)
+
+class TempoMap:
+    """템포 변경 구간별 시작 틱/시작 시각과 T 명령어용 BPM 목록"""
+
+    __slots__ = ('ticks_per_beat', 'ticks', 'tempos', 'offsets', 'events', 'initial_tempo')
+
+    def __init__(self, tempos, ticks_per_beat):
+        """tempos: 시간순 [(틱, 마이크로초/박), ...] (midiparse.ParsedMidi.tempos)"""
+        self.ticks_per_beat = ticks_per_beat
+        self.ticks = array('q', [0])  # 구간 시작 틱
+        self.tempos = array('q', [DEFAULT_TEMPO_VALUE])  # 구간 템포 (마이크로초/박)
+        self.offsets = array('d', [0.0])  # 구간 시작 시각 (초)
+        for tick, tempo in tempos:
+            if tick == self.ticks[-1]:
+                self.tempos[-1] = tempo  # 같은 틱이면 나중 것
+                continue
+            self.offsets.append(self._elapsed(len(self.ticks) - 1, tick))
+            self.ticks.append(tick)
+            self.tempos.append(tempo)
+
+        # T 명령어로 넣을 템포 변경 [{'time': tick, 'value': bpm}, ...] (0틱의 템포는 시작 템포)
+        self.events = [{'time': tick, 'value': tempo_to_bpm(tempo)} for tick, tempo in tempos]
+        self.initial_tempo = DEFAULT_TEMPO
+        for tempo_event in self.events:
+            if tempo_event['time'] > 0:
+                break
+            self.initial_tempo = tempo_event['value']
+
+    def _elapsed(self, segment, tick):
+        """구간 segment의 시작부터 tick까지 걸린 시간을 더한 시각 (초)"""
+        return self.offsets[segment] + (tick - self.ticks[segment]) * self.tempos[segment] / (1e6 * self.ticks_per_beat)
+
+    def seconds(self, tick):
+        """틱 -> 곡 시작부터의 시각 (초)"""
+        return self._elapsed(max(bisect_right(self.ticks, tick) - 1, 0), tick)
+
+    def seconds_at_beat(self, beat):
+        """박자 -> 곡 시작부터의 시각 (초)"""
+        return self.seconds(beat * self.ticks_per_beat)
+
+def build_tempo_map(parsed):
+    """ParsedMidi -> TempoMap (파일마다 한 번)"""
+    return TempoMap(parsed.tempos, parsed.ticks_per_beat)
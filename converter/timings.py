@@ -0,0 +1,122 @@
+"""변환 단계별 시간과 카운터 (요청했거나 훅이 등록된 경우에만 수집)
+
+engine.convert/midi_to_mml에 Timings를 넘기면 단계별 시간(cache, parse, analysis, prepare, tokenize, emit)과
+카운터(트랙/이벤트/노트 수, 빠진 노트 수, 글자 수)를 채움. 넘기지 않으면 시간을 재지 않으므로
+변환 경로에 남는 비용은 None 확인 몇 번뿐임.
+
+add_hook으로 등록한 함수는 convert가 끝날 때마다 report() 결과(dict)를 받음 (외부 지표 수집기로 전달용).
+훅에서 난 예외는 변환 결과에 영향을 주지 않도록 무시함.
+
+MML_TIMING_HOOK: 서버 시작 시 등록할 훅 ('패키지.모듈:함수', 선택)
+"""
+import importlib
+import os
+import time
+
+STAGES = ('cache', 'parse', 'analysis', 'prepare', 'tokenize', 'emit', 'json')
+PART_STAGES = ('analysis', 'prepare', 'tokenize', 'emit')  # 파트 작업(encode_track)에서 재는 단계
+
+_hooks = []
+
+class Timings:
+    """변환 한 번의 단계별 누적 시간(초)과 카운터"""
+
+    __slots__ = ('stages', 'counters', 'parts', '_last')
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.parts = {}
+        self._last = time.perf_counter()
+
+    def start(self):
+        """다음 lap의 기준 시각을 지금으로"""
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        """직전 start/lap 이후 걸린 시간을 stage에 더함"""
+        now = time.perf_counter()
+        self.add(stage, now - self._last)
+        self._last = now
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_part(self, name, stats, coverage):
+        """encode_track의 stats를 파트 이름으로 기록하고 단계 시간/카운터에 합침"""
+        for stage in PART_STAGES:
+            self.add(stage, stats[stage])
+        dropped = max(stats['notes'] - stats['notes_emitted'], 0)
+        self.parts[name] = {
+            'events': stats['events'],
+            'notes': stats['notes'],
+            'notes_dropped': dropped,
+            'tokens': stats['tokens'],
+            'chars': stats['chars'],
+            'coverage': round(coverage, 3),
+        }
+        self.count('notes_dropped', dropped)
+
+    def merge(self, other):
+        """다른 Timings(예: 작업자 프로세스에서 잰 것)의 시간/카운터/파트를 합침"""
+        for stage, seconds in other.stages.items():
+            self.add(stage, seconds)
+        for name, value in other.counters.items():
+            self.count(name, value)
+        self.parts.update(other.parts)
+
+    def report(self):
+        """{'total_ms', 'stages_ms': {...}, 'counters': {...}, 'parts': {...}} (STAGES 순서)"""
+        stages = {stage: round(self.stages[stage] * 1000, 3) for stage in STAGES if stage in self.stages}
+        return {
+            'total_ms': round(sum(self.stages.values()) * 1000, 3),
+            'stages_ms': stages,
+            'counters': dict(self.counters),
+            'parts': dict(self.parts),
+        }
+
+    def server_timing(self):
+        """Server-Timing 헤더 값 (예: 'parse;dur=1.20, emit;dur=3.41')"""
+        return ', '.join(f'{stage};dur={self.stages[stage] * 1000:.2f}' for stage in STAGES if stage in self.stages)
+
+def requested(debug):
+    """요청의 debug 값(쉼표로 여러 개)에 'timings'가 있는지"""
+    return 'timings' in (debug or '').split(',')
+
+def add_hook(func):
+    """변환마다 report()를 받을 함수 등록"""
+    if func not in _hooks:
+        _hooks.append(func)
+
+def remove_hook(func):
+    if func in _hooks:
+        _hooks.remove(func)
+
+def hooks_enabled():
+    return bool(_hooks)
+
+def notify(timings):
+    """등록된 훅에 report() 전달 (훅 예외는 무시)"""
+    if not _hooks:
+        return
+    report = timings.report()
+    for func in tuple(_hooks):
+        try:
+            func(report)
+        except Exception:
+            pass
+
+def hook_from_env():
+    """MML_TIMING_HOOK('모듈:함수')을 불러와 등록하고 그 함수 반환 (없으면 None)"""
+    target = os.environ.get('MML_TIMING_HOOK')
+    if not target:
+        return None
+    module_name, _, func_name = target.partition(':')
+    if not module_name or not func_name:
+        raise ValueError(f"MML_TIMING_HOOK은 '모듈:함수' 형식이어야 합니다: {target!r}")
+    func = getattr(importlib.import_module(module_name), func_name)
+    add_hook(func)
+    return func
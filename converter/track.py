@@ -0,0 +1,461 @@
+"""단일 트랙을 MML 문자열로 변환"""
+import time
+from array import array
+from bisect import bisect_right
+
+from .analysis import TrackAnalysis, analyze_track
+from .emitter import LENGTH, NOTE, OCTAVE, REST, TEMPO, TIE, VOLUME, encode
+from .midiparse import NOTE_ON
+from .notes import LastNote
+from .prepare import prepare_track
+from .quantize import get_quantizer
+from .spelling import Speller
+from .vectorized import prepare_track_numpy
+
+# 예산 확인 간격의 최소 토큰 수 (확인마다 지금까지의 토큰을 인코딩하므로 너무 자주 하지 않음)
+MIN_CHECK_TOKENS = 64
+
+# 시간 기준값 (모두 박자 단위, ticks_per_beat를 곱하거나 나눠 틱과 비교)
+MIN_REST_BEATS = 0.2  # 이보다 짧은 쉼표는 넣지 않음 (끊김 방지)
+TIE_GAP_BEATS = 0.1  # 같은 음이 이 간격 안에 다시 나오면 타이로 연결
+LEGATO_GAP_BEATS = 0.1  # 다음 음이 이 간격 안에 나오면 현재 음을 짧은 길이로
+LEGATO_MIN_BEATS = 0.2  # 짧은 길이로 바꿀 만큼 긴 음표
+SHORT_NOTE_BEATS = 0.1  # 빠르게 이어지는 음표용 짧은 길이
+LONG_NOTE_BEATS = 2  # 이보다 긴 음표는 타이로 나눔
+
+def process_track(track, ticks_per_beat, ppq, is_harmony=False, tempo_events=None, quantizer=None, engine='python', key_signatures=None):
+    """단일 트랙을 MML로 변환 (글자 수 제한 없음, 인자는 encode_track과 같음)"""
+    return encode_track(track, ticks_per_beat, ppq, is_harmony, tempo_events, quantizer, engine, key_signatures)[0]
+
+def _timed_encode(stats):
+    """encode와 같지만 걸린 시간을 stats['emit']에 더함"""
+    def timed(tokens, budget=None, encoder='greedy', complete=True):
+        started = time.perf_counter()
+        result = encode(tokens, budget, encoder, complete)
+        stats['emit'] += time.perf_counter() - started
+        return result
+    return timed
+
+def _finish_stats(stats, tokens, consumed, text, started):
+    """stats에 토큰/글자/실제로 쓴 노트 수와 토큰 생성 시간(전체에서 분석/준비/인코딩을 뺀 시간) 기록"""
+    kinds = [kind for kind, _ in tokens[:consumed]]
+    stats['tokens'] = len(tokens)
+    stats['chars'] = len(text)
+    stats['notes_emitted'] = kinds.count(NOTE) - kinds.count(TIE)  # 타이로 이은 음표는 하나로 셈
+    stats['tokenize'] = time.perf_counter() - started - stats['analysis'] - stats['prepare'] - stats['emit']
+
+class TrackTimeline:
+    """토큰 생성 결과 (세션에서 글자 수 예산/인코더만 바꿔 다시 인코딩할 때 재사용)"""
+
+    __slots__ = ('tokens', 'event_marks', 'event_times', 'complete')
+
+    def __init__(self, tokens, event_marks, event_times, complete):
+        self.tokens = tokens  # (종류, 값) 토큰 목록
+        self.event_marks = event_marks  # 이벤트별 시작 토큰 위치
+        self.event_times = event_times  # 트랙 전체 이벤트 시간 (TrackAnalysis 배열 공유)
+        self.complete = complete  # False면 예산 확인에서 멈춰 뒤쪽 이벤트의 토큰이 없음
+
+def _next_check(budget, text, count):
+    """지금까지의 토큰당 글자 수로 예산이 찰 시점을 추정해 다음 예산 확인 위치 결정"""
+    remaining = (budget - len(text)) * count // max(len(text), 1)
+    return count + max(MIN_CHECK_TOKENS, remaining)
+
+def fit_timeline(timeline, budget=None, encoder='greedy', emit=encode):
+    """캐시된 토큰을 예산 안에서 인코딩 -> (문자열, 담긴 토큰 수), 토큰이 모자라면 None
+
+    encode_track의 예산 확인을 같은 위치에서 다시 해 보므로 결과는 encode_track과 같음.
+    timeline이 예산 확인에서 멈춘 것이면 그 안에서 예산이 넘칠 때만 결과를 낼 수 있음.
+    """
+    tokens = timeline.tokens
+    if budget is not None:
+        marks = timeline.event_marks
+        if not timeline.complete:
+            marks = list(marks) + [len(tokens)]  # 멈춘 이벤트에서도 확인했음
+        next_check = budget // 4
+        for mark in marks:
+            if mark >= next_check:
+                text, consumed = emit(tokens[:mark], budget, encoder, False)
+                if consumed < mark:
+                    return text, consumed
+                next_check = _next_check(budget, text, mark)
+    if not timeline.complete:
+        return None
+    return emit(tokens, budget, encoder)
+
+def timeline_coverage(timeline, consumed):
+    """담긴 토큰 수 -> 트랙 마지막 이벤트 시간 대비 MML에 담긴 구간 (0.0-1.0)"""
+    if consumed >= len(timeline.tokens) and timeline.complete:
+        return 1.0
+    event_times = timeline.event_times
+    # 처음으로 빠진 토큰이 속한 이벤트 이전까지가 담긴 구간
+    stop_event = bisect_right(timeline.event_marks, consumed) - 1
+    if stop_event >= 0 and consumed == timeline.event_marks[stop_event]:
+        stop_event -= 1  # 이 이벤트의 토큰은 하나도 담기지 않음
+    fitted_time = event_times[stop_event] if stop_event >= 0 else 0
+    end_time = event_times[len(event_times) - 1]
+    return fitted_time / end_time if end_time > 0 else 0.0
+
+def split_rest(rest_start, rest_end, tempo_changes, tempo_idx, ticks_per_beat):
+    """쉼표 구간 안의 템포 변경 위치에서 쉼표 나누기 -> ([(앞에 넣을 BPM 목록, 쉼표 길이(틱)), ...], 다음 템포 변경 인덱스)
+
+    바뀐 템포로 재생할 부분만 T 뒤에 오도록 나눔. 나눈 조각이 최소 쉼표보다 짧아지면 나누지 않고
+    가까운 쪽 끝에 T를 넣음 (쉼표 끝에 가까운 변경은 남겨 두어 쉼표 뒤에 넣게 함).
+    """
+    pieces = []
+    tempos = []
+    while tempo_idx < len(tempo_changes):
+        change_time = tempo_changes[tempo_idx]['time']
+        if change_time >= rest_end:
+            break
+        before = (change_time - rest_start) / ticks_per_beat
+        after = (rest_end - change_time) / ticks_per_beat
+        if before >= MIN_REST_BEATS and after >= MIN_REST_BEATS:
+            pieces.append((tempos, change_time - rest_start))
+            tempos = []
+            rest_start = change_time
+        elif before > after:
+            break
+        tempos.append(tempo_changes[tempo_idx]['value'])
+        tempo_idx += 1
+    pieces.append((tempos, rest_end - rest_start))
+    return pieces, tempo_idx
+
+def prepare(track, ticks_per_beat, quantizer, engine='python'):
+    """노트별 길이/볼륨, 다음 note_on 시간, 화음 그룹을 미리 계산 -> PreparedTrack"""
+    if engine == 'numpy':
+        return prepare_track_numpy(track, ticks_per_beat, quantizer)
+    return prepare_track(track, ticks_per_beat, quantizer)
+
+def encode_track(track, ticks_per_beat, ppq, is_harmony=False, tempo_events=None, quantizer=None, engine='python', key_signatures=None, budget=None, encoder='greedy', stats=None):
+    """단일 트랙을 MML로 변환 (샘플 형식에 맞게 조정, 끊김 문제 해결) -> (MML, 담긴 비율)
+
+    track: analysis.TrackAnalysis (midiparse.ParsedTrack을 넘기면 여기서 분석)
+    tempo_events: 시간순으로 정렬된 템포 변경 목록 [{'time': tick, 'value': bpm}, ...]
+    (시작 템포는 파트 앞에 붙이므로 0틱 이후의 변경만 T 명령어로 삽입)
+    quantizer: 파일별로 한 번 만든 quantize.Quantizer (없으면 기본 길이 목록 사용)
+    engine: 'python' 또는 'numpy' (노트 배열 계산을 NumPy로 벡터화, 결과는 같음)
+    key_signatures: 시간순 조표 목록 [(tick, 조표, 단조 여부), ...] (플랫 조에서는 D- 등으로 표기)
+    budget: 최대 글자 수. 주어진 글자 수를 채우면 나머지 이벤트는 처리하지 않고 멈춤
+    encoder: 'greedy' 또는 'optimal' (emitter.encode 참고)
+    stats: dict를 넘기면 단계별 시간(analysis/prepare/tokenize/emit, 초)과 events/notes/notes_emitted/tokens/chars를 채움
+    (None이면 시간을 재지 않음)
+    담긴 비율: 트랙 마지막 이벤트 시간 대비 MML에 담긴 구간 (0.0-1.0)
+    """
+    if quantizer is None:
+        quantizer = get_quantizer(ticks_per_beat)
+    if stats is not None:
+        started = time.perf_counter()
+    # 트랙 분석 결과 사용 (이벤트는 이미 시간순, note_on/note_off 짝짓기 완료)
+    if not isinstance(track, TrackAnalysis):
+        track = analyze_track(track)
+    
+    emit = encode
+    if stats is not None:
+        stats.update(events=len(track.event_times), notes=len(track.note_table), analysis=time.perf_counter() - started, prepare=0.0, emit=0.0)
+        emit = _timed_encode(stats)
+    
+    # 이벤트가 없으면 빈 문자열 반환
+    if not track.event_times:
+        if stats is not None:
+            _finish_stats(stats, (), 0, "", started)
+        return "", 1.0
+    
+    if stats is not None:
+        prepare_started = time.perf_counter()
+    prepared = prepare(track, ticks_per_beat, quantizer, engine)
+    if stats is not None:
+        stats['prepare'] = time.perf_counter() - prepare_started
+    
+    timeline, encoded = tokenize_track(track, ticks_per_beat, prepared, quantizer, is_harmony, tempo_events, key_signatures, budget, encoder, emit)
+    
+    # 토큰을 압축 인코딩 (예산을 넘는 부분은 토큰 단위로 제외)
+    mml_string, consumed = encoded or emit(timeline.tokens, budget, encoder)
+    if stats is not None:
+        _finish_stats(stats, timeline.tokens, consumed, mml_string, started)
+    return mml_string, timeline_coverage(timeline, consumed)
+
+def tokenize_track(track, ticks_per_beat, prepared, quantizer, is_harmony=False, tempo_events=None, key_signatures=None, budget=None, encoder='greedy', emit=encode):
+    """이벤트를 순회하며 토큰 생성 -> (TrackTimeline, 예산을 넘긴 경우의 인코딩 결과 또는 None)
+
+    track: 이벤트가 하나 이상 있는 analysis.TrackAnalysis, prepared: prepare 결과
+    budget이 있으면 이벤트 순회 중에 가끔 인코딩해 보고, 넘쳤으면 남은 이벤트는 처리하지 않음
+    """
+    quantize = quantizer.quantize
+    short_length = quantizer.closest(ticks_per_beat * SHORT_NOTE_BEATS)  # 빠르게 이어지는 음표용 짧은 길이
+    
+    mml = []  # (종류, 값) 토큰 (emitter.encode로 문자열 변환)
+    current_octave = 4  # 기본 옥타브
+    current_length = '8'  # 기본 음표 길이
+    
+    event_times = track.event_times
+    event_kinds = track.event_kinds
+    event_notes = track.event_notes
+    event_note_index = track.event_note_index  # 이벤트별 노트 테이블 인덱스 (note_off는 -1)
+    event_count = len(event_times)
+    note_table = track.note_table
+    
+    note_durations = prepared.note_durations
+    note_lengths = prepared.note_lengths
+    volumes = prepared.volumes
+    next_on_times = prepared.next_on_times
+    chord_index = prepared.chord_index
+    note_pitches = note_table.pitch
+    note_ends = note_table.end
+    
+    # 시작할 때 기본 설정 추가
+    mml.append((VOLUME, 13))  # 기본 볼륨 (샘플과 일치)
+    
+    current_time = 0
+    previous_time = 0
+    previous_note = None
+    last_length_change = None
+    processed = bytearray(len(note_table))  # 이미 처리된 노트 (노트 테이블 인덱스별 표시)
+    
+    # 마지막 음표 시간과 길이 (타이 노트 처리용, 매번 새로 만들지 않고 갱신)
+    last_note = LastNote()
+    last_tied = False  # 마지막 음표 토큰이 이미 &로 연결된 음표인지
+    
+    # 기본 음표 길이 설정 (샘플처럼)
+    mml.append((LENGTH, current_length))
+    
+    # 곡 중간의 템포 변경 (이벤트 순회와 함께 병합, 재정렬 없음)
+    tempo_changes = [t for t in (tempo_events or []) if t['time'] > 0]
+    tempo_count = len(tempo_changes)
+    tempo_idx = 0
+    
+    # 조표에 따른 음이름 표기 (이벤트 순회와 함께 조 변경 반영)
+    speller = Speller(key_signatures)
+    
+    # 이벤트별 시작 토큰 위치 (예산에서 멈춘 지점을 곡 시간으로 환산)
+    event_marks = array('q')
+    next_check = budget // 4 if budget is not None else None
+    encoded = None  # 예산 확인에서 넘친 경우의 인코딩 결과 (마지막에 다시 인코딩하지 않음)
+    
+    # 각 이벤트 처리
+    for event_idx in range(event_count):
+        # 글자 수 예산 확인: 이미 넘쳤으면 남은 이벤트는 처리하지 않음
+        if next_check is not None and len(mml) >= next_check:
+            text, consumed = emit(mml, budget, encoder, False)
+            if consumed < len(mml):
+                encoded = (text, consumed)
+                break
+            next_check = _next_check(budget, text, len(mml))
+        event_marks.append(len(mml))
+        event_time = event_times[event_idx]
+        is_note_on = event_kinds[event_idx] == NOTE_ON
+        
+        speller.advance(event_time)
+        
+        # 이미 처리된 노트는 건너뛰기 (화음 처리 시 중복 방지)
+        if is_harmony and is_note_on and processed[event_note_index[event_idx]]:
+            continue
+            
+        # 이전 이벤트와의 시간 차이 계산
+        time_diff = event_time - previous_time
+        
+        # 짧은 쉼표는 건너뛰고, 실제로 필요한 쉼표만 추가 (끊김 방지)
+        if time_diff > 0 and time_diff / ticks_per_beat >= MIN_REST_BEATS:  # 최소 0.2박자 이상일 때만 쉼표 추가
+            # 쉼표 도중에 템포가 바뀌면 그 자리에서 쉼표를 나누어 T를 넣음
+            if tempo_idx < tempo_count and tempo_changes[tempo_idx]['time'] < event_time:
+                rest_pieces, tempo_idx = split_rest(previous_time, event_time, tempo_changes, tempo_idx, ticks_per_beat)
+            else:
+                rest_pieces = (((), time_diff),)
+            for rest_tempos, rest_ticks in rest_pieces:
+                for tempo_value in rest_tempos:
+                    mml.append((TEMPO, tempo_value))
+                rest_length = quantize(rest_ticks)
+                
+                # 길이가 이전과 다른 경우만 L 붙임 (샘플에서는 길이 변경 시에만 L 사용)
+                if rest_length != current_length:
+                    mml.append((LENGTH, rest_length))
+                    current_length = rest_length
+                    last_length_change = 'R'
+                
+                mml.append((REST, None))
+        
+        # 현재 이벤트 시간까지의 템포 변경 추가 (쉼표 뒤, 음표 앞: 그 전까지의 쉼표는 이전 템포로 재생)
+        while tempo_idx < tempo_count and tempo_changes[tempo_idx]['time'] <= event_time:
+            mml.append((TEMPO, tempo_changes[tempo_idx]['value']))
+            tempo_idx += 1
+        
+        if is_note_on:
+            note = event_notes[event_idx]
+            note_index = event_note_index[event_idx]
+            new_octave = (note // 12) - 1
+            
+            # 화음 처리 (is_harmony가 True인 경우)
+            if is_harmony:
+                # 현재 노트가 속한 화음 (시작 시간 기준 인덱스로 O(1) 조회)
+                current_chord = chord_index.group(note_index)
+                
+                # 아직 처리되지 않은 노트가 2개 이상인 경우 (마비노기는 2음 화음만 지원)
+                unprocessed = [i for i in current_chord if not processed[i]]
+                if len(unprocessed) >= 2:
+                    # 음높이 순으로 정렬해 가장 낮은 음과 가장 높은 음 찾기
+                    sorted_notes = sorted(unprocessed, key=note_pitches.__getitem__)
+                    low_index = sorted_notes[0]
+                    high_index = sorted_notes[-1]
+                    
+                    # 두 음이 너무 멀리 떨어져 있으면 (옥타브 이상) 가까운 두 음 선택
+                    if note_pitches[high_index] - note_pitches[low_index] > 12 and len(unprocessed) > 2:
+                        # 간격이 가장 적절한 두 음 선택
+                        min_interval = 12  # 초기값: 옥타브
+                        selected_pair = (sorted_notes[0], sorted_notes[1])
+                        
+                        for i in range(len(sorted_notes) - 1):
+                            interval = note_pitches[sorted_notes[i+1]] - note_pitches[sorted_notes[i]]
+                            if 2 <= interval <= 7:  # 3도~5도 간격 선호
+                                selected_pair = (sorted_notes[i], sorted_notes[i+1])
+                                break
+                            elif interval < min_interval:
+                                min_interval = interval
+                                selected_pair = (sorted_notes[i], sorted_notes[i+1])
+                        
+                        low_index, high_index = selected_pair
+                    
+                    low_note = note_pitches[low_index]
+                    high_note = note_pitches[high_index]
+                    
+                    # 선택된 두 음 처리
+                    low_oct = (low_note // 12) - 1
+                    high_oct = (high_note // 12) - 1
+                    
+                    low_name = speller.name(low_note)
+                    high_name = speller.name(high_note)
+                    
+                    # 옥타브 변경이 필요한 경우
+                    if low_oct != current_octave:
+                        mml.append((OCTAVE, low_oct - current_octave))
+                        current_octave = low_oct
+                    
+                    # 음표 길이 설정
+                    # 노트 길이 계산 (현재 시간부터 낮은 음 자신의 종료까지)
+                    low_end = note_ends[low_index]
+                    note_duration = low_end - event_time if low_end > event_time else 0
+                    
+                    if note_duration > 0:
+                        note_length = quantize(note_duration)
+                        if note_length != current_length:
+                            mml.append((LENGTH, note_length))
+                            current_length = note_length
+                            last_length_change = 'N'
+                    
+                    # 화음 추가 (2음 화음)
+                    if high_oct == low_oct:
+                        # 같은 옥타브 내의 화음
+                        chord_name = f"{low_name}{high_name}"
+                        mml.append((NOTE, low_name))
+                        mml.append((NOTE, high_name))
+                        last_tied = False
+                        
+                        # 마지막 음표 정보 업데이트
+                        last_note.update((low_note, high_note), event_time, note_duration, chord_name)
+                    elif high_oct == low_oct + 1 and low_note % 12 >= 9 and high_note % 12 <= 2:
+                        # 옥타브가 바뀌지만 실제로는 가까운 음들 (예: B와 다음 옥타브의 C)
+                        chord_name = f"{low_name}{high_name}"
+                        mml.append((NOTE, low_name))
+                        mml.append((NOTE, high_name))
+                        last_tied = False
+                        
+                        # 마지막 음표 정보 업데이트
+                        last_note.update((low_note, high_note), event_time, note_duration, chord_name)
+                    else:
+                        # 다른 옥타브의 화음은 순차적으로 처리
+                        mml.append((NOTE, low_name))
+                        
+                        # 높은 음의 옥타브로 변경
+                        mml.append((OCTAVE, high_oct - current_octave))
+                        current_octave = high_oct
+                        
+                        mml.append((NOTE, high_name))
+                        
+                        # 다시 낮은 음의 옥타브로 변경 (다음 음표가 높은 옥타브면 정리 단계에서 상쇄)
+                        mml.append((OCTAVE, low_oct - current_octave))
+                        current_octave = low_oct
+                        
+                        # 마지막 음표 정보 업데이트
+                        last_note.update((low_note, high_note), event_time, note_duration, f"{low_name}+{high_name}")
+                    
+                    # 처리된 노트 표시
+                    processed[low_index] = 1
+                    processed[high_index] = 1
+                    
+                    # 이벤트 처리 후 다음 이벤트로 넘어감
+                    previous_time = event_time
+                    continue
+            
+            # 단일 음표 처리 (화음이 아니거나, 화음 처리 후 남은 노트)
+            # 현재 조표에 맞는 음이름 (플랫 조에서는 D-, E- 등)
+            note_name = speller.name(note)
+                
+            # 옥타브 변경이 필요한 경우 (샘플에서는 < >를 사용)
+            if new_octave != current_octave:
+                mml.append((OCTAVE, new_octave - current_octave))
+                current_octave = new_octave
+            
+            # 볼륨 설정 (MIDI 벨로시티를 MML 볼륨으로 변환)
+            vol = volumes[note_index]  # 1-15 범위로 변환된 값
+            if vol != 13 and mml[-1][0] != VOLUME:
+                mml.append((VOLUME, vol))
+            
+            # 다음 노트까지의 길이 계산을 위해 노트 종료 이벤트 찾기
+            note_duration = note_durations[note_index]
+            
+            # 음표 길이 설정 (샘플에서는 L 명령어 최소화 - 같은 길이 연속 사용 시 생략)
+            if note_duration > 0:
+                note_length = note_lengths[note_index]
+                if note_length != current_length:
+                    mml.append((LENGTH, note_length))
+                    current_length = note_length
+                    last_length_change = 'N'
+            
+            # 타이 노트 처리 - 쉼표 없이 같은 음이 반복될 때 타이로 연결
+            tie_note = False
+            
+            # 같은 음표가 반복될 때 타이 노트로 처리
+            if note in last_note.notes:
+                # 시간 간격이 매우 짧은 경우 또는 바로 이어지는 경우
+                if time_diff < ticks_per_beat * TIE_GAP_BEATS:  # 0.1박자 이내면 타이 노트로 간주
+                    # 바로 앞 토큰이 음표이면 &로 연결 (L/V/T/옥타브 변경 뒤에는 연결하지 않음)
+                    if mml[-1][0] == NOTE:
+                        if not last_tied:  # 이미 타이 노트가 아닌 경우에만
+                            mml.append((TIE, None))
+                            mml.append((NOTE, note_name))
+                            last_tied = True
+                            tie_note = True
+            
+            # MML 음표 추가 (타이 노트가 아닌 경우만)
+            if not tie_note:
+                # 길게 지속되는 음표는 타이 노트로 처리
+                if note_duration > ticks_per_beat * LONG_NOTE_BEATS:  # 2박자 이상이면 타이 노트로 분할
+                    mml.append((NOTE, note_name))
+                    mml.append((TIE, None))
+                    mml.append((NOTE, note_name))
+                    last_tied = True
+                else:
+                    mml.append((NOTE, note_name))
+                    last_tied = False
+            
+            # 다음 음표와의 연속성 확인
+            if event_idx < event_count - 1:
+                next_time = next_on_times[event_idx]
+                
+                if next_time is not None:
+                    # 다음 음표가 매우 빠르게 이어질 경우 (0.1박자 이내)
+                    if next_time - event_time < ticks_per_beat * LEGATO_GAP_BEATS:
+                        # 현재 음표 길이 짧게 조정 (다음 음과 자연스럽게 연결)
+                        if note_duration > ticks_per_beat * LEGATO_MIN_BEATS:  # 충분히 길면
+                            if short_length != current_length:
+                                mml.append((LENGTH, short_length))
+                                current_length = short_length
+                
+            # 마지막 음표 정보 업데이트
+            last_note.update((note,), event_time, note_duration, note_name)
+                
+            previous_note = note
+            processed[note_index] = 1  # 처리된 노트로 표시
+            
+        
+        previous_time = event_time
+    
+    return TrackTimeline(mml, event_marks, event_times, encoded is None), encoded
@@ -0,0 +1,83 @@
+"""NumPy로 벡터화한 트랙 준비 단계 (선택 사항)
+
+노트 테이블을 구조화 배열(onset/offset/pitch/velocity)로 보고 길이 계산, 양자화,
+벨로시티 -> V 변환, 다음 note_on 시간, 화음 그룹 인덱스를 배열 연산으로 처리함.
+결과는 prepare.prepare_track과 같고, NumPy가 없으면 그 함수를 그대로 사용함.
+"""
+import importlib.util
+from array import array
+
+from .chords import CHORD_WINDOW_BEATS, ChordIndex
+from .midiparse import NOTE_ON
+from .prepare import PreparedTrack, prepare_track
+
+# NumPy는 'numpy' 엔진을 처음 쓸 때 가져옴 (기본 경로의 import 시간/메모리에 영향 없음)
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+np = None
+NOTE_DTYPE = None
+
+def _load_numpy():
+    """NumPy와 노트 구조화 배열 dtype 준비"""
+    global np, NOTE_DTYPE
+    if np is None:
+        import numpy
+        NOTE_DTYPE = numpy.dtype([
+            ('onset', numpy.int64),
+            ('offset', numpy.int64),
+            ('pitch', numpy.uint8),
+            ('velocity', numpy.uint8),
+        ])
+        np = numpy
+
+def note_array(note_table):
+    """NoteTable을 구조화 배열로 변환 (array 버퍼를 그대로 읽음)"""
+    _load_numpy()
+    notes = np.empty(len(note_table), dtype=NOTE_DTYPE)
+    if len(note_table):
+        notes['onset'] = np.frombuffer(note_table.start, dtype=np.int64)
+        notes['offset'] = np.frombuffer(note_table.end, dtype=np.int64)
+        notes['pitch'] = np.frombuffer(note_table.pitch, dtype=np.uint8)
+        notes['velocity'] = np.frombuffer(note_table.velocity, dtype=np.uint8)
+    return notes
+
+def prepare_track_numpy(track, ticks_per_beat, quantizer):
+    """TrackAnalysis에서 PreparedTrack 계산 (NumPy)"""
+    if not HAS_NUMPY:
+        return prepare_track(track, ticks_per_beat, quantizer)
+    _load_numpy()
+
+    notes = note_array(track.note_table)
+    onsets = notes['onset']
+    offsets = notes['offset']
+
+    # 노트 길이 (끝나지 않은 노트는 0)와 양자화
+    durations = np.where(offsets > onsets, offsets - onsets, 0)
+    token_index = np.searchsorted(np.asarray(quantizer.thresholds, dtype=np.int64), durations, side='right')
+    note_lengths = np.asarray(quantizer.tokens, dtype=object)[token_index].tolist()
+
+    # 벨로시티 -> 볼륨 (ceil(velocity / 8)을 1-15로 제한)
+    volumes = np.clip((notes['velocity'].astype(np.int16) + 7) // 8, 1, 15).tolist()
+
+    # 각 이벤트 이후 처음 나오는 note_on 시간
+    event_count = len(track.event_times)
+    on_positions = np.flatnonzero(np.frombuffer(track.event_kinds, dtype=np.uint8) == NOTE_ON)
+    if len(on_positions):
+        event_times = np.frombuffer(track.event_times, dtype=np.int64)
+        following = np.searchsorted(on_positions, np.arange(on_positions[-1]), side='right')
+        next_on_times = event_times[on_positions[following]].tolist()
+        next_on_times.extend([None] * (event_count - len(next_on_times)))
+    else:
+        next_on_times = [None] * event_count
+
+    # 화음 그룹화 - 이전 시작 시간과 0.05박 이상 떨어지면 새 그룹
+    note_count = len(notes)
+    is_break = np.diff(onsets) >= CHORD_WINDOW_BEATS * ticks_per_beat
+    group_of = np.zeros(note_count, dtype=np.int64)
+    if note_count:
+        np.cumsum(is_break, out=group_of[1:])
+    bounds = [0] + (np.flatnonzero(is_break) + 1).tolist() + [note_count]
+    groups = [list(range(start, end)) for start, end in zip(bounds, bounds[1:])] if note_count else []
+    chord_index = ChordIndex(groups, array('q', group_of.tobytes()))
+
+    return PreparedTrack(durations.tolist(), note_lengths, volumes, next_on_times, chord_index)
@@ -0,0 +1,125 @@
+"""모든 트랙의 노트를 한 타임라인에 모아 N개 단선율 성부로 나누기 (구간 스케줄링)
+
+노트를 (시작 시간, 높은 음 먼저) 순으로 정렬한 뒤, 차례로 비어 있는 첫 번째 성부에 넣음.
+시작 시간순으로 비어 있는 성부를 고르는 탐욕 배정은 구간 그래프 색칠과 같아서, 성부 수가 충분하면
+필요한 성부 수가 동시에 울리는 최대 노트 수와 같아짐(최소). 성부 수가 모자라면 그 시점에
+비어 있는 성부가 없는 노트만 빠짐. 같은 시각에 여러 트랙이 같은 음을 치면(유니즌) 가장 긴 노트 하나만 씀.
+
+글자 수 예산(budget)을 주면 성부마다 지금까지 받은 노트의 MML 글자 수를 어림하고, 예산을 다 쓴 성부는
+건너뛰어 다음 빈 성부에 넣음. 예산 없이 나누면 노트가 많은 성부는 인코딩에서 예산에 잘려 뒤쪽 노트가 빠지고
+다른 성부는 남는데, 이렇게 넘기면 남는 성부가 곡의 뒤쪽을 이어받음. 빈 성부가 모두 예산을 다 썼으면 예전처럼
+첫 번째 빈 성부에 넣음 (어림값이므로 실제로 자르는 것은 인코딩 단계).
+
+정렬 O(n log n) + 노트마다 성부 최대 N개 확인이므로 큰 파일에서도 거의 선형.
+첫 성부가 그 시점에 가장 높은 음을 먼저 받으므로 (예산을 다 쓰기 전까지) 멜로디 파트가 됨.
+타악기 채널(10번, 0부터 세면 9)의 노트는 음높이가 없으므로 제외함.
+"""
+from collections import deque
+
+from .midiparse import NOTE_OFF, NOTE_ON, ParsedTrack
+from .track import MIN_REST_BEATS
+
+PERCUSSION_CHANNEL = 9
+
+# 성부별 MML 글자 수 어림값 (합성 MIDI 묶음의 성부 MML 길이에 맞춘 값, 실제 길이의 약 0.7-1.05배)
+NOTE_CHARS = 6  # 음표 하나 (음이름, 평균적인 L/V/옥타브 변경 포함)
+REST_CHARS = 4  # 음표 앞 쉼표 하나
+
+class VoiceAllocation:
+    """성부 나누기 결과"""
+
+    __slots__ = ('tracks', 'notes', 'merged', 'dropped')
+
+    def __init__(self, tracks, notes, merged, dropped):
+        self.tracks = tracks  # 성부별 단선율 ParsedTrack (노트가 있는 성부만, 첫 번째가 멜로디)
+        self.notes = notes  # 모은 노트 수 (타악기, 끝나지 않은 노트 제외)
+        self.merged = merged  # 유니즌으로 합쳐진 노트 수
+        self.dropped = dropped  # 빈 성부가 없어 빠진 노트 수
+
+def collect_notes(tracks):
+    """모든 트랙의 note_on/note_off를 짝지어 [(시작, -음높이, -끝, 벨로시티, 채널), ...] (정렬 전)
+
+    트랙마다 채널+음높이별 큐로 가장 먼저 시작해 아직 끝나지 않은 note_on과 짝지음 (NoteTable과 같은 규칙).
+    길이가 0이거나 끝나지 않은 노트는 뺌.
+    """
+    notes = []
+    for track in tracks:
+        open_notes = {}
+        for time, kind, note, velocity, channel in zip(track.times, track.kinds, track.notes, track.velocities, track.channels):
+            if channel == PERCUSSION_CHANNEL:
+                continue
+            key = (channel << 7) | note
+            if kind == NOTE_ON:
+                started = open_notes.get(key)
+                if started is None:
+                    started = open_notes[key] = deque()
+                started.append((time, velocity))
+                continue
+            started = open_notes.get(key)
+            if started:
+                start, on_velocity = started.popleft()
+                if time > start:
+                    notes.append((start, -note, -time, on_velocity, channel))
+    return notes
+
+def allocate_voices(tracks, count, budget=None, ticks_per_beat=480):
+    """ParsedTrack 목록 -> VoiceAllocation (성부 최대 count개)
+
+    budget: 성부 하나의 MML 글자 수 예산 (None이면 예산을 보지 않고 비어 있는 첫 성부에 넣음)
+    ticks_per_beat: 쉼표가 들어갈 간격을 판단하는 기준 (글자 수 어림에만 씀)
+    """
+    notes = collect_notes(tracks)
+    notes.sort()
+    voices = [[] for _ in range(count)]
+    free_at = [0] * count  # 성부별로 마지막 노트가 끝나는 시간
+    chars = [0] * count  # 성부별 MML 글자 수 어림값
+    min_rest = ticks_per_beat * MIN_REST_BEATS
+    merged = 0
+    dropped = 0
+    previous = None
+    for note in notes:
+        start = note[0]
+        onset = (start, note[1])
+        if onset == previous:
+            merged += 1  # 같은 시각 같은 음은 정렬상 가장 긴 것이 먼저 옴
+            continue
+        previous = onset
+        chosen = None
+        for voice in range(count):
+            if free_at[voice] <= start:
+                if budget is None or chars[voice] < budget:
+                    chosen = voice
+                    break
+                if chosen is None:
+                    chosen = voice  # 예산이 남은 빈 성부가 없을 때 쓸 첫 번째 빈 성부
+        if chosen is None:
+            dropped += 1
+            continue
+        voices[chosen].append(note)
+        chars[chosen] += NOTE_CHARS + (REST_CHARS if start - free_at[chosen] >= min_rest else 0)
+        free_at[chosen] = -note[2]
+
+    return VoiceAllocation([voice_track(index, voice) for index, voice in enumerate(voices) if voice], len(notes), merged, dropped)
+
+def voice_track(index, voice):
+    """겹치지 않는 노트 목록 -> note_on/note_off가 번갈아 나오는 ParsedTrack (이미 시간순)"""
+    track = ParsedTrack(index)
+    times = track.times
+    kinds = track.kinds
+    pitches = track.notes
+    velocities = track.velocities
+    channels = track.channels
+    for start, negative_pitch, negative_end, velocity, channel in voice:
+        pitch = -negative_pitch
+        times.append(start)
+        kinds.append(NOTE_ON)
+        pitches.append(pitch)
+        velocities.append(velocity)
+        channels.append(channel)
+        times.append(-negative_end)
+        kinds.append(NOTE_OFF)
+        pitches.append(pitch)
+        velocities.append(0)
+        channels.append(channel)
+    track.note_count = len(voice)
+    return track
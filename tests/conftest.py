@@ -0,0 +1,37 @@
+"""테스트 공용 픽스처"""
+import io
+import random
+
+import pytest
+from midiutil import MIDIFile
+
+def make_song(seed=0, chords=40):
+    """화음 트랙 두 개와 선율 트랙 하나가 있는 MIDI 바이트 (같은 시드면 같은 바이트)"""
+    rnd = random.Random(seed)
+    midi = MIDIFile(3)
+    midi.addTempo(0, 0, 120)
+    midi.addTempo(0, 16, 96)
+    for track in range(2):
+        time = 0.0
+        for _ in range(chords):
+            duration = rnd.choice([0.5, 1, 2])
+            root = rnd.randint(48, 72) - track * 12
+            for interval in sorted(rnd.sample([0, 3, 4, 7, 10, 12], rnd.randint(2, 4))):
+                midi.addNote(track, track, root + interval, time, duration, rnd.randint(60, 100))
+            time += duration
+    time = 0.0
+    for _ in range(chords * 2):
+        duration = rnd.choice([0.25, 0.5, 1])
+        midi.addNote(2, 2, rnd.randint(60, 84), time, duration, rnd.randint(50, 110))
+        time += duration + rnd.choice([0, 0, 0.5])
+    buffer = io.BytesIO()
+    midi.writeFile(buffer)
+    return buffer.getvalue()
+
+@pytest.fixture(scope='session')
+def song():
+    return make_song()
+
+@pytest.fixture(scope='session')
+def other_song():
+    return make_song(seed=1, chords=20)
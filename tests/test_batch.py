@@ -0,0 +1,40 @@
+"""일괄 변환(batch.convert_many)과 일괄 변환 풀 테스트"""
+import io
+import zipfile
+
+from converter.batch import convert_many, iter_uploads
+from converter.engine import midi_to_mml
+from converter.parallel import PartPool, batch_pool_from_env
+
+def test_batch_pool_from_env(monkeypatch):
+    shared = PartPool(max_workers=3)
+    assert batch_pool_from_env(shared) is shared
+    monkeypatch.setenv('MML_BATCH_WORKERS', '1')
+    assert batch_pool_from_env() is None
+    monkeypatch.setenv('MML_BATCH_WORKERS', '4')
+    pool = batch_pool_from_env()
+    assert pool.max_workers == 4
+    assert not pool.stats()['running']  # 첫 일괄 변환 때 띄움
+    monkeypatch.delenv('MML_BATCH_WORKERS')
+    monkeypatch.setattr('converter.parallel.os.cpu_count', lambda: 8)
+    assert batch_pool_from_env().max_workers == 8  # 기본은 CPU 수
+
+def test_convert_many_in_pool(song, other_song):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('a.mid', song)
+        archive.writestr('b.mid', other_song)
+    uploads = [('songs.zip', buffer.getvalue()), ('c.mid', song), ('notes.txt', b'text')]
+    pool = PartPool(max_workers=2)
+    try:
+        reports = list(convert_many(iter_uploads(uploads), {'parts': 4}, pool=pool))
+        assert pool.stats()['tasks'] == 3
+    finally:
+        pool.shutdown()
+    results = {report['name']: report.get('result') for report in reports}
+    assert results == {
+        'a.mid': midi_to_mml(song, {'parts': 4}),
+        'b.mid': midi_to_mml(other_song, {'parts': 4}),
+        'c.mid': midi_to_mml(song, {'parts': 4}),
+        'notes.txt': None,
+    }
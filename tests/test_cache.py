@@ -0,0 +1,69 @@
+"""변환 결과 캐시(cache.ResultCache) 테스트"""
+from converter.cache import ResultCache, cache_from_env, cache_key
+from converter.engine import convert, midi_to_mml, resolve_options
+
+def test_cache_key():
+    options = resolve_options(None)
+    assert cache_key(b'abc', options) == cache_key(b'abc', dict(reversed(list(options.items()))))
+    assert cache_key(b'abc', options) != cache_key(b'abd', options)
+    assert cache_key(b'abc', options) != cache_key(b'abc', resolve_options({'max_length': 500}))
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', {'melody': 'A'})
+    cache.put('b', {'melody': 'B'})
+    assert cache.get('a') == {'melody': 'A'}  # a가 최근에 쓴 항목이 됨
+    cache.put('c', {'melody': 'C'})
+    assert cache.get('b') is None
+    assert cache.get('a') == {'melody': 'A'}
+    assert cache.get('c') == {'melody': 'C'}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['entries']) == (3, 1, 1, 2)
+    assert stats['hit_rate'] == 0.75
+
+def test_get_returns_copy():
+    cache = ResultCache()
+    cache.put('a', {'melody': 'A'})
+    cache.get('a')['melody'] = 'changed'
+    assert cache.get('a') == {'melody': 'A'}
+
+def test_disk_cache(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    ResultCache(disk_path=path).put('a', {'melody': 'A', 'coverage': {'melody': 1.0}})
+
+    cache = ResultCache(disk_path=path)
+    assert cache.get('a') == {'melody': 'A', 'coverage': {'melody': 1.0}}
+    assert cache.get('a') == {'melody': 'A', 'coverage': {'melody': 1.0}}  # 두 번째는 메모리에서
+    stats = cache.stats()
+    assert (stats['disk_hits'], stats['hits'], stats['disk_entries']) == (1, 1, 1)
+
+    cache.clear()
+    assert cache.get('a') is None
+    assert ResultCache(disk_path=path).get('a') is None
+
+def test_disk_eviction(tmp_path):
+    cache = ResultCache(max_entries=1, disk_path=str(tmp_path / 'cache.sqlite3'), disk_max_entries=2)
+    for key in 'abc':
+        cache.put(key, {'melody': key})
+    stats = cache.stats()
+    assert (stats['disk_entries'], stats['disk_evictions'], stats['evictions']) == (2, 1, 2)
+    assert cache.get('a') is None
+    assert cache.get('b') == {'melody': 'b'}
+
+def test_convert_uses_cache(song):
+    cache = ResultCache()
+    first = convert(song, {'parts': 3}, cache=cache)
+    assert first == midi_to_mml(song, {'parts': 3})
+    assert convert(song, {'parts': 3}, cache=cache) == first
+    assert convert(song, {'parts': 2}, cache=cache) == midi_to_mml(song, {'parts': 2})
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+
+def test_cache_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv('MML_CACHE_SIZE', '0')
+    assert cache_from_env() is None
+    monkeypatch.setenv('MML_CACHE_SIZE', '8')
+    monkeypatch.setenv('MML_CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+    cache = cache_from_env()
+    assert cache.max_entries == 8
+    assert cache.stats()['disk_entries'] == 0
@@ -0,0 +1,166 @@
+"""화음 그룹 인덱스(chords.ChordIndex)와 화음 트랙 변환의 처리 표시, 속도 테스트"""
+import random
+import time
+
+import pytest
+
+from converter.analysis import analyze_track
+from converter.chords import CHORD_WINDOW_BEATS, build_chord_index
+from converter.midiparse import NOTE_OFF, NOTE_ON, ParsedTrack
+from converter.prepare import prepare_track
+from converter.quantize import get_quantizer
+from converter.track import process_track
+from converter.vectorized import HAS_NUMPY, prepare_track_numpy
+
+TICKS_PER_BEAT = 480
+
+def make_track(notes):
+    """[(시작, 끝, 음높이), ...] -> ParsedTrack"""
+    events = []
+    for start, end, pitch in notes:
+        events.append((start, NOTE_ON, pitch))
+        events.append((end, NOTE_OFF, pitch))
+    track = ParsedTrack(0)
+    for time, kind, pitch in sorted(events):
+        track.times.append(time)
+        track.kinds.append(kind)
+        track.notes.append(pitch)
+        track.velocities.append(100 if kind == NOTE_ON else 0)
+        track.channels.append(0)
+        track.note_count += kind == NOTE_ON
+    return track
+
+def random_notes(seed, count=400):
+    """화음, 같은 시각의 같은 음, 창 경계 근처 간격이 섞인 노트 목록"""
+    rnd = random.Random(seed)
+    notes = []
+    time = 0
+    for _ in range(count):
+        time += rnd.choice([0, 0, 1, 23, 24, 25, 240, 480])
+        notes.append((time, time + rnd.choice([1, 120, 480, 1000]), rnd.randint(55, 72)))
+    return notes
+
+def chord_track(chords, seed=0):
+    """한 박자 간격의 3음 화음 chords개 -> TrackAnalysis"""
+    rnd = random.Random(seed)
+    notes = []
+    for chord in range(chords):
+        start = chord * TICKS_PER_BEAT
+        notes.extend((start, start + TICKS_PER_BEAT, pitch) for pitch in rnd.sample(range(48, 84), 3))
+    return analyze_track(make_track(notes))
+
+def best_time(func, repeat=3):
+    """func 실행 시간 중 가장 짧은 값 (초, 다른 작업으로 인한 흔들림을 줄임)"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+def linear_scan_groups(track, ticks_per_beat):
+    """이전 구현: 시작 시간별 음높이 묶음을 시간순으로 이어 붙여 화음 그룹 [[음높이, ...], ...]"""
+    chord_times = {}
+    for time, kind, pitch in zip(track.times, track.kinds, track.notes):
+        if kind == NOTE_ON:
+            chord_times.setdefault(time, []).append(pitch)
+    groups = []
+    current = []
+    last_time = -1
+    for time, pitches in sorted(chord_times.items()):
+        if last_time == -1 or time - last_time < CHORD_WINDOW_BEATS * ticks_per_beat:
+            current.extend(pitches)
+        else:
+            if current:
+                groups.append(current)
+            current = pitches.copy()
+        last_time = time
+    if current:
+        groups.append(current)
+    return groups
+
+def test_build_chord_index_splits_on_window():
+    index = build_chord_index([0, 0, 10, 34, 58, 100], 24)
+    assert index.groups == [[0, 1, 2], [3], [4], [5]]
+    assert len(index) == 4
+    assert index.group(2) == [0, 1, 2]
+    assert index.group(4) == [4]
+
+def test_build_chord_index_compares_previous_onset():
+    # 창은 그룹 첫 노트가 아니라 바로 앞 노트와 비교하므로 가까운 시작 시간이 이어지면 한 그룹
+    assert build_chord_index([0, 20, 40, 60], 24).groups == [[0, 1, 2, 3]]
+
+def test_build_chord_index_empty():
+    index = build_chord_index([], 24)
+    assert len(index) == 0
+
+@pytest.mark.parametrize('seed', range(5))
+def test_chord_groups_match_linear_scan(seed):
+    track = make_track(random_notes(seed))
+    analysis = analyze_track(track)
+    chord_index = prepare_track(analysis, TICKS_PER_BEAT, get_quantizer(TICKS_PER_BEAT)).chord_index
+    pitches = analysis.note_table.pitch
+
+    assert [[pitches[i] for i in group] for group in chord_index.groups] == linear_scan_groups(track, TICKS_PER_BEAT)
+    for note_index in range(len(analysis.note_table)):
+        # 이전 구현처럼 그룹을 처음부터 훑어 찾은 그룹 (노트 인스턴스 기준)
+        expected = next(group for group in chord_index.groups if note_index in group)
+        assert chord_index.group(note_index) is expected
+
+@pytest.mark.skipif(not HAS_NUMPY, reason='NumPy가 없음')
+@pytest.mark.parametrize('seed', range(3))
+def test_numpy_chord_index_matches_python(seed):
+    analysis = analyze_track(make_track(random_notes(seed)))
+    quantizer = get_quantizer(TICKS_PER_BEAT)
+    expected = prepare_track(analysis, TICKS_PER_BEAT, quantizer).chord_index
+    actual = prepare_track_numpy(analysis, TICKS_PER_BEAT, quantizer).chord_index
+    assert actual.groups == expected.groups
+    assert list(actual.group_of) == list(expected.group_of)
+
+def test_repeated_pitch_resolves_to_later_chord():
+    # C는 두 화음에 모두 있음. 두 번째 C도 자기 화음(C-G)으로 처리되어야 함
+    track = make_track([(0, 480, 60), (0, 480, 64), (960, 1440, 60), (960, 1440, 67)])
+    assert process_track(track, TICKS_PER_BEAT, TICKS_PER_BEAT, is_harmony=True) == 'L4V13CERRCGR'
+
+def test_repeated_chord_is_not_skipped():
+    track = make_track([(start, start + 480, pitch) for start in (0, 960, 1920) for pitch in (60, 64)])
+    assert process_track(track, TICKS_PER_BEAT, TICKS_PER_BEAT, is_harmony=True) == 'L4V13CERRCERRCER'
+
+def test_processed_notes_are_skipped_in_chord():
+    # 낮은 음과 높은 음(C-G)을 화음으로 낸 뒤 남은 E는 단음으로 한 번만 나옴
+    track = make_track([(0, 480, 60), (0, 480, 64), (0, 480, 67)])
+    assert process_track(track, TICKS_PER_BEAT, TICKS_PER_BEAT, is_harmony=True) == 'L4V13CGER'
+
+def test_processed_flag_is_per_note_instance():
+    # 단음으로 처리된 C 뒤에 같은 음높이의 C가 다음 화음에 다시 나옴
+    track = make_track([(0, 480, 60), (480, 960, 60), (480, 960, 64)])
+    assert process_track(track, TICKS_PER_BEAT, TICKS_PER_BEAT, is_harmony=True) == 'L4V13CRCER'
+    # 화음 뒤에 같은 음높이의 단음 E
+    track = make_track([(0, 480, 60), (0, 480, 64), (480, 960, 64)])
+    assert process_track(track, TICKS_PER_BEAT, TICKS_PER_BEAT, is_harmony=True) == 'L4V13CERER'
+
+def test_group_lookup_is_faster_than_linear_scan():
+    # 노트 30000개(그룹 10000개). 이전 구현은 노트마다 그룹 목록을 앞에서부터 훑었음
+    chord_index = build_chord_index([note // 3 * TICKS_PER_BEAT for note in range(30000)], 24)
+    sample = range(0, 30000, 100)
+
+    def indexed():
+        for note_index in range(30000):
+            chord_index.group(note_index)
+
+    def scanned():
+        for note_index in sample:
+            next(group for group in chord_index.groups if note_index in group)
+
+    per_indexed = best_time(indexed) / 30000
+    per_scanned = best_time(scanned) / len(sample)
+    # 그룹 수에 비례하는 선형 탐색은 평균 5000개 그룹을 보므로 수백 배 이상 느림 (여유 있게 20배로 확인)
+    assert per_scanned > per_indexed * 20
+
+def test_harmony_track_scales_linearly():
+    small = chord_track(1000)
+    large = chord_track(4000)
+    small_time = best_time(lambda: process_track(small, TICKS_PER_BEAT, TICKS_PER_BEAT, is_harmony=True))
+    large_time = best_time(lambda: process_track(large, TICKS_PER_BEAT, TICKS_PER_BEAT, is_harmony=True))
+    # 노트 수가 4배면 선형은 약 4배, 이전의 노트마다 그룹을 훑는 방식은 약 16배 (여유 있게 8배로 확인)
+    assert large_time < small_time * 8
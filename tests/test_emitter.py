@@ -0,0 +1,87 @@
+"""MML 인코더(emitter.encode, greedy_plan, optimal_plan) 테스트"""
+import itertools
+import random
+
+import pytest
+
+from converter.emitter import (
+    CHANGE, INLINE, ITEM_LENGTH, KEEP, LENGTH, NOTE, OCTAVE, REST, TIE, TIED, VOLUME,
+    build_items, encode, item_heads, optimal_plan, write_items,
+)
+from converter.mml import parse_mml
+
+LENGTHS = ('4', '8', '16', '8.', '2')
+
+def random_tokens(rnd, count):
+    """음표/쉼표 count개 안팎의 무작위 토큰 (길이/옥타브/볼륨 변경과 타이 포함)"""
+    tokens = [(VOLUME, 13), (LENGTH, '8')]
+    for _ in range(count):
+        if rnd.random() < 0.5:
+            tokens.append((LENGTH, rnd.choice(LENGTHS)))
+        if rnd.random() < 0.3:
+            tokens.append((OCTAVE, rnd.choice([-3, -1, 1, 2])))
+        if rnd.random() < 0.2:
+            tokens.append((VOLUME, rnd.randint(8, 15)))
+        if rnd.random() < 0.15 and tokens[-1][0] == NOTE:
+            tokens.append((TIE, None))
+        tokens.append((REST, None) if rnd.random() < 0.2 else (NOTE, rnd.choice('CDEFGAB')))
+    return tokens
+
+def exhaustive_plan(items, heads, budget=None):
+    """모든 기본 길이와 항목별 표기 방법을 다 해 보고 -> (예산 안에 담기는 최대 항목 수, 그때의 최소 글자 수)"""
+    best = (0, 0)
+    for default_length in dict.fromkeys(item[ITEM_LENGTH] for item in items):
+        for actions in itertools.product((KEEP, INLINE, CHANGE), repeat=len(items)):
+            length = default_length
+            size = 1 + len(default_length)
+            for index, (item, action) in enumerate(zip(items, actions)):
+                item_length = item[ITEM_LENGTH]
+                if action == KEEP and item_length != length:
+                    break
+                if action == CHANGE and item[TIED]:
+                    break  # & 뒤에는 L을 쓸 수 없음
+                head, name = heads[index]
+                size += len(head) + len(name)
+                if action == INLINE:
+                    size += len(item_length)
+                elif action == CHANGE:
+                    size += 1 + len(item_length)
+                    length = item_length
+                if budget is not None and size > budget:
+                    break
+                fitted = index + 1
+                if fitted > best[0] or (fitted == best[0] and size < best[1]):
+                    best = (fitted, size)
+    return best
+
+def played(mml):
+    """MML -> [(시작 박자, 음높이, 박자 수, 볼륨), ...] (쉼표는 시작 박자로 드러남)"""
+    return [(round(note.beat, 6), note.pitch, round(note.beats, 6), note.volume) for note in parse_mml(mml).notes]
+
+def test_optimal_plan_matches_exhaustive_search():
+    rnd = random.Random(0)
+    for case in range(300):
+        items = build_items(random_tokens(rnd, rnd.randint(1, 6)))
+        heads = item_heads(items)
+        budget = None if case % 3 == 0 else rnd.randint(2, 30)
+        default_length, actions = optimal_plan(items, heads, budget)
+        text, written = write_items(items, heads, default_length, actions, budget)
+        fitted, size = exhaustive_plan(items, heads, budget)
+        assert written == fitted, case
+        if fitted:
+            assert len(text) == size, case
+
+@pytest.mark.parametrize('seed', range(5))
+def test_optimal_is_never_longer_than_greedy(seed):
+    rnd = random.Random(seed)
+    for _ in range(40):
+        tokens = random_tokens(rnd, rnd.randint(1, 200))
+        greedy, _ = encode(tokens)
+        optimal, _ = encode(tokens, encoder='optimal')
+        assert len(optimal) <= len(greedy)
+        assert played(optimal) == played(greedy)
+        for budget in (10, 50, 150):
+            greedy_consumed = encode(tokens, budget)[1]
+            optimal_text, optimal_consumed = encode(tokens, budget, 'optimal')
+            assert len(optimal_text) <= budget
+            assert optimal_consumed >= greedy_consumed
@@ -0,0 +1,138 @@
+"""비동기 변환 작업 큐(jobs.JobQueue) 테스트"""
+import io
+import threading
+import time
+import zipfile
+
+import pytest
+
+from converter.engine import midi_to_mml
+from converter.jobs import JobQueue, QueueFull, jobs_from_env
+
+@pytest.fixture
+def blocked(monkeypatch):
+    """작업 실행을 release.set()까지 막는 Event (제한 시간/대기열 테스트용)"""
+    release = threading.Event()
+    execute = JobQueue._execute
+
+    def blocking_execute(self, job):
+        release.wait(10)
+        return execute(self, job)
+
+    monkeypatch.setattr(JobQueue, '_execute', blocking_execute)
+    yield release
+    release.set()
+
+def zip_of(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+def test_convert_job(song):
+    jobs = JobQueue(workers=1)
+    job_id = jobs.submit('convert', [('song.mid', song)], {'parts': 4})
+    report = jobs.get(job_id, wait=10)
+    assert report['status'] == 'done'
+    assert report['result'] == midi_to_mml(song, {'parts': 4})
+    assert report['started'] is not None and report['finished'] >= report['started']
+    assert jobs.stats()['completed'] == 1
+
+def test_batch_job(song, other_song):
+    jobs = JobQueue(workers=1)
+    uploads = [('songs.zip', zip_of([('a.mid', song), ('b.mid', other_song)])), ('notes.txt', b'text')]
+    report = jobs.get(jobs.submit('batch', uploads), wait=10)
+    assert report['status'] == 'done'
+    summary = report['result']['summary']
+    assert (summary['files'], summary['ok'], summary['failed']) == (3, 2, 1)
+
+def test_failed_job():
+    jobs = JobQueue(workers=1)
+    report = jobs.get(jobs.submit('convert', [('bad.mid', b'garbage')]), wait=10)
+    assert report['status'] == 'failed'
+    assert 'MThd' in report['error']
+    assert 'result' not in report
+
+@pytest.mark.parametrize('kind, uploads, options', [
+    ('render', [('a.mid', b'x')], None),
+    ('convert', [], None),
+    ('convert', [('a.mid', b'x'), ('b.mid', b'x')], None),
+    ('convert', [('a.mid', b'x')], {'parts': 0}),
+])
+def test_submit_validation(kind, uploads, options):
+    jobs = JobQueue(workers=1)
+    with pytest.raises(ValueError):
+        jobs.submit(kind, uploads, options)
+    assert jobs.stats()['submitted'] == 0
+
+def test_unknown_job():
+    assert JobQueue(workers=1).get('missing', wait=0.1) is None
+
+def test_queue_full(song, blocked):
+    jobs = JobQueue(workers=1, max_pending=1)
+    running = jobs.submit('convert', [('a.mid', song)])
+    jobs.get(running, wait=0.5)  # 작업자가 꺼내 갈 때까지
+    jobs.submit('convert', [('b.mid', song)])
+    with pytest.raises(QueueFull):
+        jobs.submit('convert', [('c.mid', song)])
+    assert jobs.stats()['rejected'] == 1
+
+def test_wait_returns_before_done(song, blocked):
+    jobs = JobQueue(workers=1)
+    job_id = jobs.submit('convert', [('a.mid', song)])
+    assert jobs.get(job_id, wait=0.3)['status'] in ('queued', 'running')
+    blocked.set()
+    assert jobs.get(job_id, wait=10)['status'] == 'done'
+
+def test_timeout(song, blocked):
+    jobs = JobQueue(workers=1, timeout=0.2)
+    job_id = jobs.submit('convert', [('a.mid', song)])
+    report = jobs.get(job_id, wait=5)
+    assert report['status'] == 'failed'
+    assert '시간' in report['error']
+    blocked.set()  # 늦게 끝난 결과는 버림
+    assert jobs.get(job_id, wait=0.3)['status'] == 'failed'
+    assert jobs.stats()['timeouts'] == 1
+
+def test_expired_job(song):
+    jobs = JobQueue(workers=1, ttl=0.2)
+    job_id = jobs.submit('convert', [('a.mid', song)])
+    assert jobs.get(job_id, wait=10)['status'] == 'done'
+    time.sleep(0.3)
+    assert jobs.get(job_id) is None
+    assert jobs.stats()['done'] == 0
+
+def test_shared_sqlite(song, tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    first = JobQueue(workers=1, path=path)
+    job_id = first.submit('convert', [('a.mid', song)])
+    expected = first.get(job_id, wait=10)
+
+    second = JobQueue(workers=1, path=path)
+    changes = second._db.total_changes
+    assert second.get(job_id) == expected
+    assert second._db.total_changes == changes  # 조회는 저장소에 쓰지 않음
+
+def test_recovers_queued_jobs(song, tmp_path, monkeypatch):
+    path = str(tmp_path / 'jobs.sqlite3')
+    stopped = JobQueue(workers=1, path=path)
+    monkeypatch.setattr(stopped, 'start', lambda: stopped)  # 작업자 없이 저장만
+    job_id = stopped.submit('convert', [('a.mid', song)])
+
+    restarted = JobQueue(workers=1, path=path)
+    assert restarted.get(job_id)['status'] == 'queued'
+    restarted.start()
+    report = restarted.get(job_id, wait=10)
+    assert report['status'] == 'done'
+    assert report['result'] == midi_to_mml(song)
+    assert restarted.stats()['recovered'] == 1
+
+def test_jobs_from_env(monkeypatch):
+    monkeypatch.setenv('MML_JOB_WORKERS', '0')
+    assert jobs_from_env() is None
+    monkeypatch.setenv('MML_JOB_WORKERS', '3')
+    monkeypatch.setenv('MML_JOB_QUEUE', '5')
+    monkeypatch.setenv('MML_JOB_TIMEOUT', '10')
+    jobs = jobs_from_env()
+    assert (jobs.workers, jobs.max_pending, jobs.timeout) == (3, 5, 10)
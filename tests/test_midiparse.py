@@ -0,0 +1,145 @@
+"""경량 MIDI 파서(midiparse.parse_midi) 회귀 테스트 (mido로 읽은 결과와 비교)"""
+import io
+import random
+
+import mido
+import pytest
+
+from converter.midiparse import NOTE_OFF, NOTE_ON, MidiParseError, parse_midi
+
+def midi_bytes(track_data, ticks_per_beat=96, midi_format=0):
+    """MTrk 내용 목록 -> MIDI 파일 바이트"""
+    data = b'MThd' + (6).to_bytes(4, 'big') + midi_format.to_bytes(2, 'big')
+    data += len(track_data).to_bytes(2, 'big') + ticks_per_beat.to_bytes(2, 'big')
+    for track in track_data:
+        data += b'MTrk' + len(track).to_bytes(4, 'big') + track
+    return data
+
+def random_midi(rnd):
+    """노트 외 이벤트(sysex, 메타, 컨트롤)와 큰 델타가 섞인 MIDI 파일 (mido로 저장)"""
+    midi = mido.MidiFile(ticks_per_beat=rnd.choice([96, 480, 960]))
+    for _ in range(rnd.randint(1, 4)):
+        track = mido.MidiTrack()
+        midi.tracks.append(track)
+        for _ in range(rnd.randint(0, 300)):
+            choice = rnd.random()
+            delta = rnd.choice([0, 0, 10, 100, 1000, 200000])
+            if choice < 0.4:
+                track.append(mido.Message('note_on', note=rnd.randint(0, 127), velocity=rnd.randint(0, 127),
+                                          channel=rnd.randint(0, 15), time=delta))
+            elif choice < 0.6:
+                track.append(mido.Message('note_off', note=rnd.randint(0, 127), velocity=rnd.randint(0, 127), time=delta))
+            elif choice < 0.7:
+                track.append(mido.Message('control_change', control=7, value=100, time=delta))
+            elif choice < 0.75:
+                track.append(mido.Message('pitchwheel', pitch=rnd.randint(-8000, 8000), time=delta))
+            elif choice < 0.8:
+                track.append(mido.Message('program_change', program=3, time=delta))
+            elif choice < 0.85:
+                track.append(mido.Message('sysex', data=[1, 2, 3] * rnd.randint(0, 60), time=delta))
+            elif choice < 0.9:
+                track.append(mido.MetaMessage('set_tempo', tempo=rnd.randint(200000, 1500000), time=delta))
+            elif choice < 0.95:
+                track.append(mido.MetaMessage('time_signature', numerator=3, denominator=8, time=delta))
+            else:
+                track.append(mido.MetaMessage('track_name', name='x' * rnd.randint(0, 200), time=delta))
+    buffer = io.BytesIO()
+    midi.save(file=buffer)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_mido(seed):
+    data = random_midi(random.Random(seed))
+    reference = mido.MidiFile(file=io.BytesIO(data))
+    parsed = parse_midi(data)
+
+    assert parsed.ticks_per_beat == reference.ticks_per_beat
+    assert len(parsed.tracks) == len(reference.tracks)
+    tempos = []
+    time_signatures = []
+    for parsed_track, reference_track in zip(parsed.tracks, reference.tracks):
+        expected = []
+        tick = 0
+        for message in reference_track:
+            tick += message.time
+            if message.type in ('note_on', 'note_off'):
+                kind = NOTE_ON if message.type == 'note_on' and message.velocity > 0 else NOTE_OFF
+                expected.append((tick, kind, message.note, message.velocity, message.channel))
+            elif message.type == 'set_tempo':
+                tempos.append((tick, message.tempo))
+            elif message.type == 'time_signature':
+                time_signatures.append((tick, message.numerator, message.denominator))
+        actual = list(zip(parsed_track.times, parsed_track.kinds, parsed_track.notes,
+                          parsed_track.velocities, parsed_track.channels))
+        assert actual == expected
+        assert parsed_track.note_count == sum(1 for event in expected if event[1] == NOTE_ON)
+    assert parsed.tempos == sorted(tempos, key=lambda x: x[0])
+    assert parsed.time_signatures == sorted(time_signatures, key=lambda x: x[0])
+
+def test_accepts_bytearray_and_memoryview():
+    data = random_midi(random.Random(0))
+    expected = parse_midi(data)
+    for view in (bytearray(data), memoryview(data)):
+        parsed = parse_midi(view)
+        assert [list(track.times) for track in parsed.tracks] == [list(track.times) for track in expected.tracks]
+
+def test_running_status():
+    # 0x90 뒤에 상태 바이트 없이 note_on이 이어지고, 메타 이벤트 뒤에도 running status가 유지됨
+    track = bytes([
+        0x00, 0x90, 60, 100,
+        0x10, 62, 90,
+        0x00, 0xFF, 0x01, 0x01, 0x41,
+        0x10, 60, 0,
+        0x00, 0xB0, 7, 100,
+        0x05, 10, 20,
+        0x00, 0x80, 62, 0,
+        0x00, 0xFF, 0x2F, 0x00,
+    ])
+    parsed = parse_midi(midi_bytes([track]))
+    events = list(zip(parsed.tracks[0].times, parsed.tracks[0].kinds, parsed.tracks[0].notes))
+    assert events == [(0, NOTE_ON, 60), (16, NOTE_ON, 62), (32, NOTE_OFF, 60), (37, NOTE_OFF, 62)]
+
+def test_meta_events():
+    track = bytes([
+        0x00, 0xFF, 0x51, 0x03, 0x07, 0xA1, 0x20,  # 500000us/박
+        0x00, 0xFF, 0x58, 0x04, 0x06, 0x03, 0x18, 0x08,  # 6/8
+        0x00, 0xFF, 0x59, 0x02, 0xFD, 0x01,  # 플랫 3개, 단조
+        0x00, 0xFF, 0x2F, 0x00,
+        0x00, 0x90, 60, 100,  # end_of_track 뒤의 이벤트는 무시
+    ])
+    parsed = parse_midi(midi_bytes([track]))
+    assert parsed.tempos == [(0, 500000)]
+    assert parsed.time_signatures == [(0, 6, 8)]
+    assert parsed.key_signatures == [(0, -3, True)]
+    assert len(parsed.tracks[0]) == 0
+
+def test_skips_unknown_chunks():
+    track = bytes([0x00, 0x90, 60, 100, 0x60, 0x80, 60, 0])
+    data = midi_bytes([track])
+    header_end = 14
+    data = data[:header_end] + b'XFIH' + (3).to_bytes(4, 'big') + b'abc' + data[header_end:]
+    parsed = parse_midi(data)
+    assert len(parsed.tracks) == 1
+    assert list(parsed.tracks[0].times) == [0, 96]
+
+def test_truncated_track_chunk_is_clamped():
+    # 청크 길이가 파일 끝을 넘으면 남은 바이트까지만 읽음
+    track = bytes([0x00, 0x90, 60, 100, 0x60, 0x80, 60, 0])
+    data = midi_bytes([track])
+    data = data[:18] + (1000).to_bytes(4, 'big') + data[22:]
+    assert list(parse_midi(data).tracks[0].notes) == [60, 60]
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'RIFF' + bytes(20),
+    b'MThd' + (2).to_bytes(4, 'big') + bytes(8),
+    b'MThd' + (6).to_bytes(4, 'big') + bytes(4) + (0xE250).to_bytes(2, 'big'),  # SMPTE
+    midi_bytes([bytes([0x00, 0x3C, 0x64])]),  # running status 없이 데이터 바이트
+    midi_bytes([bytes([0x00, 0x90, 60])]),  # 잘린 채널 메시지
+    midi_bytes([bytes([0x00, 0xFF, 0x01, 0x10, 0x41])]),  # 트랙 끝을 넘는 메타 이벤트
+    midi_bytes([bytes([0x81, 0x80])]),  # 끝나지 않은 가변 길이 값
+    midi_bytes([bytes([0x00, 0xF4])]),  # 지원하지 않는 상태 바이트
+])
+def test_malformed(data):
+    with pytest.raises(MidiParseError):
+        parse_midi(data)
@@ -0,0 +1,118 @@
+"""조각 단위 multipart/form-data 파서(multipart.FilePartParser, read_file_part) 테스트"""
+import io
+import random
+
+import pytest
+
+from converter.multipart import (
+    FilePartParser, MultipartError, PayloadTooLarge, boundary_of, is_midi_part, read_file_part,
+)
+
+BOUNDARY = 'xYz--boundary'
+CONTENT_TYPE = f'multipart/form-data; boundary="{BOUNDARY}"'
+
+class TrickleStream(io.BytesIO):
+    """요청한 크기보다 적게(1-9바이트) 돌려주는 스트림 (소켓 읽기 흉내)"""
+
+    def __init__(self, data, rnd):
+        super().__init__(data)
+        self.rnd = rnd
+
+    def read(self, size=-1):
+        return super().read(min(size, self.rnd.randint(1, 9)))
+
+def part(headers, content):
+    return f'--{BOUNDARY}\r\n{headers}\r\n\r\n'.encode() + content + b'\r\n'
+
+def body_of(*parts):
+    return b''.join(parts) + f'--{BOUNDARY}--\r\nepilogue'.encode()
+
+def file_part(content, filename='song.mid', content_type='application/octet-stream'):
+    return part(f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\nContent-Type: {content_type}', content)
+
+@pytest.mark.parametrize('seed', range(200))
+def test_boundary_split_across_chunks(seed):
+    rnd = random.Random(seed)
+    # 내용에 CRLF, '-', 경계 앞부분과 같은 바이트를 섞어 경계를 잘못 찾기 쉽게 만듦
+    content = bytes(rnd.choice(b'\r\n-xYz\x00M') for _ in range(rnd.randint(0, 300)))
+    content += b'\r\n--xYz--bound'
+    parts = [
+        part('Content-Disposition: form-data; name="title"', b'hello\r\n--x'),
+        part('Content-Disposition: form-data; name="doc"; filename="a.txt"\r\nContent-Type: audio/midi-ish', b'zzz'),
+    ]
+    rnd.shuffle(parts)
+    body = body_of(*parts, file_part(content, 's\\"ong.MID'))
+    stream = TrickleStream(body, rnd) if seed % 2 else io.BytesIO(body)
+
+    info, received = read_file_part(stream, CONTENT_TYPE, len(body), chunk_size=rnd.choice([1, 3, 16, 65536]))
+    assert received == content
+    assert info['filename'] == 's"ong.MID'
+    assert stream.read() == b''  # 남은 본문까지 읽음
+
+def test_feed_byte_by_byte():
+    body = body_of(file_part(b'MThd\r\n--xYz'))
+    parser = FilePartParser(BOUNDARY.encode())
+    done = False
+    for index in range(len(body)):
+        done = parser.feed(body[index:index + 1])
+        if done:
+            break
+    assert done
+    assert parser.result()[1] == b'MThd\r\n--xYz'
+
+def test_first_matching_part_only():
+    body = body_of(file_part(b'first'), file_part(b'second'))
+    assert read_file_part(io.BytesIO(body), CONTENT_TYPE, len(body))[1] == b'first'
+
+def test_no_matching_part():
+    body = body_of(part('Content-Disposition: form-data; name="file"; filename="a.txt"', b'abc'))
+    assert read_file_part(io.BytesIO(body), CONTENT_TYPE, len(body)) is None
+
+def test_custom_accept():
+    body = body_of(file_part(b'midi'), part('Content-Disposition: form-data; name="other"; filename="b.bin"', b'bin'))
+    info, content = read_file_part(io.BytesIO(body), CONTENT_TYPE, len(body), accept=lambda p: p['name'] == 'other')
+    assert (info['filename'], content) == ('b.bin', b'bin')
+
+def test_is_midi_part():
+    assert is_midi_part({'filename': 'a.MIDI', 'content_type': ''})
+    assert is_midi_part({'filename': 'a', 'content_type': 'audio/midi'})
+    assert not is_midi_part({'filename': 'a.txt', 'content_type': 'text/plain'})
+    assert not is_midi_part({'filename': None, 'content_type': 'audio/midi'})
+
+def test_boundary_of():
+    assert boundary_of('multipart/form-data; boundary=abc') == b'abc'
+    assert boundary_of('Multipart/Form-Data; charset=utf-8; boundary="a b"') == b'a b'
+    for content_type in ('multipart/form-data', 'application/json; boundary=abc', 'multipart/form-data; boundary=' + 'a' * 71):
+        with pytest.raises(MultipartError):
+            boundary_of(content_type)
+
+def test_truncated_body():
+    body = body_of(file_part(b'abc'))
+    with pytest.raises(MultipartError):
+        read_file_part(io.BytesIO(body[:20]), CONTENT_TYPE, len(body))
+
+def test_unterminated_body():
+    body = file_part(b'abc')  # 닫는 경계 없음
+    with pytest.raises(MultipartError):
+        read_file_part(io.BytesIO(body), CONTENT_TYPE, len(body))
+
+def test_missing_content_length():
+    with pytest.raises(MultipartError):
+        read_file_part(io.BytesIO(b''), CONTENT_TYPE, None)
+
+def test_content_length_over_limit():
+    stream = io.BytesIO(b'x')
+    with pytest.raises(PayloadTooLarge):
+        read_file_part(stream, CONTENT_TYPE, 1025, max_size=1024)
+    assert stream.tell() == 0  # 읽기 전에 거절
+
+def test_received_bytes_over_limit():
+    parser = FilePartParser(BOUNDARY.encode(), max_size=1024)
+    parser.feed(file_part(b'a' * 1000)[:1000])
+    with pytest.raises(PayloadTooLarge):
+        parser.feed(b'a' * 100)
+
+def test_header_too_long():
+    parser = FilePartParser(BOUNDARY.encode())
+    with pytest.raises(MultipartError):
+        parser.feed(f'--{BOUNDARY}\r\nX-Long: '.encode() + b'a' * (17 * 1024))
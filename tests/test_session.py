@@ -0,0 +1,83 @@
+"""옵션만 바꾼 재변환(session.ConversionSession, SessionStore) 테스트"""
+import pytest
+
+from converter.engine import convert, midi_to_mml
+from converter.session import ConversionSession, SessionStore, session_token, sessions_from_env
+from converter.timings import Timings
+
+# 앞 단계 결과를 다시 쓰는 순서로 옵션을 바꿈 (예산/인코더, 길이 양자화, 파트 나누기)
+OPTION_SEQUENCE = [
+    None,
+    {'max_length': 300},
+    {'max_length': 300, 'encoder': 'optimal'},
+    {'allow_triplets': True},
+    {'parts': 5},
+    {'parts': 2},
+    {'allocation': 'voices', 'parts': 4},
+    {'allocation': 'voices', 'parts': 4, 'allow_64th': True, 'max_length': 200},
+    {'engine': 'numpy'},
+]
+
+def test_matches_midi_to_mml(song):
+    session = ConversionSession(song)
+    for options in OPTION_SEQUENCE:
+        assert session.convert(options) == midi_to_mml(song, options), options
+    # 다시 처음 옵션으로 (모두 저장된 단계에서)
+    assert session.convert(None) == midi_to_mml(song)
+
+def test_reuses_stages(song):
+    session = ConversionSession(song)
+    first = Timings()
+    session.convert({'max_length': 1200}, timings=first)
+    assert first.counters['session_reused'] == 0
+
+    again = Timings()
+    session.convert({'max_length': 300}, timings=again)
+    assert again.counters['session_reused'] > 0
+    assert 'tokenize' not in again.stages  # 저장된 토큰을 다시 인코딩만 함
+
+def test_convert_with_session(song):
+    session = ConversionSession(song)
+    assert convert(song, {'parts': 4}, session=session) == midi_to_mml(song, {'parts': 4})
+
+def test_invalid_options(song):
+    with pytest.raises(ValueError):
+        ConversionSession(song).convert({'parts': 9})
+
+def test_store_reopens_same_file(song, other_song):
+    store = SessionStore()
+    session = store.open(song)
+    assert store.open(bytearray(song)) is session
+    assert store.get(session_token(song)) is session
+    assert store.open(other_song) is not session
+    assert store.get('missing') is None
+    stats = store.stats()
+    assert (stats['opened'], stats['reopened'], stats['hits'], stats['misses'], stats['entries']) == (2, 1, 1, 1, 2)
+
+def test_store_eviction(song, other_song):
+    store = SessionStore(max_entries=1)
+    first = store.open(song)
+    store.open(other_song)
+    assert store.get(first.token) is None
+    assert store.stats()['evictions'] == 1
+
+def test_store_expiry(song, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('converter.session.time.monotonic', lambda: clock[0])
+    store = SessionStore(ttl=10)
+    session = store.open(song)
+    clock[0] += 9
+    assert store.get(session.token) is session  # 사용하면 만료 시각이 늘어남
+    clock[0] += 9
+    assert store.get(session.token) is session
+    clock[0] += 11
+    assert store.get(session.token) is None
+    assert store.stats()['expired'] == 1
+
+def test_sessions_from_env(monkeypatch):
+    monkeypatch.setenv('MML_SESSION_SIZE', '0')
+    assert sessions_from_env() is None
+    monkeypatch.setenv('MML_SESSION_SIZE', '4')
+    monkeypatch.setenv('MML_SESSION_TTL', '60')
+    store = sessions_from_env()
+    assert (store.max_entries, store.ttl) == (4, 60)
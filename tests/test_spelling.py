@@ -0,0 +1,62 @@
+"""조표에 따른 음이름 표기(spelling.Speller) 테스트"""
+import io
+
+from midiutil import MIDIFile
+from midiutil.MidiFile import FLATS, MAJOR, MINOR, SHARPS
+
+from converter.engine import midi_to_mml
+from converter.midiparse import parse_midi
+from converter.spelling import FLAT_NAMES, SHARP_NAMES, Speller, names_for_key
+
+BLACK_KEYS = (61, 63, 66, 68, 70)  # C#4 D#4 F#4 G#4 A#4
+
+def spell(speller, tick, notes=BLACK_KEYS):
+    """tick까지 진행한 뒤 notes의 음이름"""
+    speller.advance(tick)
+    return [speller.name(note) for note in notes]
+
+def test_c_major_default_uses_sharps():
+    assert spell(Speller(), 0) == ['C+', 'D+', 'F+', 'G+', 'A+']
+    assert spell(Speller([(0, 0, False)]), 0) == ['C+', 'D+', 'F+', 'G+', 'A+']
+    assert Speller().name(60) == 'C' and Speller().name(71) == 'B'
+
+def test_sharp_keys_use_sharps():
+    for sharps in range(1, 8):
+        assert names_for_key(sharps) is SHARP_NAMES
+        assert spell(Speller([(0, sharps, False)]), 0) == ['C+', 'D+', 'F+', 'G+', 'A+'], sharps
+
+def test_flat_keys_use_flats():
+    for sharps in range(-7, 0):
+        assert names_for_key(sharps) is FLAT_NAMES
+        assert spell(Speller([(0, sharps, True)]), 0) == ['D-', 'E-', 'G-', 'A-', 'B-'], sharps
+
+def test_white_keys_are_the_same_in_every_key():
+    white = [note for note in range(48, 72) if SHARP_NAMES[note % 12] == FLAT_NAMES[note % 12]]
+    for sharps in (-7, -1, 0, 3, 7):
+        assert spell(Speller([(0, sharps, False)]), 0, white) == [SHARP_NAMES[note % 12] for note in white]
+
+def test_key_changes_apply_in_time_order():
+    speller = Speller([(0, -2, False), (960, 4, False), (1920, 0, False), (2880, -1, True)])
+    assert spell(speller, 0, [70]) == ['B-']
+    assert spell(speller, 959, [70]) == ['B-']
+    assert spell(speller, 960, [70]) == ['A+']
+    assert spell(speller, 2000, [70]) == ['A+']
+    assert spell(speller, 5000, [70]) == ['B-']  # 여러 변경을 한 번에 지나감
+
+def key_song(accidentals, accidental_type, mode=MAJOR):
+    """A#/Bb 음표 하나와 조표가 있는 MIDI 바이트"""
+    midi = MIDIFile(1)
+    midi.addTempo(0, 0, 120)
+    if accidentals is not None:
+        midi.addKeySignature(0, 0, accidentals, accidental_type, mode)
+    midi.addNote(0, 0, 70, 0, 1, 100)
+    buffer = io.BytesIO()
+    midi.writeFile(buffer)
+    return buffer.getvalue()
+
+def test_midi_key_signature_spells_melody():
+    flat = key_song(3, FLATS, MINOR)
+    assert parse_midi(flat).key_signatures == [(0, -3, True)]
+    assert 'B-' in midi_to_mml(flat)['melody']
+    assert 'A+' in midi_to_mml(key_song(2, SHARPS))['melody']
+    assert 'A+' in midi_to_mml(key_song(None, None))['melody']
@@ -0,0 +1,116 @@
+"""템포 맵(tempo.TempoMap)과 쉼표 안의 템포 변경 위치(track.split_rest) 테스트"""
+import io
+
+import pytest
+from midiutil import MIDIFile
+
+from converter.engine import midi_to_mml
+from converter.midiparse import parse_midi
+from converter.mml import parse_mml
+from converter.tempo import DEFAULT_TEMPO, TempoMap, build_tempo_map
+from converter.track import split_rest
+
+TICKS_PER_BEAT = 480
+
+def brute_seconds(tempos, tick, ticks_per_beat=TICKS_PER_BEAT):
+    """틱마다 그때의 템포로 한 틱씩 더한 시각 (초)"""
+    total = 0.0
+    for step in range(tick):
+        tempo = 500000
+        for change_tick, value in tempos:
+            if change_tick <= step:
+                tempo = value
+        total += tempo / (1e6 * ticks_per_beat)
+    return total
+
+def test_seconds_without_tempo_events_uses_120_bpm():
+    tempo_map = TempoMap([], TICKS_PER_BEAT)
+    assert tempo_map.initial_tempo == DEFAULT_TEMPO
+    assert tempo_map.seconds(0) == 0.0
+    assert tempo_map.seconds(TICKS_PER_BEAT) == pytest.approx(0.5)
+    assert tempo_map.seconds_at_beat(6) == pytest.approx(3.0)
+
+def test_seconds_matches_tick_by_tick_sum():
+    tempos = [(0, 600000), (700, 400000), (1000, 1000000), (2400, 250000)]
+    tempo_map = TempoMap(tempos, TICKS_PER_BEAT)
+    for tick in (0, 1, 699, 700, 701, 999, 1000, 1500, 2399, 2400, 3000):
+        assert tempo_map.seconds(tick) == pytest.approx(brute_seconds(tempos, tick)), tick
+    assert tempo_map.initial_tempo == 100
+    assert [event['time'] for event in tempo_map.events] == [0, 700, 1000, 2400]
+
+def test_seconds_is_continuous_at_changes():
+    tempo_map = TempoMap([(960, 1000000), (1920, 250000)], TICKS_PER_BEAT)
+    for change in (960, 1920):
+        assert tempo_map.seconds(change - 1) < tempo_map.seconds(change) < tempo_map.seconds(change + 1)
+    assert tempo_map.seconds(960) == pytest.approx(1.0)
+    assert tempo_map.seconds(1920) == pytest.approx(3.0)
+
+def test_later_tempo_at_same_tick_wins():
+    tempo_map = TempoMap([(0, 500000), (480, 1000000), (480, 250000)], TICKS_PER_BEAT)
+    assert tempo_map.seconds(960) == pytest.approx(0.5 + 0.25)
+
+def test_build_tempo_map_from_song(song):
+    parsed = parse_midi(song)
+    tempo_map = build_tempo_map(parsed)
+    ticks_per_beat = parsed.ticks_per_beat
+    # conftest.make_song: 120 BPM, 16박부터 96 BPM
+    assert tempo_map.initial_tempo == 120
+    assert tempo_map.seconds(16 * ticks_per_beat) == pytest.approx(8.0)
+    assert tempo_map.seconds(20 * ticks_per_beat) == pytest.approx(8.0 + 4 * 60 / 96)
+
+def changes(*times, value=90):
+    """틱 목록 -> split_rest용 템포 변경 목록 (BPM은 value부터 하나씩 증가)"""
+    return [{'time': time, 'value': value + index} for index, time in enumerate(times)]
+
+def test_split_rest_at_change_inside_rest():
+    pieces, tempo_idx = split_rest(0, 1920, changes(960), 0, TICKS_PER_BEAT)
+    assert pieces == [([], 960), ([90], 960)]
+    assert tempo_idx == 1
+
+def test_split_rest_at_several_changes_inside_rest():
+    pieces, tempo_idx = split_rest(480, 2880, changes(960, 1920), 0, TICKS_PER_BEAT)
+    assert pieces == [([], 480), ([90], 960), ([91], 960)]
+    assert tempo_idx == 2
+
+def test_split_rest_change_at_or_near_rest_start_goes_before_rest():
+    for change in (480, 500):  # 시작과 같거나 최소 쉼표(0.2박)보다 가까움
+        pieces, tempo_idx = split_rest(480, 1920, changes(change), 0, TICKS_PER_BEAT)
+        assert pieces == [([90], 1440)], change
+        assert tempo_idx == 1
+
+def test_split_rest_change_at_or_near_rest_end_is_left_for_next_note():
+    for change in (1920, 1900):  # 끝과 같거나 최소 쉼표보다 가까움
+        pieces, tempo_idx = split_rest(480, 1920, changes(change), 0, TICKS_PER_BEAT)
+        assert pieces == [([], 1440)], change
+        assert tempo_idx == 0
+
+def test_split_rest_ignores_changes_after_rest_and_already_used():
+    pieces, tempo_idx = split_rest(960, 1920, changes(480, 1440, 2400), 1, TICKS_PER_BEAT)
+    assert pieces == [([], 480), ([91], 480)]
+    assert tempo_idx == 2
+
+def rest_song(change_beat):
+    """1박 음표, 3박 쉼표, 1박 음표 (change_beat에서 120 -> 60 BPM)"""
+    midi = MIDIFile(1)
+    midi.addTempo(0, 0, 120)
+    midi.addTempo(0, change_beat, 60)
+    midi.addNote(0, 0, 60, 0, 1, 100)
+    midi.addNote(0, 0, 64, 4, 1, 100)
+    buffer = io.BytesIO()
+    midi.writeFile(buffer)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize('change_beat, tempo_beat', [
+    (1, 0),  # 쉼표 시작
+    (1.1, 0),  # 시작에 가까우면 쉼표 앞으로
+    (2, 1),  # 쉼표 안
+    (2.5, 1.5),
+    (3.9, 3),  # 끝에 가까우면 쉼표 뒤로
+    (4, 3),  # 다음 음표 시작
+])
+def test_tempo_change_position_in_rest(change_beat, tempo_beat):
+    melody = midi_to_mml(rest_song(change_beat))['melody']
+    notes = parse_mml(melody).notes
+    assert [note.pitch for note in notes] == [60, 64]
+    rest_start = notes[1].beat - 3  # 3박 쉼표는 나누어도 길이가 같음
+    assert parse_mml(melody[:melody.index('T60')]).beats - rest_start == pytest.approx(tempo_beat)
@@ -0,0 +1,72 @@
+"""글자 수 예산 안의 인코딩(track.encode_track, fit_timeline) 테스트"""
+import pytest
+
+from converter.emitter import LENGTH, NOTE, encode
+from converter.engine import midi_to_mml
+from converter.mml import parse_mml
+
+PARTS = ('melody', 'harmony1', 'harmony2')
+MAX_LENGTHS = (1, 5, 8, 20, 50, 120, 200, 333, 500, 777, 1200)
+UNLIMITED = 10 ** 6
+
+def played(mml):
+    """MML -> [(시작 박자, 음높이, 박자 수, 볼륨), ...]"""
+    return [(round(note.beat, 6), note.pitch, round(note.beats, 6), note.volume) for note in parse_mml(mml).notes]
+
+def is_played_prefix(part, full):
+    """part의 음표들이 full의 앞부분과 같은지 (예산에서 자른 타이는 마지막 음표가 짧을 수 있음)"""
+    notes = played(part)
+    full_notes = played(full)
+    if not notes:
+        return True
+    if len(notes) > len(full_notes) or notes[:-1] != full_notes[:len(notes) - 1]:
+        return False
+    last, full_last = notes[-1], full_notes[len(notes) - 1]
+    return last[:2] == full_last[:2] and last[3] == full_last[3] and last[2] <= full_last[2]
+
+@pytest.mark.parametrize('encoder', ['greedy', 'optimal'])
+def test_parts_stay_within_max_length(song, encoder):
+    for max_length in MAX_LENGTHS:
+        result = midi_to_mml(song, {'max_length': max_length, 'encoder': encoder})
+        for name in PARTS:
+            assert len(result[name]) <= max_length, (max_length, name)
+
+@pytest.mark.parametrize('encoder', ['greedy', 'optimal'])
+def test_coverage_is_a_fraction(song, encoder):
+    for max_length in MAX_LENGTHS + (UNLIMITED,):
+        coverage = midi_to_mml(song, {'max_length': max_length, 'encoder': encoder})['coverage']
+        assert set(coverage) == set(PARTS)
+        assert all(0.0 <= value <= 1.0 for value in coverage.values()), (max_length, coverage)
+    assert midi_to_mml(song, {'max_length': UNLIMITED, 'encoder': encoder})['coverage'] == dict.fromkeys(PARTS, 1.0)
+
+def test_coverage_grows_with_max_length(song):
+    previous = dict.fromkeys(PARTS, 0.0)
+    for max_length in MAX_LENGTHS:
+        coverage = midi_to_mml(song, {'max_length': max_length})['coverage']
+        assert all(coverage[name] >= previous[name] for name in PARTS), max_length
+        previous = coverage
+
+def test_greedy_parts_are_prefixes_of_full_parts(song):
+    full = midi_to_mml(song, {'max_length': UNLIMITED})
+    sizes = {len(full[name]) for name in PARTS}
+    for max_length in MAX_LENGTHS + tuple(sizes) + tuple(size - 1 for size in sizes):
+        result = midi_to_mml(song, {'max_length': max_length})
+        for name in PARTS:
+            assert full[name].startswith(result[name]), (max_length, name)
+
+def test_optimal_parts_play_a_prefix_of_full_parts(song):
+    # optimal은 담기는 앞부분에 맞춰 계획을 다시 세우므로 문자열이 아니라 연주되는 음표로 비교
+    full = midi_to_mml(song, {'max_length': UNLIMITED, 'encoder': 'optimal'})
+    for max_length in MAX_LENGTHS[2:]:  # 더 짧으면 T..R. 머리말이 잘려 해석할 수 없음
+        result = midi_to_mml(song, {'max_length': max_length, 'encoder': 'optimal'})
+        for name in PARTS:
+            assert is_played_prefix(result[name], full[name]), (max_length, name)
+
+def test_unfinished_tokens_wait_for_open_length_run():
+    # 8분음표 구간이 토큰 끝까지 이어져 있어 뒤 토큰에 따라 L8 변경 여부가 달라질 수 있음
+    tokens = [(LENGTH, '4'), (NOTE, 'C'), (NOTE, 'D'), (LENGTH, '8'), (NOTE, 'E'), (NOTE, 'F'), (NOTE, 'G')]
+    assert encode(tokens, budget=5) == ('L4CD', 3)
+    assert encode(tokens, budget=5, complete=False) == ('L4CD', len(tokens))
+    # 다른 길이 항목이 뒤에 두 개 더 있으면 구간이 닫혔으므로 넘친 결과를 그대로 돌려줌
+    closed = tokens + [(LENGTH, '4'), (NOTE, 'A'), (NOTE, 'B')]
+    assert encode(closed, budget=5, complete=False) == encode(closed, budget=5) == ('L4CD', 3)
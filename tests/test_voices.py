@@ -0,0 +1,107 @@
+"""성부 나누기(voices.allocate_voices) 테스트"""
+from converter.engine import midi_to_mml
+from converter.midiparse import NOTE_OFF, NOTE_ON, ParsedTrack
+from converter.timings import Timings
+from converter.voices import NOTE_CHARS, PERCUSSION_CHANNEL, REST_CHARS, allocate_voices
+
+TICKS_PER_BEAT = 480
+
+def make_track(notes, index=0):
+    """[(시작, 끝, 음높이, 채널), ...] -> ParsedTrack"""
+    events = []
+    for start, end, pitch, channel in notes:
+        events.append((start, NOTE_ON, pitch, channel))
+        events.append((end, NOTE_OFF, pitch, channel))
+    track = ParsedTrack(index)
+    for time, kind, pitch, channel in sorted(events):
+        track.times.append(time)
+        track.kinds.append(kind)
+        track.notes.append(pitch)
+        track.velocities.append(100 if kind == NOTE_ON else 0)
+        track.channels.append(channel)
+        track.note_count += kind == NOTE_ON
+    return track
+
+def melody(count, step=TICKS_PER_BEAT // 2):
+    """겹치지 않는 음표 count개 (단선율)"""
+    return make_track([(index * step, index * step + step, 60 + index % 12, 0) for index in range(count)])
+
+def voice_notes(track):
+    """성부 트랙 -> [(시작, 끝, 음높이), ...]"""
+    return [(track.times[i], track.times[i + 1], track.notes[i]) for i in range(0, len(track.times), 2)]
+
+def test_highest_note_goes_to_first_voice():
+    track = make_track([(0, 480, 60, 0), (0, 480, 67, 0), (0, 480, 64, 0), (480, 960, 62, 0)])
+    allocation = allocate_voices([track], 3)
+    assert [voice_notes(voice) for voice in allocation.tracks] == [
+        [(0, 480, 67), (480, 960, 62)],
+        [(0, 480, 64)],
+        [(0, 480, 60)],
+    ]
+
+def test_drops_only_when_no_voice_is_free():
+    track = make_track([(0, 480, 60, 0), (0, 480, 64, 0), (0, 480, 67, 0), (480, 960, 60, 0)])
+    allocation = allocate_voices([track], 2)
+    assert (allocation.notes, allocation.dropped) == (4, 1)
+    assert sum(voice.note_count for voice in allocation.tracks) == 3
+
+def test_merges_unison_and_skips_percussion():
+    tracks = [
+        make_track([(0, 480, 60, 0), (0, 960, 60, 1)]),
+        make_track([(0, 480, 36, PERCUSSION_CHANNEL)], index=1),
+    ]
+    allocation = allocate_voices(tracks, 3)
+    assert (allocation.notes, allocation.merged) == (2, 1)
+    assert [voice_notes(voice) for voice in allocation.tracks] == [[(0, 960, 60)]]
+
+def test_without_budget_melody_stays_in_first_voice():
+    allocation = allocate_voices([melody(600)], 3)
+    assert [voice.note_count for voice in allocation.tracks] == [600]
+
+def test_budget_spills_to_free_voices():
+    budget = 1000
+    allocation = allocate_voices([melody(450)], 3, budget, TICKS_PER_BEAT)
+    counts = [voice.note_count for voice in allocation.tracks]
+    assert sum(counts) == 450 and allocation.dropped == 0
+    # 앞 성부들은 예산을 다 쓸 때까지만 받음 (예산을 넘기는 마지막 음표 하나와 첫 쉼표까지)
+    for count in counts[:2]:
+        assert budget <= count * NOTE_CHARS + REST_CHARS < budget + NOTE_CHARS + REST_CHARS
+    # 각 성부는 곡의 이어지는 구간을 맡음
+    ends = [voice.times[-1] for voice in allocation.tracks]
+    starts = [voice.times[0] for voice in allocation.tracks]
+    assert starts[1] == ends[0] and starts[2] == ends[1]
+
+def test_budget_does_not_drop_notes_when_all_voices_are_full():
+    allocation = allocate_voices([melody(600)], 2, 300, TICKS_PER_BEAT)
+    assert allocation.dropped == 0
+    assert sum(voice.note_count for voice in allocation.tracks) == 600
+
+def test_budget_aware_allocation_keeps_more_notes():
+    # 단선율 곡: 예산을 보지 않으면 한 파트에만 몰려 나머지가 잘림
+    track = melody(800)
+    data = midi_bytes(track)
+    timings = Timings()
+    result = midi_to_mml(data, {'allocation': 'voices', 'parts': 4}, timings=timings)
+    parts = timings.report()['parts']
+    emitted = sum(part['notes'] - part['notes_dropped'] for part in parts.values())
+    assert all(result[name] for name in ('melody', 'harmony1', 'harmony2'))
+    assert all(len(result[name]) <= 1200 for name in parts)
+    assert emitted > 2 * (1200 // NOTE_CHARS)  # 한 파트에 들어가는 노트 수의 두 배 이상
+
+def midi_bytes(track):
+    """단일 트랙 ParsedTrack -> MIDI 파일 바이트 (형식 0, 템포 메타 이벤트 없음)"""
+    data = bytearray()
+    previous = 0
+    for time, kind, pitch, velocity in zip(track.times, track.kinds, track.notes, track.velocities):
+        delta = time - previous
+        previous = time
+        varlen = [delta & 0x7F]
+        delta >>= 7
+        while delta:
+            varlen.append(0x80 | (delta & 0x7F))
+            delta >>= 7
+        data += bytes(reversed(varlen))
+        data += bytes([0x90 if kind == NOTE_ON else 0x80, pitch, velocity])
+    data += b'\x00\xff\x2f\x00'
+    header = b'MThd' + (6).to_bytes(4, 'big') + (0).to_bytes(2, 'big') + (1).to_bytes(2, 'big') + TICKS_PER_BEAT.to_bytes(2, 'big')
+    return header + b'MTrk' + len(data).to_bytes(4, 'big') + bytes(data)